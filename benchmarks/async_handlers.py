@@ -0,0 +1,183 @@
+"""Async handlers on the event loop versus the same handlers run in AnyIO's threadpool.
+
+The threadpool variant wraps every endpoint in a plain ``def`` that runs the
+handler's coroutine to completion, with the repository calls the async handlers
+hand to the threadpool run inline and bookings reserved directly, which is how
+each request was dispatched before the handlers became ``async``. The async
+variant sends bookings through the booking pipeline, as the service does by
+default. Both apps get the same routes and
+exception handlers but no middleware, and are driven in-process over ASGI by
+``N`` closed-loop clients, each sending its next request as soon as the last one
+is answered: mostly ``/seats`` polling with some ``POST /bookings``. Run with
+``python -m benchmarks.async_handlers``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import random
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+import anyio.to_thread
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from ticketing_service import main as service
+from ticketing_service.pipeline import BookingPipeline
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+SEATS = 100_000
+
+
+def in_threadpool(endpoint: Callable) -> Callable:
+    # Not functools.wraps: FastAPI follows ``__wrapped__`` and would see a coroutine function again.
+    def run(*args, **kwargs):
+        coroutine = endpoint(*args, **kwargs)
+        try:
+            coroutine.send(None)
+        except StopIteration as stop:
+            return stop.value
+        coroutine.close()
+        raise RuntimeError(f"{endpoint.__name__} suspended; run this benchmark without a WAL or pipeline")
+
+    run.__name__ = endpoint.__name__
+    run.__signature__ = inspect.signature(endpoint)
+    return run
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    for route in service.app.routes:
+        if isinstance(route, APIRoute):
+            app.add_api_route(
+                route.path,
+                in_threadpool(route.endpoint) if variant == "threadpool" else route.endpoint,
+                methods=list(route.methods),
+                status_code=route.status_code,
+                response_model=route.response_model,
+                response_class=route.response_class,
+            )
+    for key, handler in service.app.exception_handlers.items():
+        app.add_exception_handler(key, handler)
+    return app
+
+
+async def request(app: FastAPI, method: str, path: str, query: bytes, body: bytes) -> int:
+    status = 0
+    sent = False
+
+    async def receive() -> dict:
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query,
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def inline(call: Callable, *args, **kwargs):
+    return call(*args, **kwargs)
+
+
+async def run(
+    app: FastAPI,
+    clients: int,
+    duration: float,
+    booking_share: float,
+    pipelined: bool,
+) -> tuple[float, float, float, int]:
+    service.event_repository = EventRepository()
+    service.booking_repository = BookingRepository()
+    service.booking_pipeline = BookingPipeline(service.booking_repository) if pipelined else None
+    event = service.event_repository.create(
+        name="Bench",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Bench Hall",
+        total_seats=SEATS,
+    )
+    seats_path = f"/events/{event.id}/seats"
+    latencies: list[float] = []
+    errors = 0
+    deadline = perf_counter() + duration
+
+    async def client(rng: random.Random) -> None:
+        nonlocal errors
+        while perf_counter() < deadline:
+            if rng.random() < booking_share:
+                body = json.dumps({"event_id": str(event.id), "seats": [rng.randint(1, SEATS)]}).encode()
+                spec = ("POST", "/bookings", b"", body)
+            else:
+                spec = ("GET", seats_path, b"detail=count", b"")
+            started = perf_counter()
+            # Queue behind the other ready clients, as a server's loop would with ready sockets; a handler
+            # that never suspends would otherwise run this client alone until its deadline.
+            await asyncio.sleep(0)
+            status = await request(app, *spec)
+            latencies.append(perf_counter() - started)
+            # Two clients may pick the same seat; anything else is a failure.
+            errors += status >= 400 and status != 409
+
+    started = perf_counter()
+    await asyncio.gather(*(client(random.Random(index)) for index in range(clients)))
+    elapsed = perf_counter() - started
+    if service.booking_pipeline is not None:
+        service.booking_pipeline.close()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    return len(latencies) / elapsed, p50 * 1e3, p99 * 1e3, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1_000, 5_000])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--booking-share", type=float, default=0.1)
+    parser.add_argument("--threadpool-size", type=int, default=40, help="AnyIO's default is 40")
+    args = parser.parse_args()
+    logging.getLogger("ticketing_service").setLevel(logging.WARNING)
+    apps = {variant: build_app(variant) for variant in ("threadpool", "async")}
+
+    async def bench() -> None:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool_size
+        print(f"{'clients':>7} {'variant':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+        in_threadpool_calls = service._in_threadpool
+        for clients in args.clients:
+            for variant, app in apps.items():
+                # The wrapped handlers already run in a worker thread.
+                service._in_threadpool = inline if variant == "threadpool" else in_threadpool_calls
+                pipelined = variant == "async"
+                rate, p50, p99, errors = await run(app, clients, args.duration, args.booking_share, pipelined)
+                print(f"{clients:>7} {variant:>10} {rate:>9,.0f} {p50:>8,.2f} {p99:>8,.2f} {errors:>6}")
+
+    asyncio.run(bench())
+
+
+if __name__ == "__main__":
+    main()
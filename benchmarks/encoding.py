@@ -0,0 +1,147 @@
+"""List endpoint rendering at a page size of 200.
+
+Compares building ``EventResponse``/``BookingResponse`` models and letting
+FastAPI validate and serialize them against encoding the dataclasses straight
+to bytes, first encoding every item (cold) and then reusing cached fragments,
+and times both list endpoints through the full ASGI app. Run with
+``python -m benchmarks.encoding``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Every request comes from one client address, so lift its rate limit before the service reads its settings.
+os.environ["RATE_LIMIT_MAX_REQUESTS"] = "1000000000"
+
+from ticketing_service import main as service
+from ticketing_service.api.encoding import _encode_booking, _encode_event, encode_booking, encode_event, page_json
+from ticketing_service.api.schemas import BookingListResponse, BookingResponse, EventListResponse, EventResponse
+
+PAGE = 200
+
+
+def pydantic_events(events: list) -> bytes:
+    response = EventListResponse(
+        items=[
+            EventResponse(
+                id=event.id,
+                name=event.name,
+                starts_at=event.starts_at,
+                venue=event.venue,
+                total_seats=event.total_seats,
+                created_at=event.created_at,
+                updated_at=event.updated_at,
+            )
+            for event in events
+        ],
+        total=len(events),
+    )
+    # FastAPI re-validates the returned model against ``response_model`` before encoding.
+    validated = EventListResponse.model_validate(response.model_dump())
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def pydantic_bookings(bookings: list) -> bytes:
+    response = BookingListResponse(
+        items=[
+            BookingResponse(
+                id=booking.id,
+                event_id=booking.event_id,
+                seats=list(booking.seats),
+                status=booking.status,
+                created_at=booking.created_at,
+                updated_at=booking.updated_at,
+                expires_at=booking.expires_at,
+            )
+            for booking in bookings
+        ],
+        total=len(bookings),
+    )
+    validated = BookingListResponse.model_validate(response.model_dump())
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+
+def per_call(function, argument, repeat: int) -> float:
+    started = perf_counter()
+    for _ in range(repeat):
+        function(argument)
+    return (perf_counter() - started) / repeat * 1_000_000
+
+
+async def get(path: str, repeat: int) -> float:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"GET {path} returned {message['status']}")
+
+    path, _, query = path.partition("?")
+    started = perf_counter()
+    for _ in range(repeat):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        await service.app(scope, receive, send)
+    return (perf_counter() - started) / repeat * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.getLogger("ticketing_service").setLevel(logging.WARNING)
+    starts_at = datetime.now(timezone.utc) + timedelta(days=1)
+    events = [
+        service.event_repository.create(name=f"Event {index}", starts_at=starts_at, venue="Hall", total_seats=PAGE)
+        for index in range(PAGE)
+    ]
+    event = events[0]
+    for seat in range(1, PAGE + 1):
+        service.booking_repository.reserve(event_id=event.id, seats=[seat], total_seats=event.total_seats)
+    bookings = service.booking_repository.page_by_event(event.id, 0, PAGE)
+    assert pydantic_events(events) == page_json(map(encode_event, events), len(events)).body
+    assert pydantic_bookings(bookings) == page_json(map(encode_booking, bookings), len(bookings)).body
+
+    print(f"{'page of 200':>16} {'pydantic us':>12} {'cold us':>8} {'cached us':>10}")
+    for label, slow, cold, cached, items in (
+        ("events", pydantic_events, _encode_event, encode_event, events),
+        ("bookings", pydantic_bookings, _encode_booking, encode_booking, bookings),
+    ):
+        timings = [
+            per_call(slow, items, args.repeat),
+            per_call(lambda page: page_json(map(cold, page), len(page)), items, args.repeat),
+            per_call(lambda page: page_json(map(cached, page), len(page)), items, args.repeat),
+        ]
+        print(f"{label:>16} {timings[0]:>12.0f} {timings[1]:>8.0f} {timings[2]:>10.0f}")
+
+    print(f"{'endpoint':>32} {'us/request':>11}")
+    for label, path in (
+        ("GET /events", "/events?limit=200"),
+        ("GET /events/{id}/bookings", f"/events/{event.id}/bookings?limit=200"),
+    ):
+        print(f"{label:>32} {asyncio.run(get(path, args.repeat)):>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Open-loop load generator for on-sale traffic, in-process or against a running server.
+
+Requests start on a fixed arrival schedule however long earlier ones take, so a
+stalled server builds a queue instead of quietly slowing the generator down; a
+closed loop such as ``TestClient`` in a ``for`` loop hides exactly that delay.
+Latency is measured from each request's scheduled start, which corrects for
+coordinated omission, and the service time from the actual send is reported
+alongside it.
+
+The default mix models an on-sale: a polling storm on ``/events/{id}/seats``,
+contended ``POST /bookings`` on a small window of hot seats, and background
+``GET /events`` listing. Run in-process with ``python -m benchmarks.loadgen`` or
+against a server with ``--url http://127.0.0.1:8000`` (raise its
+``RATE_LIMIT_MAX_REQUESTS`` first, or most requests will be 429s). Needs
+``httpx``, from the ``benchmark`` extra (``uv sync --extra benchmark``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+import httpx
+
+# In-process, every request comes from one client address; lift its rate limit before the service reads its settings.
+os.environ["RATE_LIMIT_MAX_REQUESTS"] = "1000000000"
+
+from ticketing_service import main as service
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class Workload:
+    """Builds the request for each scenario from the events created for the run."""
+
+    def __init__(
+        self,
+        event_ids: list[str],
+        hot_seats: int,
+        max_seats_per_booking: int,
+        seats_detail: str,
+        rng: random.Random,
+    ) -> None:
+        self._event_ids = event_ids
+        self._hot_seats = hot_seats
+        self._max_seats_per_booking = max_seats_per_booking
+        self._seats_detail = seats_detail
+        self._rng = rng
+
+    def request(self, scenario: str) -> tuple[str, str, dict | None, dict | None]:
+        event_id = self._rng.choice(self._event_ids)
+        if scenario == "seats":
+            return "GET", f"/events/{event_id}/seats", {"detail": self._seats_detail}, None
+        if scenario == "book":
+            # Short runs of adjacent seats inside the hot window overlap with each other.
+            count = self._rng.randint(1, self._max_seats_per_booking)
+            first = self._rng.randint(1, max(1, self._hot_seats - count + 1))
+            return "POST", "/bookings", None, {"event_id": event_id, "seats": list(range(first, first + count))}
+        if scenario == "list":
+            return "GET", "/events", {"limit": 50}, None
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"seats", "book", "list"}
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return mix
+
+
+async def create_events(client: httpx.AsyncClient, count: int, seats: int) -> list[str]:
+    event_ids = []
+    for index in range(count):
+        response = await client.post(
+            "/events",
+            json={
+                "name": f"On-sale {index}",
+                "starts_at": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+                "venue": "Load Hall",
+                "total_seats": seats,
+            },
+        )
+        response.raise_for_status()
+        event_ids.append(response.json()["id"])
+    return event_ids
+
+
+async def issue(
+    client: httpx.AsyncClient,
+    scenario: str,
+    spec: tuple[str, str, dict | None, dict | None],
+    scheduled: float,
+    samples: list[tuple[str, int, float, float]],
+) -> None:
+    method, path, params, body = spec
+    sent = perf_counter()
+    try:
+        status = (await client.request(method, path, params=params, json=body)).status_code
+    except httpx.HTTPError:
+        status = 0
+    done = perf_counter()
+    samples.append((scenario, status, done - scheduled, done - sent))
+
+
+async def generate(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    mix: dict[str, float],
+    rate: float,
+    duration: float,
+    poisson: bool,
+    rng: random.Random,
+) -> tuple[list[tuple[str, int, float, float]], float, float]:
+    """Issue requests on schedule for ``duration`` seconds; returns samples, elapsed time and the worst dispatch lag."""
+    scenarios, weights = list(mix), list(mix.values())
+    samples: list[tuple[str, int, float, float]] = []
+    pending: set[asyncio.Task] = set()
+    started = scheduled = perf_counter()
+    deadline = started + duration
+    max_lag = 0.0
+    while scheduled < deadline:
+        delay = scheduled - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # Behind schedule: fire at once, but still let in-flight requests run.
+            max_lag = max(max_lag, -delay)
+            await asyncio.sleep(0)
+        scenario = rng.choices(scenarios, weights)[0]
+        task = asyncio.create_task(issue(client, scenario, workload.request(scenario), scheduled, samples))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        scheduled += rng.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*pending)
+    return samples, perf_counter() - started, max_lag
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def report(samples: list[tuple[str, int, float, float]], elapsed: float, max_lag: float) -> None:
+    header = " ".join(f"{f'p{q:g}':>8}" for q in PERCENTILES)
+    print(
+        f"{'scenario':>8} {'sent':>7} {'2xx':>7} {'409':>6} {'429':>6} {'other':>6} {header} {'max':>8} {'svc p99':>8}"
+    )
+    for scenario in sorted({sample[0] for sample in samples}) + ["all"]:
+        selected = [sample for sample in samples if scenario in ("all", sample[0])]
+        statuses = Counter(sample[1] for sample in selected)
+        ok = sum(count for code, count in statuses.items() if 200 <= code < 300)
+        other = len(selected) - ok - statuses[409] - statuses[429]
+        latencies = sorted(sample[2] * 1e3 for sample in selected)
+        service_times = sorted(sample[3] * 1e3 for sample in selected)
+        columns = " ".join(f"{percentile(latencies, q):>8.1f}" for q in PERCENTILES)
+        print(
+            f"{scenario:>8} {len(selected):>7} {ok:>7} {statuses[409]:>6} {statuses[429]:>6} {other:>6} "
+            f"{columns} {latencies[-1]:>8.1f} {percentile(service_times, 99):>8.1f}"
+        )
+    bookings = [sample for sample in samples if sample[0] == "book"]
+    if bookings:
+        conflicts = sum(1 for sample in bookings if sample[1] == 409)
+        print(f"booking conflict rate: {conflicts / len(bookings):.1%}")
+    print(f"latency in ms from the scheduled start, svc p99 from the actual send; {len(samples) / elapsed:,.0f} req/s")
+    print(f"worst dispatch lag {max_lag * 1e3:,.1f} ms (large values mean the generator itself fell behind)")
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.url:
+        transport = None
+        limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    else:
+        # In-process the generator shares the app's event loop, so past saturation it falls behind too;
+        # latency still counts from the schedule, and the dispatch lag shows by how much.
+        logging.getLogger("ticketing_service").setLevel(logging.WARNING)
+        transport = httpx.ASGITransport(app=service.app)
+        limits = httpx.Limits()
+    async with httpx.AsyncClient(
+        base_url=args.url or "http://loadgen",
+        transport=transport,
+        limits=limits,
+        timeout=args.timeout,
+    ) as client:
+        event_ids = await create_events(client, args.events, args.seats)
+        hot_seats = min(args.hot_seats, args.seats)
+        workload = Workload(event_ids, hot_seats, args.max_seats_per_booking, args.seats_detail, rng)
+        samples, elapsed, max_lag = await generate(
+            client, workload, args.mix, args.rate, args.duration, args.arrival == "poisson", rng
+        )
+    report(samples, elapsed, max_lag)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="", help="base URL of a running server; in-process ASGI when omitted")
+    parser.add_argument("--rate", type=float, default=500.0, help="arrivals per second across all scenarios")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("seats=0.85,book=0.1,list=0.05"))
+    parser.add_argument("--events", type=int, default=1)
+    parser.add_argument("--seats", type=int, default=10_000, help="seats per event")
+    parser.add_argument("--hot-seats", type=int, default=500, help="bookings pick seats from 1..hot-seats")
+    parser.add_argument("--max-seats-per-booking", type=int, default=4)
+    parser.add_argument("--seats-detail", choices=["count", "list", "range"], default="count")
+    parser.add_argument("--connections", type=int, default=100, help="connection pool size for --url")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Booking throughput as the number of concurrently booked events grows.
+
+Compares a single repository-wide lock (``lock_stripes=1``) with the default
+striped locking. Run with ``python -m benchmarks.lock_contention``.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+from time import perf_counter
+from uuid import uuid4
+
+from ticketing_service.repositories import BookingRepository
+
+
+def run(lock_stripes: int, events: int, threads: int, bookings_per_thread: int) -> float:
+    repository = BookingRepository(lock_stripes=lock_stripes)
+    event_ids = [uuid4() for _ in range(events)]
+    capacity = threads * bookings_per_thread
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        event_id = event_ids[index % events]
+        # Threads sharing an event book disjoint seats so every reserve succeeds.
+        first_seat = (index // events) * bookings_per_thread + 1
+        barrier.wait()
+        for seat in range(first_seat, first_seat + bookings_per_thread):
+            repository.reserve(event_id=event_id, seats=[seat], total_seats=capacity)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - started
+    return threads * bookings_per_thread / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--bookings-per-thread", type=int, default=5_000)
+    parser.add_argument("--events", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{'events':>6} {'global lock/s':>14} {'striped/s':>12} {'speedup':>8}")
+    for events in args.events:
+        global_rate = run(1, events, args.threads, args.bookings_per_thread)
+        striped_rate = run(64, events, args.threads, args.bookings_per_thread)
+        print(f"{events:>6} {global_rate:>14,.0f} {striped_rate:>12,.0f} {striped_rate / global_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
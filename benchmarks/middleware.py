@@ -0,0 +1,150 @@
+"""Per-request overhead of the request middleware.
+
+Compares the previous ``BaseHTTPMiddleware`` function with synchronous access
+logging (kept below for reference) against ``RequestMiddleware`` with queued
+logging. Requests are driven straight through the ASGI app in-process, so the
+numbers are framework overhead without any network I/O. Run with
+``python -m benchmarks.middleware``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+from time import perf_counter
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware.base import RequestResponseEndpoint
+
+from ticketing_service import main as service
+from ticketing_service.api.runtime import RateLimiter, RequestMiddleware, _DeferredQueueHandler
+from ticketing_service.api.schemas import ErrorResponse
+
+
+def create_request_middleware(
+    rate_limiter: RateLimiter,
+    max_body_bytes: int,
+    logger: logging.Logger,
+) -> Callable[[Request, RequestResponseEndpoint], Response]:
+    async def middleware(request: Request, call_next: RequestResponseEndpoint) -> Response:
+        request_id = request.headers.get("x-request-id") or str(uuid4())
+        request.state.request_id = request_id
+        client_host = request.client.host if request.client else "unknown"
+
+        if not rate_limiter.allow(client_host):
+            response = ErrorResponse(error="Too Many Requests", detail="Rate limit exceeded.")
+            return JSONResponse(status_code=429, content=response.model_dump())
+
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > max_body_bytes:
+            response = ErrorResponse(error="Payload Too Large", detail="Request body exceeds size limit.")
+            return JSONResponse(status_code=413, content=response.model_dump())
+
+        response = await call_next(request)
+        response.headers["X-Request-Id"] = request_id
+        logger.info("%s %s %s", request.method, request.url.path, response.status_code)
+        return response
+
+    return middleware
+
+
+def build_app(variant: str, sink) -> tuple[FastAPI, QueueListener | None]:
+    app = FastAPI()
+    app.router.routes.extend(service.app.router.routes)
+    logger = logging.getLogger(f"benchmarks.middleware.{variant}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    stream_handler = logging.StreamHandler(sink)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(message)s]"))
+    rate_limiter = RateLimiter(max_requests=1_000_000_000, window_seconds=60)
+    listener = None
+    if variant == "before":
+        logger.addHandler(stream_handler)
+        app.middleware("http")(create_request_middleware(rate_limiter, max_body_bytes=1_000_000, logger=logger))
+    else:
+        log_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        listener = QueueListener(log_queue, stream_handler)
+        listener.start()
+        app.add_middleware(RequestMiddleware, rate_limiter=rate_limiter, max_body_bytes=1_000_000, logger=logger)
+    return app, listener
+
+
+async def drive(app: FastAPI, method: str, path: str, bodies: list[bytes]) -> float:
+    """Send one request per body and return the mean microseconds per request."""
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start" and message["status"] >= 300:
+            raise RuntimeError(f"{method} {path} returned {message['status']}")
+
+    started = perf_counter()
+    for body in bodies:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive() -> dict:
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        await app(scope, receive, send)
+    return (perf_counter() - started) / len(bodies) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    event = service.event_repository.create(
+        name="Benchmark",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Bench Hall",
+        total_seats=100_000,
+    )
+    seats = iter(range(1, 100_001))
+
+    def booking_body() -> bytes:
+        return json.dumps({"event_id": str(event.id), "seats": [next(seats)]}).encode()
+
+    print(f"{'endpoint':>14} {'before us/req':>14} {'after us/req':>13} {'speedup':>8}")
+    with open(os.devnull, "w") as sink:
+        apps = {variant: build_app(variant, sink) for variant in ("before", "after")}
+        for label, method, path, make_body in (
+            ("GET /health", "GET", "/health", lambda: b""),
+            ("POST /bookings", "POST", "/bookings", booking_body),
+        ):
+            timings = {}
+            for variant, (app, _) in apps.items():
+                bodies = [make_body() for _ in range(args.requests)]
+                asyncio.run(drive(app, method, path, bodies[:100]))
+                timings[variant] = asyncio.run(drive(app, method, path, bodies[100:]))
+            before, after = timings["before"], timings["after"]
+            print(f"{label:>14} {before:>14.1f} {after:>13.1f} {before / after:>7.2f}x")
+        for _, listener in apps.values():
+            if listener is not None:
+                listener.stop()
+
+
+if __name__ == "__main__":
+    main()
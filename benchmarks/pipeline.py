@@ -0,0 +1,95 @@
+"""Booking throughput and latency: direct ``reserve`` calls versus the batching pipeline.
+
+Every thread books single seats on a few hot events, as ``POST /bookings`` does
+behind the threadpool. Run with ``python -m benchmarks.pipeline``; pass
+``--wal always`` to include a durable log, where one sync per batch matters most.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+from ticketing_service.pipeline import BookingPipeline
+from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.wal import open_wal
+
+
+def run(
+    mode: str,
+    threads: int,
+    bookings_per_thread: int,
+    events: int,
+    wal: str,
+    max_batch: int,
+    max_delay: float,
+) -> tuple[float, float, float]:
+    repository = BookingRepository()
+    with tempfile.TemporaryDirectory() as directory:
+        log = open_wal(Path(directory) / "bench.wal", EventRepository(), repository, fsync_policy=wal) if wal else None
+        pipeline = BookingPipeline(repository, max_batch=max_batch, max_delay=max_delay) if mode == "pipeline" else None
+        reserve = pipeline.reserve if pipeline is not None else repository.reserve
+        event_ids = [uuid4() for _ in range(events)]
+        capacity = threads * bookings_per_thread
+        latencies: list[list[float]] = [[] for _ in range(threads)]
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(index: int) -> None:
+            event_id = event_ids[index % events]
+            first_seat = (index // events) * bookings_per_thread + 1
+            timings = latencies[index]
+            barrier.wait()
+            for seat in range(first_seat, first_seat + bookings_per_thread):
+                started = perf_counter()
+                reserve(event_id, [seat], total_seats=capacity)
+                timings.append(perf_counter() - started)
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        started = perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = perf_counter() - started
+        if pipeline is not None:
+            pipeline.close()
+        if log is not None:
+            log.close()
+
+    samples = sorted(sample for timings in latencies for sample in timings)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(len(samples) - 1, len(samples) * 99 // 100)]
+    return len(samples) / elapsed, p50 * 1e6, p99 * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--bookings-per-thread", type=int, default=2_000)
+    parser.add_argument("--events", type=int, default=2)
+    parser.add_argument("--wal", choices=["", "always", "batched", "os"], default="")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-us", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'mode':>9} {'bookings/s':>11} {'p50 us':>8} {'p99 us':>8}")
+    for threads in args.threads:
+        for mode in ("direct", "pipeline"):
+            rate, p50, p99 = run(
+                mode,
+                threads,
+                args.bookings_per_thread,
+                args.events,
+                args.wal,
+                args.max_batch,
+                args.max_delay_us / 1_000_000,
+            )
+            print(f"{threads:>7} {mode:>9} {rate:>11,.0f} {p50:>8,.0f} {p99:>8,.0f}")
+
+
+if __name__ == "__main__":
+    main()
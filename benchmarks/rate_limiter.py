@@ -0,0 +1,105 @@
+"""Rate limiter throughput and memory with many distinct clients.
+
+Compares the GCRA ``RateLimiter`` with the deque-per-client sliding window it
+replaced, kept below for reference: single-threaded throughput, memory per
+client (traced separately, since tracing slows allocation) and the longest
+pause spent expiring idle clients. Run with ``python -m benchmarks.rate_limiter``.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from collections import defaultdict, deque
+from threading import Lock
+from time import perf_counter, time
+
+from ticketing_service.api.runtime import RateLimiter
+
+
+class DequeRateLimiter:
+    def __init__(self, max_requests: int, window_seconds: int) -> None:
+        self._max_requests = max_requests
+        self._window_seconds = window_seconds
+        self._buckets: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = Lock()
+        self._last_cleanup = time()
+
+    def _cleanup_stale_buckets(self, now: float) -> None:
+        keys_to_delete = []
+        for key, bucket in self._buckets.items():
+            if bucket and (now - bucket[-1] > self._window_seconds):
+                keys_to_delete.append(key)
+
+        for key in keys_to_delete:
+            del self._buckets[key]
+
+        self._last_cleanup = now
+
+    def allow(self, key: str) -> bool:
+        now = time()
+        with self._lock:
+            if now - self._last_cleanup > 60:
+                self._cleanup_stale_buckets(now)
+
+            bucket = self._buckets[key]
+            while bucket and now - bucket[0] > self._window_seconds:
+                bucket.popleft()
+
+            if len(bucket) >= self._max_requests:
+                return False
+
+            bucket.append(now)
+        return True
+
+
+def run(limiter_type: type, clients: int, requests_per_client: int, max_requests: int) -> tuple[float, float, float]:
+    """Return requests per second, bytes per tracked client and the longest expiry pause in ms."""
+    keys = [f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}" for index in range(clients)]
+    limiter = limiter_type(max_requests=max_requests, window_seconds=60)
+    allow = limiter.allow
+    started = perf_counter()
+    for _ in range(requests_per_client):
+        for key in keys:
+            allow(key)
+    rate = clients * requests_per_client / (perf_counter() - started)
+
+    # Expiry: the deque limiter sweeps every client, GCRA retires a whole generation.
+    if isinstance(limiter, DequeRateLimiter):
+        started = perf_counter()
+        limiter._cleanup_stale_buckets(time())
+    else:
+        for shard in limiter._shards:
+            shard.rotate_at = 0.0
+        started = perf_counter()
+        allow(keys[0])
+    pause = (perf_counter() - started) * 1000
+
+    del limiter, allow
+    gc.collect()
+    tracemalloc.start()
+    limiter = limiter_type(max_requests=max_requests, window_seconds=60)
+    for _ in range(min(requests_per_client, max_requests)):
+        for key in keys:
+            limiter.allow(key)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rate, memory / clients, pause
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--max-requests", type=int, nargs="+", default=[10, 100])
+    args = parser.parse_args()
+
+    print(f"{'limit':>6} {'limiter':>8} {'requests/s':>12} {'bytes/client':>13} {'expiry pause ms':>16}")
+    for max_requests in args.max_requests:
+        for name, limiter_type in (("deque", DequeRateLimiter), ("gcra", RateLimiter)):
+            rate, memory, pause = run(limiter_type, args.clients, args.requests_per_client, max_requests)
+            print(f"{max_requests:>6} {name:>8} {rate:>12,.0f} {memory:>13,.0f} {pause:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cold-start recovery time: full log replay versus snapshot plus log tail.
+
+Run with ``python -m benchmarks.recovery``. Populating 1M bookings takes a while;
+pass ``--bookings`` to try smaller sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+
+from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.snapshots import load_snapshot, write_snapshot
+from ticketing_service.wal import FsyncPolicy, WriteAheadLog, open_wal, replay
+
+SEATS_PER_EVENT = 100_000
+
+
+def populate(wal_path: Path, bookings: int) -> tuple[EventRepository, BookingRepository, list]:
+    events, repository = EventRepository(), BookingRepository()
+    log = open_wal(wal_path, events, repository, fsync_policy=FsyncPolicy.OS)
+    created = [
+        events.create(
+            name=f"Arena {index}",
+            starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+            venue="Arena",
+            total_seats=SEATS_PER_EVENT,
+        )
+        for index in range((bookings + SEATS_PER_EVENT - 1) // SEATS_PER_EVENT)
+    ]
+    for index in range(bookings):
+        event = created[index // SEATS_PER_EVENT]
+        repository.reserve(event_id=event.id, seats=[index % SEATS_PER_EVENT + 1], total_seats=SEATS_PER_EVENT)
+    log.close()
+    return events, repository, created
+
+
+def timed(label: str, action) -> float:
+    started = perf_counter()
+    action()
+    elapsed = perf_counter() - started
+    print(f"{label:<34} {elapsed:>8.2f}s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=10_000, help="bookings logged after the snapshot")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        wal_path = Path(directory) / "bench.wal"
+        snapshot_path = Path(directory) / "bench.snapshot"
+        events, repository, created = {}, {}, []
+
+        def build() -> None:
+            nonlocal events, repository, created
+            events, repository, created = populate(wal_path, args.bookings)
+
+        timed(f"populate {args.bookings:,} bookings", build)
+        last_lsn = 0
+
+        def replay_everything() -> None:
+            nonlocal last_lsn
+            last_lsn = replay(wal_path, EventRepository(), BookingRepository())
+
+        timed("full log replay", replay_everything)
+
+        # Snapshot the populated state, then cancel a tail of bookings so the log has new records.
+        log = WriteAheadLog(wal_path, fsync_policy=FsyncPolicy.OS, next_lsn=last_lsn + 1)
+        events.attach_wal(log)
+        repository.attach_wal(log)
+        timed("write snapshot", lambda: write_snapshot(snapshot_path, events, repository, log))
+        for booking in repository.page_by_event(created[0].id, offset=0, limit=args.tail):
+            repository.cancel(booking.id)
+        log.close()
+        print(f"{'snapshot size':<34} {snapshot_path.stat().st_size / 1e6:>7.1f}MB")
+
+        def recover() -> None:
+            restored_events, restored_bookings = EventRepository(), BookingRepository()
+            after_lsn = load_snapshot(snapshot_path, restored_events, restored_bookings)
+            replay(wal_path, restored_events, restored_bookings, after_lsn=after_lsn)
+
+        timed(f"snapshot + {args.tail:,}-record tail", recover)
+
+
+if __name__ == "__main__":
+    main()
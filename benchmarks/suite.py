@@ -0,0 +1,281 @@
+"""Scale benchmarks for bookings and the read endpoints, checked against a stored baseline.
+
+Covers ``BookingRepository.reserve`` from 1k to 1M bookings, every
+``GET /events/{id}/seats`` detail mode at 1k, 10k and 100k seats, and deep
+pages of ``GET /events`` and ``GET /events/{id}/bookings``. Each case records
+throughput, p50/p99 latency and the peak memory traced while it runs; memory is
+measured in a separate tracemalloc pass so tracing never skews the timings, and
+each case keeps the fastest of ``--repeat`` timed passes to damp scheduler noise.
+Requests go straight through the ASGI app in-process, without network I/O and
+with the availability cache disabled so every request renders.
+
+Results are compared with ``benchmarks/baseline.json``. Any case that is slower
+or larger than the baseline allows prints ``REGRESSION`` and makes the run exit
+with status 1. Run with ``python -m benchmarks.suite``; ``--profile quick``
+skips the largest sizes and ``--update-baseline`` records the current numbers.
+Baselines are only comparable on the machine that recorded them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+
+# Benchmarks hammer a single client address, so lift its rate limit before the service reads its settings.
+os.environ["RATE_LIMIT_MAX_REQUESTS"] = "1000000000"
+
+from ticketing_service import main as service
+from ticketing_service.api.cache import ResponseCache
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+BASELINE = Path(__file__).with_name("baseline.json")
+SEATS_PER_EVENT = 100_000
+PROFILES = {
+    "quick": {"bookings": [1_000, 10_000, 100_000], "seats": [1_000, 10_000, 100_000], "events": [1_000, 10_000]},
+    "full": {
+        "bookings": [1_000, 10_000, 100_000, 1_000_000],
+        "seats": [1_000, 10_000, 100_000],
+        "events": [1_000, 10_000, 100_000],
+    },
+}
+# Higher is better for throughput; lower is better for everything else.
+HIGHER_IS_BETTER = {"ops_per_sec"}
+
+
+def summarize(run: Callable[[list[float]], object], repeat: int, peak_bytes: int) -> dict[str, float]:
+    """Time ``repeat`` passes of ``run``, which appends one sample per operation, and keep the fastest."""
+    best: tuple[float, list[float]] | None = None
+    for _ in range(repeat):
+        samples: list[float] = []
+        started = perf_counter()
+        run(samples)
+        elapsed = perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = elapsed, samples
+    elapsed, samples = best
+    samples.sort()
+    return {
+        "ops_per_sec": round(len(samples) / elapsed, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p99_us": round(samples[min(len(samples) - 1, len(samples) * 99 // 100)] * 1e6, 2),
+        "peak_kib": round(peak_bytes / 1024, 1),
+    }
+
+
+def traced_peak(action: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        action()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def create_event(events: EventRepository, total_seats: int):
+    return events.create(
+        name="Benchmark",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Bench Hall",
+        total_seats=total_seats,
+    )
+
+
+def populate(bookings: int, samples: list[float] | None = None) -> tuple[EventRepository, BookingRepository, list]:
+    """Book ``bookings`` single seats across events of ``SEATS_PER_EVENT`` seats each."""
+    events, repository = EventRepository(), BookingRepository()
+    event_count = (bookings + SEATS_PER_EVENT - 1) // SEATS_PER_EVENT
+    created = [create_event(events, SEATS_PER_EVENT) for _ in range(event_count)]
+    reserve = repository.reserve
+    for index in range(bookings):
+        event_id = created[index // SEATS_PER_EVENT].id
+        seat = index % SEATS_PER_EVENT + 1
+        started = perf_counter()
+        reserve(event_id, [seat], total_seats=SEATS_PER_EVENT)
+        if samples is not None:
+            samples.append(perf_counter() - started)
+    return events, repository, created
+
+
+def bench_reserve(bookings: int, repeat: int) -> dict[str, float]:
+    return summarize(lambda samples: populate(bookings, samples), repeat, traced_peak(lambda: populate(bookings)))
+
+
+async def request(path: str, query: str, body: bytearray | None = None) -> None:
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"GET {path}?{query} returned {message['status']}")
+        if message["type"] == "http.response.body" and body is not None:
+            body.extend(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    await service.app(scope, receive, send)
+
+
+def bench_requests(requests: list[tuple[str, str]], repeat: int) -> dict[str, float]:
+    async def run(samples: list[float] | None) -> None:
+        for path, query in requests:
+            started = perf_counter()
+            await request(path, query)
+            if samples is not None:
+                samples.append(perf_counter() - started)
+
+    # Warm up first so lazily built indexes and caches count once, not in the traced peak.
+    asyncio.run(run(None))
+    peak = traced_peak(lambda: asyncio.run(run(None)))
+    return summarize(lambda samples: asyncio.run(run(samples)), repeat, peak)
+
+
+def install(events: EventRepository, bookings: BookingRepository) -> None:
+    service.event_repository = events
+    service.booking_repository = bookings
+
+
+def cursor_pages(path: str, limit: int, pages: int) -> list[tuple[str, str]]:
+    """Follow ``next_cursor`` from the first page, collecting up to ``pages`` page requests."""
+    requests = [(path, f"limit={limit}")]
+    while len(requests) < pages:
+        body = bytearray()
+        asyncio.run(request(*requests[-1], body))
+        next_cursor = json.loads(body)["next_cursor"]
+        if next_cursor is None:
+            break
+        requests.append((path, f"limit={limit}&cursor={next_cursor}"))
+    return requests
+
+
+def run_suite(profile: dict[str, list[int]], requests_per_case: int, repeat: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    rng = random.Random(7)
+
+    def record(name: str, result: dict[str, float]) -> None:
+        results[name] = result
+        print(f"  {name:<34} {result['ops_per_sec']:>12,.0f}/s {result['p50_us']:>10,.1f} {result['p99_us']:>10,.1f} "
+              f"{result['peak_kib']:>12,.0f}", flush=True)
+
+    print(f"  {'case':<34} {'throughput':>14} {'p50 us':>10} {'p99 us':>10} {'peak KiB':>12}")
+    for bookings in profile["bookings"]:
+        record(f"reserve/{bookings}", bench_reserve(bookings, repeat))
+        events, repository, created = populate(bookings)
+        install(events, repository)
+        path = f"/events/{created[0].id}/bookings"
+        count = min(bookings, SEATS_PER_EVENT)
+        offsets = [rng.randrange(0, max(1, count - 50)) for _ in range(requests_per_case)]
+        pages = [(path, f"offset={offset}&limit=50") for offset in offsets]
+        record(f"event_bookings/offset/{bookings}", bench_requests(pages, repeat))
+        record(f"event_bookings/cursor/{bookings}", bench_requests(cursor_pages(path, 50, requests_per_case), repeat))
+
+    for seats in profile["seats"]:
+        events, repository = EventRepository(), BookingRepository()
+        event = create_event(events, seats)
+        # Half the seats booked at random leaves the most fragmented free ranges.
+        for seat in rng.sample(range(1, seats + 1), seats // 2):
+            repository.reserve(event.id, [seat], total_seats=seats)
+        install(events, repository)
+        path = f"/events/{event.id}/seats"
+        for detail, query in (
+            ("count", "detail=count"),
+            ("list", f"detail=list&offset={seats // 4}&limit=1000"),
+            ("range", "detail=range"),
+        ):
+            record(f"seats/{detail}/{seats}", bench_requests([(path, query)] * requests_per_case, repeat))
+
+    for count in profile["events"]:
+        events = EventRepository()
+        for _ in range(count):
+            create_event(events, 100)
+        install(events, BookingRepository())
+        offsets = [rng.randrange(0, max(1, count - 50)) for _ in range(requests_per_case)]
+        pages = [("/events", f"offset={offset}&limit=50") for offset in offsets]
+        record(f"events/offset/{count}", bench_requests(pages, repeat))
+        record(f"events/cursor/{count}", bench_requests(cursor_pages("/events", 50, requests_per_case), repeat))
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric, value in result.items():
+            reference = expected.get(metric)
+            if not reference:
+                continue
+            # Tail latency is noisier than the median, so it gets twice the slack.
+            allowed = memory_tolerance if metric == "peak_kib" else tolerance * (2 if metric == "p99_us" else 1)
+            if metric in HIGHER_IS_BETTER:
+                regressed = value < reference * (1 - allowed)
+            else:
+                regressed = value > reference * (1 + allowed)
+            if regressed:
+                regressions.append(f"{name} {metric}: {value:,.1f} vs baseline {reference:,.1f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="full")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint case")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per case; the fastest is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown, e.g. 0.3 for 30%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1, help="allowed growth in peak memory")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    logging.getLogger("ticketing_service").setLevel(logging.WARNING)
+    service.availability_cache = ResponseCache(max_entries=0)
+    results = run_suite(PROFILES[args.profile], args.requests, args.repeat)
+
+    if args.update_baseline:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        stored["python"] = platform.python_version()
+        stored.setdefault("results", {}).update(results)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.tolerance,
+                          args.memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
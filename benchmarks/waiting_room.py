@@ -0,0 +1,62 @@
+"""Waiting room cost per operation and memory as the queue grows to a million clients.
+
+Joins ``--clients`` tickets into one queue and times joining and checking a
+token (what the admission middleware does per booking request and what a
+position poll costs) at the front and at the back of the queue. Memory is what
+the waiting room itself holds; tokens live with the clients. Run with
+``python -m benchmarks.waiting_room``.
+"""
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from time import perf_counter
+from uuid import uuid4
+
+from ticketing_service.api.admission import WaitingRoom
+
+
+def per_call(function, arguments: list, repeat: int = 1) -> float:
+    started = perf_counter()
+    for _ in range(repeat):
+        for argument in arguments:
+            function(argument)
+    return (perf_counter() - started) / (len(arguments) * repeat) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    room = WaitingRoom()
+    event_id = uuid4()
+    room.open(event_id, rate_per_second=500, burst=100)
+    sample = 1000
+    join_front = per_call(room.join, [event_id] * sample)
+    front_tokens = [room.join(event_id).token for _ in range(sample)]
+    for _ in range(args.clients - 3 * sample):
+        room.join(event_id)
+    join_back = per_call(room.join, [event_id] * sample)
+    back_tokens = [room.join(event_id).token for _ in range(sample)]
+    state = room.state(event_id)
+    print(f"{state.issued:,} tickets issued, {state.admitted:,} admitted")
+    print(f"{'operation':>12} {'front us':>9} {'back us':>8}")
+    print(f"{'join':>12} {join_front:>9.2f} {join_back:>8.2f}")
+    check_front, check_back = per_call(room.check, front_tokens, 5), per_call(room.check, back_tokens, 5)
+    print(f"{'check token':>12} {check_front:>9.2f} {check_back:>8.2f}")
+
+    # Tracing slows allocation, so memory is measured on a separate, smaller run.
+    for clients in (1_000, args.clients // 10):
+        tracemalloc.start()
+        room = WaitingRoom()
+        room.open(event_id, rate_per_second=500, burst=100)
+        for _ in range(clients):
+            room.join(event_id)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"waiting room memory after {clients:,} joins: {memory:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import math
+import secrets
+import struct
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from uuid import UUID
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ticketing_service.api.asgi import send_error
+from ticketing_service.sharding import client_key
+
+# Event id, ticket number and queue epoch, followed by a truncated HMAC of them and the client's key.
+_TOKEN = struct.Struct("<16sQI")
+_MAC_BYTES = 16
+_GUARDED = frozenset({"/bookings", "/bookings/holds", "/bookings/best-available", "/bookings:batch"})
+
+
+@dataclass(frozen=True, slots=True)
+class QueueTicket:
+    event_id: UUID
+    token: str
+    number: int
+    position: int
+    eta_seconds: float
+    admitted: bool
+    expired: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class WaitingRoomState:
+    rate_per_second: float
+    burst: int
+    admission_ttl_seconds: int
+    issued: int
+    admitted: int
+
+
+class WaitingRoom:
+    """FIFO admission for flagged events, kept as two counters per event instead of a queue.
+
+    Joining hands out the next ticket number in a signed token. A "now serving"
+    number advances at ``rate_per_second`` and admits every ticket it passes,
+    so position and ETA are simple arithmetic and nothing is stored per waiting
+    client: a million tickets cost the same as one. Up to ``burst`` tickets are
+    admitted straight away when nobody is waiting. A token only works for the
+    client that joined, and once admitted it is good for one booking request
+    within ``admission_ttl_seconds`` of its turn. Only claimed tickets are
+    remembered, and only until they would have expired anyway.
+    """
+
+    def __init__(self, secret: bytes | None = None) -> None:
+        self._secret = secret or secrets.token_bytes(32)
+        self._queues: dict[UUID, _Queue] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._queues)
+
+    def open(self, event_id: UUID, rate_per_second: float, burst: int = 0, admission_ttl_seconds: int = 600) -> None:
+        """Flag an event, or change the pace of its existing queue without losing anyone's place."""
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive.")
+        queue = self._queues.get(event_id)
+        if queue is None:
+            self._queues[event_id] = _Queue(rate_per_second, burst, admission_ttl_seconds, time())
+        else:
+            queue.configure(rate_per_second, burst, admission_ttl_seconds, time())
+
+    def close(self, event_id: UUID) -> bool:
+        return self._queues.pop(event_id, None) is not None
+
+    def is_gated(self, event_id: UUID) -> bool:
+        return event_id in self._queues
+
+    def state(self, event_id: UUID) -> WaitingRoomState | None:
+        queue = self._queues.get(event_id)
+        if queue is None:
+            return None
+        serving = queue.serving(time())
+        return WaitingRoomState(
+            rate_per_second=queue.rate,
+            burst=queue.burst,
+            admission_ttl_seconds=queue.ttl,
+            issued=queue.issued,
+            admitted=min(queue.issued, math.floor(serving)),
+        )
+
+    def join(self, event_id: UUID, client: str = "") -> QueueTicket:
+        queue = self._queues.get(event_id)
+        if queue is None:
+            raise KeyError(event_id)
+        now = time()
+        number = queue.issue(now)
+        payload = _TOKEN.pack(event_id.bytes, number, queue.epoch)
+        token = _encode(payload) + "." + _encode(self._sign(payload, client))
+        return self._ticket(queue, event_id, token, number, now)
+
+    def check(self, token: str, client: str = "") -> QueueTicket:
+        """Return where ``token`` stands.
+
+        Raises ``ValueError`` if it is forged, was issued to another client or its queue is gone.
+        """
+        encoded_payload, _, encoded_mac = token.partition(".")
+        try:
+            payload = _decode(encoded_payload)
+            mac = _decode(encoded_mac)
+            event_bytes, number, epoch = _TOKEN.unpack(payload)
+        except (ValueError, struct.error) as exc:
+            raise ValueError("Invalid queue token.") from exc
+        if not hmac.compare_digest(mac, self._sign(payload, client)):
+            raise ValueError("Invalid queue token.")
+        event_id = UUID(bytes=event_bytes)
+        queue = self._queues.get(event_id)
+        if queue is None or queue.epoch != epoch:
+            raise ValueError("Invalid queue token.")
+        return self._ticket(queue, event_id, token, number, time())
+
+    def claim(self, ticket: QueueTicket) -> bool:
+        """Spend an admitted ticket; ``False`` if it is already spent or its queue is gone."""
+        queue = self._queues.get(ticket.event_id)
+        return queue is not None and queue.claim(ticket.number, time())
+
+    def release(self, ticket: QueueTicket) -> None:
+        """Hand a claimed ticket back, e.g. when the request it admitted booked nothing."""
+        queue = self._queues.get(ticket.event_id)
+        if queue is not None:
+            queue.release(ticket.number)
+
+    def _ticket(self, queue: _Queue, event_id: UUID, token: str, number: int, now: float) -> QueueTicket:
+        # Ticket ``n`` is admitted once the serving number reaches ``n + 1``.
+        remaining = number + 1 - queue.serving(now)
+        if remaining <= 0:
+            # Seconds since the ticket's turn, measured at the current pace.
+            expired = (queue.raw_serving(now) - number - 1) / queue.rate > queue.ttl
+            return QueueTicket(event_id, token, number, position=0, eta_seconds=0.0, admitted=True, expired=expired)
+        return QueueTicket(
+            event_id,
+            token,
+            number,
+            position=math.ceil(remaining),
+            eta_seconds=remaining / queue.rate,
+            admitted=False,
+        )
+
+    def _sign(self, payload: bytes, client: str) -> bytes:
+        # The payload has a fixed size, so the client's key can follow it without a separator.
+        return hmac.digest(self._secret, payload + client.encode(), hashlib.sha256)[:_MAC_BYTES]
+
+
+class _Queue:
+    __slots__ = ("lock", "epoch", "issued", "rate", "burst", "ttl", "base", "base_at", "claimed", "prune_at")
+
+    def __init__(self, rate: float, burst: int, ttl: int, now: float) -> None:
+        self.lock = Lock()
+        # Tokens from an earlier queue for the same event stop matching once it is reopened.
+        self.epoch = secrets.randbits(32)
+        self.issued = 0
+        self.rate = rate
+        self.burst = burst
+        self.ttl = ttl
+        self.base = float(burst)
+        self.base_at = now
+        self.claimed: set[int] = set()
+        self.prune_at = 1024
+
+    def raw_serving(self, now: float) -> float:
+        return self.base + (now - self.base_at) * self.rate
+
+    def serving(self, now: float) -> float:
+        # Capped so an idle queue does not bank admissions beyond the burst.
+        return min(self.raw_serving(now), self.issued + self.burst)
+
+    def issue(self, now: float) -> int:
+        with self.lock:
+            cap = self.issued + self.burst
+            if self.raw_serving(now) > cap:
+                self.base, self.base_at = cap, now
+            number = self.issued
+            self.issued += 1
+        return number
+
+    def claim(self, number: int, now: float) -> bool:
+        with self.lock:
+            if number in self.claimed:
+                return False
+            self.claimed.add(number)
+            if len(self.claimed) >= self.prune_at:
+                # Tickets whose admission has expired are refused anyway, so forget them.
+                oldest = self.raw_serving(now) - 1 - self.ttl * self.rate
+                self.claimed = {claimed for claimed in self.claimed if claimed >= oldest}
+                self.prune_at = max(1024, 2 * len(self.claimed))
+            return True
+
+    def release(self, number: int) -> None:
+        with self.lock:
+            self.claimed.discard(number)
+
+    def configure(self, rate: float, burst: int, ttl: int, now: float) -> None:
+        with self.lock:
+            self.base, self.base_at = self.serving(now), now
+            self.rate, self.burst, self.ttl = rate, burst, ttl
+
+
+class AdmissionMiddleware:
+    """Raw ASGI middleware that checks waiting room tokens on booking requests.
+
+    A valid, admitted ``X-Queue-Token`` from the client that joined marks the
+    request as admitted for its event in ``scope["state"]``; endpoints refuse
+    flagged events without that mark. Each token admits one request: it is
+    spent when the request starts and handed back if the request fails, so a
+    client whose seats were taken can try others but a booked token cannot be
+    replayed. Nothing is checked while no event is flagged.
+    """
+
+    def __init__(self, app: ASGIApp, waiting_room: WaitingRoom) -> None:
+        self.app = app
+        self._waiting_room = waiting_room
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self._waiting_room
+            or scope["method"] != "POST"
+            or scope["path"] not in _GUARDED
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token = next((value for name, value in scope["headers"] if name == b"x-queue-token"), None)
+        if token is not None:
+            try:
+                ticket = self._waiting_room.check(token.decode("latin-1"), client_key(scope))
+            except ValueError as exc:
+                await send_error(scope, send, 403, "Forbidden", str(exc))
+                return
+            if not ticket.admitted:
+                retry_after = str(max(1, math.ceil(ticket.eta_seconds)))
+                detail = f"Not admitted yet; {ticket.position} ahead in the queue."
+                await send_error(scope, send, 429, "Too Many Requests", detail, {"Retry-After": retry_after})
+                return
+            if ticket.expired:
+                await send_error(scope, send, 403, "Forbidden", "Queue token has expired.")
+                return
+            if not self._waiting_room.claim(ticket):
+                await send_error(scope, send, 403, "Forbidden", "Queue token has already been used.")
+                return
+            scope.setdefault("state", {})["admitted_event"] = ticket.event_id
+            status_code = 500
+
+            async def send_with_status(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if status_code >= 400:
+                    self._waiting_room.release(ticket)
+            return
+        await self.app(scope, receive, send)
+
+
+def admitted_event(scope: Scope) -> UUID | None:
+    return scope.get("state", {}).get("admitted_event")
+
+
+def _encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from starlette.responses import JSONResponse
+from starlette.types import Message, Receive, Scope, Send
+
+from ticketing_service.api.schemas import ErrorResponse
+
+
+async def read_body(receive: Receive) -> bytes:
+    """Read a request body to the end, or up to a disconnect."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def replay(body: bytes, receive: Receive) -> Receive:
+    """Hand an already read ``body`` to the next app, then fall through to ``receive``."""
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def replayed() -> Message:
+        return pending.pop() if pending else await receive()
+
+    return replayed
+
+
+async def send_error(
+    scope: Scope,
+    send: Send,
+    status_code: int,
+    error: str,
+    detail: str,
+    headers: dict[str, str] | None = None,
+) -> None:
+    body = ErrorResponse(error=error, detail=detail).model_dump()
+    await JSONResponse(status_code=status_code, content=body, headers=headers)(scope, disconnected, send)
+
+
+async def disconnected() -> Message:
+    return {"type": "http.disconnect"}
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import struct
+import zlib
+
+# A slot in an ordered index plus a checksum of the listing it belongs to, so a
+# cursor from one listing is rejected by another rather than silently misread.
+_CURSOR = struct.Struct("<QI")
+
+
+def encode_cursor(listing: str, slot: int) -> str:
+    raw = _CURSOR.pack(slot, zlib.crc32(listing.encode()))
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(listing: str, cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        slot, checksum = _CURSOR.unpack(raw)
+    except (binascii.Error, ValueError, struct.error) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if checksum != zlib.crc32(listing.encode()):
+        raise ValueError("Invalid cursor.")
+    return slot
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import TypeVar
+
+from fastapi.responses import Response
+
+from ticketing_service.models import Booking, Event
+
+T = TypeVar("T")
+
+# Byte-for-byte what pydantic emits for ``EventResponse``/``BookingResponse``, without
+# building and re-validating a model per item.
+_encode_string = json.JSONEncoder(ensure_ascii=False).encode
+
+
+class FragmentCache:
+    """Encoded JSON per ``Event``/``Booking`` object, in two bounded generations.
+
+    Both models are frozen and every change produces a new object, so an entry
+    keyed on object identity never goes stale. Entries hold their object, which
+    keeps its id from being reused while cached. When the current generation
+    fills up it becomes the previous one and the oldest is dropped whole; dict
+    reads and writes are atomic, so no lock is needed.
+    """
+
+    def __init__(self, max_entries: int = 50_000) -> None:
+        self._max_entries = max_entries
+        self._current: dict[int, tuple[object, str]] = {}
+        self._previous: dict[int, tuple[object, str]] = {}
+
+    def get(self, item: T, encode: Callable[[T], str]) -> str:
+        key = id(item)
+        entry = self._current.get(key)
+        if entry is not None and entry[0] is item:
+            return entry[1]
+        entry = self._previous.get(key)
+        if entry is None or entry[0] is not item:
+            entry = (item, encode(item))
+        current = self._current
+        current[key] = entry
+        if len(current) > self._max_entries:
+            self._previous = current
+            self._current = {}
+        return entry[1]
+
+
+_fragments = FragmentCache()
+
+
+def encode_event(event: Event) -> str:
+    return _fragments.get(event, _encode_event)
+
+
+def encode_booking(booking: Booking) -> str:
+    return _fragments.get(booking, _encode_booking)
+
+
+def _encode_event(event: Event) -> str:
+    created_at = _encode_datetime(event.created_at)
+    updated_at = created_at if event.updated_at is event.created_at else _encode_datetime(event.updated_at)
+    return (
+        f'{{"id":"{event.id}","name":{_encode_string(event.name)},'
+        f'"starts_at":"{_encode_datetime(event.starts_at)}","venue":{_encode_string(event.venue)},'
+        f'"total_seats":{event.total_seats},"created_at":"{created_at}","updated_at":"{updated_at}"}}'
+    )
+
+
+def _encode_booking(booking: Booking) -> str:
+    created_at = _encode_datetime(booking.created_at)
+    updated_at = created_at if booking.updated_at is booking.created_at else _encode_datetime(booking.updated_at)
+    expires_at = booking.expires_at
+    return (
+        f'{{"id":"{booking.id}","event_id":"{booking.event_id}",'
+        f'"seats":[{",".join(map(str, booking.seats))}],"status":"{booking.status.value}",'
+        f'"created_at":"{created_at}","updated_at":"{updated_at}",'
+        f'"expires_at":{_quote_datetime(expires_at) if expires_at is not None else "null"}}}'
+    )
+
+
+def event_json(event: Event, status_code: int = 200) -> Response:
+    return _json(encode_event(event), status_code)
+
+
+def booking_json(booking: Booking, status_code: int = 200) -> Response:
+    return _json(encode_booking(booking), status_code)
+
+
+def page_json(items: Iterable[str], total: int, next_cursor: str | None = None) -> Response:
+    cursor = f'"{next_cursor}"' if next_cursor is not None else "null"
+    return _json(f'{{"items":[{",".join(items)}],"total":{total},"next_cursor":{cursor}}}')
+
+
+def _json(content: str, status_code: int = 200) -> Response:
+    return Response(content=content.encode(), status_code=status_code, media_type="application/json")
+
+
+def _encode_datetime(value: datetime) -> str:
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _quote_datetime(value: datetime) -> str:
+    return f'"{_encode_datetime(value)}"'
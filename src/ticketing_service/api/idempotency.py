@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ticketing_service.api.asgi import read_body, replay, send_error
+from ticketing_service.sharding import client_key
+
+_MAX_KEY_LENGTH = 255
+# Rough per-entry bookkeeping (key, tuple, dict slot) on top of the stored bytes.
+_ENTRY_OVERHEAD = 256
+_REPLAYED = (b"idempotent-replayed", b"true")
+# Rejections that book nothing and that a retry may get past, such as a missing waiting room token.
+_NOT_STORED = frozenset({401, 403, 429})
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: bytes
+    status: int
+    headers: tuple[tuple[bytes, bytes], ...]
+    body: bytes
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers) + _ENTRY_OVERHEAD
+
+
+class IdempotencyCache:
+    """First responses by ``(client, Idempotency-Key, path)``, bounded by count, bytes and age.
+
+    Every entry lives for the same ``ttl_seconds``, so insertion order is also
+    expiry order: expired entries are always at the front and are dropped from
+    there, and when a bound is hit the oldest entries go first. Memory is capped
+    by ``max_bytes`` however many keys arrive. Only touched on the event loop,
+    so no lock is needed.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str, str], StoredResponse] = OrderedDict()
+        self._bytes = 0
+        self.in_flight: dict[tuple[str, str, str], asyncio.Future[StoredResponse | None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple[str, str, str]) -> StoredResponse | None:
+        self._expire(monotonic())
+        return self._entries.get(key)
+
+    def store(
+        self,
+        key: tuple[str, str, str],
+        fingerprint: bytes,
+        status: int,
+        headers: list[tuple[bytes, bytes]],
+        body: bytes,
+    ) -> StoredResponse:
+        now = monotonic()
+        stored = StoredResponse(fingerprint, status, tuple(headers), body, now + self._ttl_seconds)
+        size = stored.size
+        if size > self._max_bytes or self._max_entries <= 0:
+            return stored
+        self._expire(now)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = stored
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._bytes -= self._entries.popitem(last=False)[1].size
+        return stored
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _expire(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, stored = next(iter(entries.items()))
+            if stored.expires_at > now:
+                return
+            del entries[key]
+            self._bytes -= stored.size
+
+
+class IdempotencyMiddleware:
+    """Raw ASGI middleware that makes retried booking requests safe.
+
+    A ``POST /bookings...`` request with an ``Idempotency-Key`` header runs once;
+    its response is stored and later requests from the same client with the same
+    key and path get the original status, headers and body back byte-for-byte.
+    Clients are told apart by the key the rate limiter uses, so two clients that
+    pick the same key never see each other's responses. Duplicates that arrive
+    while the first is still running wait for its result. Reusing a key with a
+    different body is rejected with 422. Refused (401, 403), throttled (429) and
+    server error responses are passed on but not stored, so a later retry runs
+    again, e.g. once the waiting room has admitted the client.
+    """
+
+    def __init__(self, app: ASGIApp, cache: IdempotencyCache) -> None:
+        self.app = app
+        self._cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith("/bookings"):
+            await self.app(scope, receive, send)
+            return
+        header = next((value for name, value in scope["headers"] if name == b"idempotency-key"), None)
+        if header is None:
+            await self.app(scope, receive, send)
+            return
+        key = header.decode("latin-1")
+        if not key or len(key) > _MAX_KEY_LENGTH:
+            detail = f"Idempotency-Key must be 1 to {_MAX_KEY_LENGTH} characters."
+            await send_error(scope, send, 400, "Bad Request", detail)
+            return
+
+        body = await read_body(receive)
+        fingerprint = hashlib.blake2b(body, digest_size=16).digest()
+        cache_key = (client_key(scope), key, scope["path"])
+        cache = self._cache
+        stored = cache.get(cache_key)
+        while stored is None and (pending := cache.in_flight.get(cache_key)) is not None:
+            stored = await asyncio.shield(pending)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                detail = "Idempotency-Key was already used with a different request."
+                await send_error(scope, send, 422, "Unprocessable Content", detail)
+                return
+            headers = [*stored.headers, _REPLAYED]
+            await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        future: asyncio.Future[StoredResponse | None] = asyncio.get_running_loop().create_future()
+        cache.in_flight[cache_key] = future
+        start: Message | None = None
+        chunks: list[bytes] = []
+        connected = True
+
+        async def capture(message: Message) -> None:
+            nonlocal start, connected
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            if connected:
+                try:
+                    await send(message)
+                except OSError:
+                    # The client gave up; keep the response for its retry.
+                    connected = False
+
+        result = None
+        try:
+            await self.app(scope, replay(body, receive), capture)
+            if start is not None:
+                status, headers, content = start["status"], list(start.get("headers", ())), b"".join(chunks)
+                if status in _NOT_STORED or status >= 500:
+                    result = StoredResponse(fingerprint, status, tuple(headers), content, 0.0)
+                else:
+                    result = cache.store(cache_key, fingerprint, status, headers, content)
+        finally:
+            del cache.in_flight[cache_key]
+            # If the attempt failed outright, the next waiter in line runs the request itself.
+            future.set_result(result)
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from collections.abc import AsyncIterator
+from pathlib import Path
+from uuid import UUID
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ticketing_service.api.asgi import disconnected, read_body, replay, send_error
+from ticketing_service.api.schemas import ErrorResponse
+from ticketing_service.sharding import CLIENT_HEADER, client_key, is_internal, shard_for, socket_path
+
+logger = logging.getLogger("ticketing_service")
+
+_EVENT_SCOPED = re.compile(r"^/events/([^/]+)/(?:seats|bookings|waiting-room|layout)(?:/|$)")
+_BOOKING_SCOPED = re.compile(r"^/bookings/([^/:]+)(?:/|$)")
+_BODY_ROUTED = frozenset({"/bookings", "/bookings/holds", "/bookings/best-available"})
+_HOP_BY_HOP = frozenset({b"host", b"connection", b"content-length", b"transfer-encoding", b"keep-alive"})
+
+
+class ShardRouter:
+    """ASGI middleware that sends each request to the shard owning its event.
+
+    Every event and all of its bookings live in exactly one worker process, the
+    one ``shard_for`` picks for the event id (booking ids are drawn to map to the
+    same shard). Seat, booking, hold and waiting room requests for another shard
+    are relayed to its Unix socket and the response is streamed back, so seat
+    exclusivity and admission only ever depend on one process's state. Event
+    metadata is small and read-mostly, so new events are copied to every peer
+    instead and event reads stay local. Requests that arrived over a shard
+    socket are always served locally.
+    """
+
+    def __init__(self, app: ASGIApp, shard_index: int, shard_count: int, socket_dir: Path | str) -> None:
+        self.app = app
+        self._shard_index = shard_index
+        self._shard_count = shard_count
+        self._sockets = [str(socket_path(socket_dir, index)) for index in range(shard_count)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._shard_count == 1 or is_internal(scope):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        method = scope["method"]
+        if method == "POST" and path == "/events":
+            await self._create_and_replicate(scope, receive, send)
+            return
+        if method == "POST" and path == "/bookings:batch":
+            await self._split_batch(scope, await read_body(receive), receive, send)
+            return
+
+        body = None
+        key = _path_key(path)
+        if key is None and method == "POST" and path in _BODY_ROUTED:
+            body = await read_body(receive)
+            key = _body_key(body)
+        owner = shard_for(key, self._shard_count) if key is not None else self._shard_index
+        if owner == self._shard_index:
+            await self.app(scope, replay(body, receive) if body is not None else receive, send)
+            return
+        if body is None:
+            body = await read_body(receive)
+        await self._forward(owner, scope, body, receive, send)
+
+    async def _forward(self, owner: int, scope: Scope, body: bytes, receive: Receive, send: Send) -> None:
+        scope.setdefault("state", {})["forwarded_to"] = owner
+        try:
+            reader, writer = await asyncio.open_unix_connection(self._sockets[owner])
+        except OSError:
+            logger.warning("Shard %d is unreachable", owner)
+            await _unavailable(scope, send)
+            return
+        # Stop relaying as soon as the client leaves, so long-lived streams end with it.
+        relay = asyncio.ensure_future(_relay(owner, reader, writer, scope, body, send))
+        watcher = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            await asyncio.wait((relay, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            relay.cancel()
+            watcher.cancel()
+            writer.close()
+
+    async def _create_and_replicate(self, scope: Scope, receive: Receive, send: Send) -> None:
+        messages: list[Message] = []
+
+        async def capture(message: Message) -> None:
+            messages.append(message)
+
+        body = await read_body(receive)
+        await self.app(scope, replay(body, receive), capture)
+        start = messages[0]
+        if start["status"] == 201:
+            # The response leaves out the seat layout, so peers get it from the create request.
+            replica = json.loads(b"".join(message.get("body", b"") for message in messages[1:]))
+            replica["layout"] = json.loads(body).get("layout")
+            created = json.dumps(replica).encode()
+            peers = [index for index in range(self._shard_count) if index != self._shard_index]
+            internal = {
+                "method": "POST",
+                "path": "/internal/events",
+                "query_string": b"",
+                "headers": [(b"content-type", b"application/json")],
+            }
+            replies = await asyncio.gather(*(self._exchange(peer, internal, created) for peer in peers))
+            for peer, (status_code, _, _) in zip(peers, replies):
+                if status_code != 204:
+                    logger.error("Failed to replicate a new event to shard %d", peer)
+        for message in messages:
+            await send(message)
+
+    async def _split_batch(self, scope: Scope, body: bytes, receive: Receive, send: Send) -> None:
+        """Run a batch on the shards owning its events and merge the per-item results."""
+        try:
+            payload = json.loads(body)
+            owners = [shard_for(UUID(item["event_id"]), self._shard_count) for item in payload["items"]]
+        except (ValueError, TypeError, KeyError):
+            owners = []
+        if len(set(owners)) <= 1:
+            owner = owners[0] if owners else self._shard_index
+            if owner == self._shard_index:
+                await self.app(scope, replay(body, receive), send)
+            else:
+                await self._forward(owner, scope, body, receive, send)
+            return
+        if payload.get("mode") == "atomic":
+            detail = "Atomic batches must only contain events owned by the same shard."
+            await send_error(scope, send, 400, "Bad Request", detail)
+            return
+
+        positions: dict[int, list[int]] = {}
+        for position, owner in enumerate(owners):
+            positions.setdefault(owner, []).append(position)
+        sub_batches = {
+            owner: json.dumps({**payload, "items": [payload["items"][position] for position in owned]}).encode()
+            for owner, owned in positions.items()
+        }
+        replies = await asyncio.gather(*(self._exchange(owner, scope, sub_batches[owner]) for owner in positions))
+        merged: list[dict] = [{}] * len(owners)
+        for (owner, owned), (status_code, headers, reply) in zip(positions.items(), replies):
+            if status_code not in (200, 503):
+                # The sub-batch was rejected as a whole (e.g. validation), as the full one would be.
+                await send({"type": "http.response.start", "status": status_code, "headers": headers})
+                await send({"type": "http.response.body", "body": reply})
+                return
+            if status_code == 503:
+                error = ErrorResponse(error="Service Unavailable", detail="Shard unavailable.").model_dump()
+                for position in owned:
+                    merged[position] = {"index": position, "status_code": 503, "booking": None, "error": error}
+                continue
+            for position, result in zip(owned, json.loads(reply)["results"]):
+                merged[position] = {**result, "index": position}
+        succeeded = sum(result["booking"] is not None for result in merged)
+        content = {
+            "mode": payload.get("mode", "best_effort"),
+            "succeeded": succeeded,
+            "failed": len(merged) - succeeded,
+            "results": merged,
+        }
+        await JSONResponse(content=content)(scope, disconnected, send)
+
+    async def _exchange(
+        self,
+        owner: int,
+        scope: Scope,
+        body: bytes,
+    ) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+        """Send one request to ``owner`` (or the local app) and buffer its response."""
+        if owner == self._shard_index:
+            messages: list[Message] = []
+
+            async def capture(message: Message) -> None:
+                messages.append(message)
+
+            headers = [header for header in scope["headers"] if header[0].lower() != b"content-length"]
+            await self.app({**scope, "headers": headers}, replay(body, disconnected), capture)
+            start = messages[0]
+            return start["status"], start["headers"], b"".join(message.get("body", b"") for message in messages[1:])
+        try:
+            reader, writer = await asyncio.open_unix_connection(self._sockets[owner])
+        except OSError:
+            logger.warning("Shard %d is unreachable", owner)
+            return 503, [], b""
+        try:
+            writer.write(_request_head(scope, body) + body)
+            await writer.drain()
+            status_code, headers, framing = await _read_response_head(reader)
+            chunks = [chunk async for chunk in _read_response_body(reader, framing)]
+            return status_code, headers, b"".join(chunks)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            logger.warning("Shard %d dropped a forwarded request", owner)
+            return 503, [], b""
+        finally:
+            writer.close()
+
+
+def _path_key(path: str) -> UUID | None:
+    match = _EVENT_SCOPED.match(path) or _BOOKING_SCOPED.match(path)
+    if match is None:
+        return None
+    try:
+        return UUID(match.group(1))
+    except ValueError:
+        return None
+
+
+def _body_key(body: bytes) -> UUID | None:
+    try:
+        return UUID(json.loads(body)["event_id"])
+    except (ValueError, TypeError, KeyError):
+        # Let the local app produce the validation error.
+        return None
+
+
+async def _relay(
+    owner: int,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    scope: Scope,
+    body: bytes,
+    send: Send,
+) -> None:
+    started = False
+    try:
+        writer.write(_request_head(scope, body) + body)
+        await writer.drain()
+        status_code, headers, framing = await _read_response_head(reader)
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        started = True
+        bodyless = scope["method"] == "HEAD" or status_code in (204, 304)
+        if not bodyless:
+            async for chunk in _read_response_body(reader, framing):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except (OSError, ValueError, asyncio.IncompleteReadError):
+        logger.warning("Shard %d dropped a forwarded request", owner)
+        if not started:
+            await _unavailable(scope, send)
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _request_head(scope: Scope, body: bytes) -> bytes:
+    target = scope["path"].encode()
+    if scope["query_string"]:
+        target += b"?" + scope["query_string"]
+    lines = [b"%s %s HTTP/1.1" % (scope["method"].encode(), target), b"host: shard", b"connection: close"]
+    for name, value in scope["headers"]:
+        if name.lower() not in _HOP_BY_HOP and name.lower() != CLIENT_HEADER:
+            lines.append(name + b": " + value)
+    lines.append(CLIENT_HEADER + b": " + client_key(scope).encode("latin-1"))
+    lines.append(b"content-length: %d" % len(body))
+    return b"\r\n".join(lines) + b"\r\n\r\n"
+
+
+async def _read_response_head(reader: asyncio.StreamReader) -> tuple[int, list[tuple[bytes, bytes]], int | None]:
+    """Return the status, relayable headers and body length (-1 for chunked, None until EOF)."""
+    status_line = await reader.readuntil(b"\r\n")
+    status_code = int(status_line.split(b" ", 2)[1])
+    headers = []
+    framing: int | None = None
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line[:-2].partition(b":")
+        name = name.strip().lower()
+        value = value.strip()
+        if name == b"content-length":
+            framing = int(value)
+        elif name == b"transfer-encoding" and value.lower() == b"chunked":
+            framing = -1
+        if name not in _HOP_BY_HOP or name == b"content-length":
+            headers.append((name, value))
+    return status_code, headers, framing
+
+
+async def _read_response_body(reader: asyncio.StreamReader, framing: int | None) -> AsyncIterator[bytes]:
+    if framing is None:
+        while chunk := await reader.read(65536):
+            yield chunk
+    elif framing >= 0:
+        if framing:
+            yield await reader.readexactly(framing)
+    else:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                return
+            chunk = await reader.readexactly(size)
+            await reader.readexactly(2)
+            yield chunk
+
+
+async def _unavailable(scope: Scope, send: Send) -> None:
+    await send_error(scope, send, 503, "Service Unavailable", "Shard unavailable.")
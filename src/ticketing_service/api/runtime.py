@@ -1,85 +1,184 @@
 from __future__ import annotations
 
+import atexit
 import logging
-from collections import defaultdict, deque
-from time import time
+from bisect import bisect_left
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import perf_counter, time
 from threading import Lock
-from typing import Callable
 from uuid import uuid4
 
-from fastapi import Request
-from fastapi.responses import JSONResponse, Response
-from starlette.middleware.base import RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from ticketing_service.api.schemas import ErrorResponse
+from ticketing_service.api.asgi import send_error
+from ticketing_service.metrics import Histogram
+from ticketing_service.sharding import client_key, is_internal
 
 
 class RateLimiter:
-    def __init__(self, max_requests: int, window_seconds: int) -> None:
-        self._max_requests = max_requests
-        self._window_seconds = window_seconds
-        self._buckets: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = Lock()
-        self._last_cleanup = time()
+    """GCRA limiter allowing ``max_requests`` per ``window_seconds`` for each key.
+
+    Each key stores one float, its theoretical arrival time (TAT): the instant its
+    allowance would be fully spent at the sustained rate. A request is allowed
+    while the TAT is less than a window ahead of now, which permits bursts of up
+    to ``max_requests`` and then one request per ``window_seconds / max_requests``.
 
-    def _cleanup_stale_buckets(self, now: float) -> None:
-        keys_to_delete = []
-        for key, bucket in self._buckets.items():
-            if bucket and (now - bucket[-1] > self._window_seconds):
-                keys_to_delete.append(key)
+    Keys are spread over independently locked shards. Each shard keeps two
+    generations of TATs and retires the older one wholesale once per window; a
+    key untouched for a full window has a TAT in the past, which is the same as
+    having no entry, so expiry never sweeps the clients one by one.
+    """
 
-        for key in keys_to_delete:
-            del self._buckets[key]
+    def __init__(self, max_requests: int, window_seconds: int, shards: int = 16) -> None:
+        self._max_requests = max_requests
+        self._window_seconds = window_seconds
+        self._shards = tuple(_LimiterShard() for _ in range(shards))
 
-        self._last_cleanup = now
+    def __len__(self) -> int:
+        return sum(len(shard.current) + len(shard.previous) for shard in self._shards)
 
     def allow(self, key: str) -> bool:
         now = time()
-        with self._lock:
-            if now - self._last_cleanup > 60:
-                self._cleanup_stale_buckets(now)
-
-            bucket = self._buckets[key]
-            while bucket and now - bucket[0] > self._window_seconds:
-                bucket.popleft()
-
-            if len(bucket) >= self._max_requests:
+        window = self._window_seconds
+        interval = window / self._max_requests
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            if now >= shard.rotate_at:
+                shard.previous = shard.current if now < shard.rotate_at + window else {}
+                shard.current = {}
+                shard.rotate_at = now + window
+            current = shard.current
+            tat = current.get(key)
+            if tat is None:
+                tat = shard.previous.pop(key, now)
+            if tat < now:
+                tat = now
+            if tat - now > window - interval:
+                current[key] = tat
                 return False
-
-            bucket.append(now)
+            current[key] = tat + interval
         return True
 
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.current = {}
+                shard.previous = {}
 
-def configure_logging(level: str) -> logging.Logger:
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(levelname)s %(name)s [%(message)s]",
-    )
-    return logging.getLogger("ticketing_service")
 
+class _LimiterShard:
+    __slots__ = ("lock", "current", "previous", "rotate_at")
 
-def create_request_middleware(
-    rate_limiter: RateLimiter,
-    max_body_bytes: int,
-    logger: logging.Logger,
-) -> Callable[[Request, RequestResponseEndpoint], Response]:
-    async def middleware(request: Request, call_next: RequestResponseEndpoint) -> Response:
-        request_id = request.headers.get("x-request-id") or str(uuid4())
-        request.state.request_id = request_id
-        client_host = request.client.host if request.client else "unknown"
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.current: dict[str, float] = {}
+        self.previous: dict[str, float] = {}
+        self.rotate_at = 0.0
 
-        if not rate_limiter.allow(client_host):
-            response = ErrorResponse(error="Too Many Requests", detail="Rate limit exceeded.")
-            return JSONResponse(status_code=429, content=response.model_dump())
 
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > max_body_bytes:
-            response = ErrorResponse(error="Payload Too Large", detail="Request body exceeds size limit.")
-            return JSONResponse(status_code=413, content=response.model_dump())
+def configure_logging(level: str) -> logging.Logger:
+    """Route log records through a queue so request threads never format or write them.
+
+    A listener thread formats records and writes them to stderr. If the root
+    logger is already configured (e.g. by a test runner), it is left alone.
+    """
+    log_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    if queue_handler in logging.getLogger().handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(message)s]"))
+        listener = QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+    return logging.getLogger("ticketing_service")
 
-        response = await call_next(request)
-        response.headers["X-Request-Id"] = request_id
-        logger.info("%s %s %s", request.method, request.url.path, response.status_code)
-        return response
 
-    return middleware
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the listener can format the record itself.
+        return record
+
+
+class RequestMiddleware:
+    """Raw ASGI middleware for rate limiting, the body-size guard, request ids, access logs and latency.
+
+    When given a ``latency`` histogram, every request is observed once it has
+    been answered, labelled with its method, route template and status code.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: RateLimiter,
+        max_body_bytes: int,
+        logger: logging.Logger,
+        latency: Histogram | None = None,
+    ) -> None:
+        self.app = app
+        self._rate_limiter = rate_limiter
+        self._max_body_bytes = max_body_bytes
+        self._logger = logger
+        self._latency = latency
+        # Only the event loop records, so it owns these series outright.
+        self._series: dict[tuple[str, str, int], list[float]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status = 500
+        try:
+            request_id = None
+            content_length = None
+            for name, value in scope["headers"]:
+                if name == b"x-request-id":
+                    request_id = value.decode("latin-1")
+                elif name == b"content-length":
+                    content_length = value
+            request_id = request_id or str(uuid4())
+            scope.setdefault("state", {})["request_id"] = request_id
+            # Requests relayed by a peer shard were already counted where they arrived.
+            if not is_internal(scope) and not self._rate_limiter.allow(client_key(scope)):
+                status = 429
+                await send_error(scope, send, 429, "Too Many Requests", "Rate limit exceeded.")
+                return
+
+            if content_length is not None and int(content_length) > self._max_body_bytes:
+                status = 413
+                await send_error(scope, send, 413, "Payload Too Large", "Request body exceeds size limit.")
+                return
+
+            header = (b"x-request-id", request_id.encode("latin-1"))
+
+            async def send_with_request_id(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    message["headers"] = [*message.get("headers", ()), header]
+                    self._logger.info("%s %s %s", scope["method"], scope["path"], status)
+                await send(message)
+
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self._latency is not None:
+                elapsed = perf_counter() - started
+                key = (scope["method"], route_label(scope), status)
+                counts = self._series.get(key)
+                if counts is None:
+                    counts = self._series[key] = self._latency.writer((key[0], key[1], str(status)))
+                counts[bisect_left(self._latency.bounds, elapsed)] += 1
+                counts[-1] += elapsed
+
+
+def route_label(scope: Scope) -> str:
+    """The matched route's path template, so label values stay bounded whatever the URLs."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "forwarded_to" in scope.get("state", {}):
+        return "forwarded"
+    return "unmatched"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -12,11 +13,28 @@ class ApiBaseModel(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True, extra="forbid")
 
 
+class SeatRowRequest(ApiBaseModel):
+    name: str = Field(min_length=1, max_length=50)
+    seats: int = Field(gt=0, le=100_000)
+    tier: str = Field(min_length=1, max_length=50, description="Price tier every seat in the row is sold at.")
+
+
+class SeatSectionRequest(ApiBaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    rows: list[SeatRowRequest] = Field(min_length=1, max_length=10_000)
+
+
 class EventCreateRequest(ApiBaseModel):
     name: str = Field(min_length=1, max_length=200)
     starts_at: datetime
     venue: str = Field(min_length=1, max_length=200)
     total_seats: int = Field(gt=0, le=100_000, description="Max 100k seats for performance.")
+    layout: list[SeatSectionRequest] | None = Field(
+        default=None,
+        min_length=1,
+        max_length=1_000,
+        description="Sections of rows, numbered consecutively from seat 1; must cover total_seats.",
+    )
 
     @field_validator("starts_at")
     @classmethod
@@ -38,9 +56,14 @@ class EventResponse(ApiBaseModel):
     updated_at: datetime
 
 
+class EventReplicaRequest(EventResponse):
+    layout: list[SeatSectionRequest] | None = None
+
+
 class EventListResponse(ApiBaseModel):
     items: list[EventResponse]
     total: int
+    next_cursor: str | None = None
 
     @field_validator("total")
     @classmethod
@@ -64,6 +87,24 @@ class BookingCreateRequest(ApiBaseModel):
         return value
 
 
+class HoldCreateRequest(BookingCreateRequest):
+    ttl_seconds: int = Field(default=300, ge=1, le=3600, description="Seconds before an unconfirmed hold lapses.")
+
+
+class BestAvailableRequest(ApiBaseModel):
+    event_id: UUID
+    quantity: int = Field(ge=1, le=100)
+    contiguous: bool = Field(default=True, description="Require adjacent seats instead of preferring them.")
+
+
+class BookingBatchRequest(ApiBaseModel):
+    mode: Literal["atomic", "best_effort"] = Field(
+        default="best_effort",
+        description="atomic books every item or none; best_effort books whatever fits.",
+    )
+    items: list[BookingCreateRequest] = Field(min_length=1, max_length=5000)
+
+
 class BookingResponse(ApiBaseModel):
     id: UUID
     event_id: UUID
@@ -71,11 +112,13 @@ class BookingResponse(ApiBaseModel):
     status: BookingStatus
     created_at: datetime
     updated_at: datetime
+    expires_at: datetime | None = None
 
 
 class BookingListResponse(ApiBaseModel):
     items: list[BookingResponse]
     total: int
+    next_cursor: str | None = None
 
     @field_validator("total")
     @classmethod
@@ -85,12 +128,72 @@ class BookingListResponse(ApiBaseModel):
         return value
 
 
+class BookingBatchItemResult(ApiBaseModel):
+    index: int = Field(ge=0)
+    status_code: int
+    booking: BookingResponse | None = None
+    error: ErrorResponse | None = None
+
+
+class BookingBatchResponse(ApiBaseModel):
+    mode: Literal["atomic", "best_effort"]
+    succeeded: int = Field(ge=0)
+    failed: int = Field(ge=0)
+    results: list[BookingBatchItemResult]
+
+
 class SeatAvailabilityResponse(ApiBaseModel):
     capacity: int = Field(gt=0)
     booked_count: int = Field(ge=0)
     available_count: int = Field(ge=0)
     available_seats: list[int] | None = None
     available_ranges: list[list[int]] | None = None
+    groups: list[SeatGroupResponse] | None = None
+
+
+class SeatGroupResponse(ApiBaseModel):
+    name: str
+    capacity: int = Field(gt=0)
+    booked_count: int = Field(ge=0)
+    available_count: int = Field(ge=0)
+
+
+class SeatRowResponse(ApiBaseModel):
+    name: str
+    tier: str
+    first_seat: int = Field(gt=0)
+    last_seat: int = Field(gt=0)
+
+
+class SeatSectionResponse(ApiBaseModel):
+    name: str
+    rows: list[SeatRowResponse]
+
+
+class SeatLayoutResponse(ApiBaseModel):
+    sections: list[SeatSectionResponse]
+    tiers: list[str]
+
+
+class WaitingRoomConfigRequest(ApiBaseModel):
+    rate_per_second: float = Field(gt=0, le=100_000, description="Clients admitted per second.")
+    burst: int = Field(default=0, ge=0, le=100_000, description="Clients admitted at once while nobody waits.")
+    admission_ttl_seconds: int = Field(default=600, ge=1, le=86_400, description="How long admission lasts.")
+
+
+class WaitingRoomResponse(ApiBaseModel):
+    rate_per_second: float
+    burst: int
+    admission_ttl_seconds: int
+    issued: int = Field(ge=0)
+    admitted: int = Field(ge=0)
+
+
+class QueueTicketResponse(ApiBaseModel):
+    token: str
+    position: int = Field(ge=0, description="Clients to be admitted before this one, itself included.")
+    eta_seconds: float = Field(ge=0)
+    admitted: bool
 
 
 class ErrorResponse(ApiBaseModel):
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from collections.abc import Callable
+from threading import Lock
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from ticketing_service.models import SeatChange
+
+_HEARTBEAT = b": keepalive\n\n"
+
+
+class SeatStreams:
+    """Server-Sent Events fan-out of seat changes, with one broadcaster per watched event.
+
+    ``publish`` is called from booking threads while the event's lock is held, so
+    it only merges the change into the event's pending delta and, for the first
+    change since the last flush, schedules a flush on the event loop. Everything
+    booked in between goes out as a single frame, encoded once and shared by all
+    subscribers. Each subscriber buffers at most ``buffer_messages`` frames; one
+    that falls further behind has its buffer dropped and gets a fresh snapshot
+    when it catches up, so slow clients cost bounded memory.
+    """
+
+    def __init__(self, buffer_messages: int = 64, heartbeat_seconds: float = 15.0) -> None:
+        if buffer_messages <= 0:
+            raise ValueError("buffer_messages must be positive.")
+        self._buffer_messages = buffer_messages
+        self._heartbeat_seconds = heartbeat_seconds
+        # Only touched on the event loop; ``publish`` does a single atomic lookup.
+        self._channels: dict[UUID, _Channel] = {}
+
+    def publish(self, event_id: UUID, change: SeatChange) -> None:
+        channel = self._channels.get(event_id)
+        if channel is not None:
+            channel.publish(change)
+
+    def subscriber_count(self, event_id: UUID) -> int:
+        channel = self._channels.get(event_id)
+        return len(channel.subscribers) if channel is not None else 0
+
+    def response(self, event_id: UUID, snapshot: Callable[[], bytes]) -> Response:
+        """Stream ``event_id``'s changes, starting with (and resyncing from) ``snapshot()`` frames."""
+        return _SeatStreamResponse(self, event_id, snapshot)
+
+    def _subscribe(self, event_id: UUID) -> tuple[_Channel, _Subscriber]:
+        channel = self._channels.get(event_id)
+        if channel is None:
+            channel = self._channels[event_id] = _Channel(asyncio.get_running_loop())
+        subscriber = _Subscriber(self._buffer_messages)
+        channel.subscribers.add(subscriber)
+        return channel, subscriber
+
+    def _unsubscribe(self, event_id: UUID, channel: _Channel, subscriber: _Subscriber) -> None:
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers and self._channels.get(event_id) is channel:
+            del self._channels[event_id]
+
+
+class _Channel:
+    __slots__ = ("_loop", "_lock", "_seats", "_latest", "subscribers")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._lock = Lock()
+        # Final state (taken or not) of every seat changed since the last flush.
+        self._seats: dict[int, bool] = {}
+        self._latest: SeatChange | None = None
+        self.subscribers: set[_Subscriber] = set()
+
+    def publish(self, change: SeatChange) -> None:
+        with self._lock:
+            scheduled = self._latest is not None
+            seats = self._seats
+            for seat in change.taken:
+                seats[seat] = True
+            for seat in change.released:
+                seats[seat] = False
+            self._latest = change
+        if not scheduled:
+            self._loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            seats, latest = self._seats, self._latest
+            self._seats, self._latest = {}, None
+        if latest is None or not self.subscribers:
+            return
+        data = json.dumps(
+            {
+                "version": latest.version,
+                "taken": sorted(seat for seat, taken in seats.items() if taken),
+                "released": sorted(seat for seat, taken in seats.items() if not taken),
+                "booked_count": latest.booked_count,
+                "available_count": latest.available_count,
+            },
+            separators=(",", ":"),
+        )
+        frame = f"id: {latest.version}\nevent: seats\ndata: {data}\n\n".encode()
+        for subscriber in self.subscribers:
+            subscriber.push(frame)
+
+
+class _Subscriber:
+    __slots__ = ("frames", "limit", "overflowed", "closed", "wakeup")
+
+    def __init__(self, limit: int) -> None:
+        self.frames: deque[bytes] = deque()
+        self.limit = limit
+        self.overflowed = False
+        self.closed = False
+        self.wakeup = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        if len(self.frames) >= self.limit:
+            # Too far behind to be worth replaying: start over from a snapshot.
+            self.frames.clear()
+            self.overflowed = True
+        else:
+            self.frames.append(frame)
+        self.wakeup.set()
+
+
+class _SeatStreamResponse(Response):
+    media_type = "text/event-stream"
+
+    def __init__(self, streams: SeatStreams, event_id: UUID, snapshot: Callable[[], bytes]) -> None:
+        # Like ``StreamingResponse``, leave ``body`` unset so no Content-Length is sent.
+        self.status_code = 200
+        self.background = None
+        self.init_headers({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        self._streams = streams
+        self._event_id = event_id
+        self._snapshot = snapshot
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        streams = self._streams
+        channel, subscriber = streams._subscribe(self._event_id)
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            subscriber.closed = True
+            subscriber.wakeup.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            # Snapshots take the event's lock, which booking threads may hold for a whole batch.
+            snapshot = await run_in_threadpool(self._snapshot)
+            await send({"type": "http.response.body", "body": snapshot, "more_body": True})
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), streams._heartbeat_seconds)
+                except TimeoutError:
+                    await send({"type": "http.response.body", "body": _HEARTBEAT, "more_body": True})
+                    continue
+                if subscriber.closed:
+                    break
+                subscriber.wakeup.clear()
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    subscriber.frames.clear()
+                    body = await run_in_threadpool(self._snapshot)
+                else:
+                    body = b"".join(subscriber.frames)
+                    subscriber.frames.clear()
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+        except OSError:
+            pass
+        finally:
+            watcher.cancel()
+            streams._unsubscribe(self._event_id, channel, subscriber)
+
+
+def snapshot_frame(
+    version: int,
+    capacity: int,
+    booked_count: int,
+    available_count: int,
+    available_ranges: list[list[int]],
+) -> bytes:
+    data = json.dumps(
+        {
+            "version": version,
+            "capacity": capacity,
+            "booked_count": booked_count,
+            "available_count": available_count,
+            "available_ranges": available_ranges,
+        },
+        separators=(",", ":"),
+    )
+    return f"id: {version}\nevent: snapshot\ndata: {data}\n\n".encode()
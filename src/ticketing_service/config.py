@@ -29,6 +29,26 @@ class Settings:
     rate_limit_max_requests: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "100"))
     rate_limit_window_seconds: int = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
     max_body_bytes: int = int(os.getenv("MAX_BODY_BYTES", "1000000"))
+    availability_cache_max_entries: int = int(os.getenv("AVAILABILITY_CACHE_MAX_ENTRIES", "4096"))
+    wal_path: str = os.getenv("WAL_PATH", "")
+    wal_fsync_policy: str = os.getenv("WAL_FSYNC_POLICY", "always").lower()
+    wal_batch_interval_ms: int = int(os.getenv("WAL_BATCH_INTERVAL_MS", "5"))
+    snapshot_path: str = os.getenv("SNAPSHOT_PATH", "")
+    snapshot_interval_seconds: int = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+    booking_pipeline: bool = os.getenv("BOOKING_PIPELINE", "true").lower() in {"1", "true", "yes"}
+    booking_pipeline_max_batch: int = int(os.getenv("BOOKING_PIPELINE_MAX_BATCH", "256"))
+    booking_pipeline_max_delay_us: int = int(os.getenv("BOOKING_PIPELINE_MAX_DELAY_US", "0"))
+    idempotency_ttl_seconds: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+    idempotency_max_entries: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "200000"))
+    idempotency_max_bytes: int = int(os.getenv("IDEMPOTENCY_MAX_BYTES", "67108864"))
+    waiting_room_secret: str = os.getenv("WAITING_ROOM_SECRET", "")
+    workers: int = int(os.getenv("WORKERS", "1"))
+    shard_index: int = int(os.getenv("SHARD_INDEX", "0"))
+    shard_count: int = int(os.getenv("SHARD_COUNT", "1"))
+    shard_socket_dir: str = os.getenv("SHARD_SOCKET_DIR", "")
+    seat_stream_buffer_messages: int = int(os.getenv("SEAT_STREAM_BUFFER_MESSAGES", "64"))
+    seat_stream_heartbeat_seconds: float = float(os.getenv("SEAT_STREAM_HEARTBEAT_SECONDS", "15"))
+    metrics_lock_timing: bool = os.getenv("METRICS_LOCK_TIMING", "true").lower() in {"1", "true", "yes"}
     log_level: str = os.getenv("LOG_LEVEL", "INFO").upper()
 
 
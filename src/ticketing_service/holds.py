@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from collections.abc import Callable
+from threading import Condition, Thread
+from time import time
+from uuid import UUID
+
+logger = logging.getLogger("ticketing_service")
+
+
+class HoldExpiryTimer:
+    """Min-heap of hold deadlines drained by a single background thread.
+
+    Scheduling and expiring a hold are both O(log n). Holds that are confirmed or
+    released early stay in the heap and are ignored by ``on_expire`` when their
+    deadline passes, so nothing ever scans the outstanding holds. Deadlines due
+    within ``resolution`` seconds of each other are expired in one wake-up, which
+    bounds the thread's wake-ups per second regardless of the hold rate.
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[list[UUID]], None],
+        resolution: float = 0.05,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self._on_expire = on_expire
+        self._resolution = resolution
+        self._clock = clock
+        self._heap: list[tuple[float, UUID]] = []
+        self._condition = Condition()
+        self._thread: Thread | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, booking_id: UUID, deadline: float) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, booking_id))
+            if self._thread is None and not self._closed:
+                self._thread = Thread(target=self._run, name="hold-expiry", daemon=True)
+                self._thread.start()
+            elif self._heap[0][1] == booking_id:
+                self._condition.notify()
+
+    def pop_due(self, now: float) -> list[UUID]:
+        due: list[UUID] = []
+        with self._condition:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                due.append(heapq.heappop(heap)[1])
+        return due
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._heap:
+                        delay = self._heap[0][0] - self._clock()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(max(delay, self._resolution))
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            due = self.pop_due(self._clock())
+            if not due:
+                continue
+            try:
+                self._on_expire(due)
+            except Exception:
+                logger.exception("Failed to expire %d holds", len(due))
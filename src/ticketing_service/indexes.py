@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SlotIndex(Generic[T]):
+    """Append-only sequence whose entries can be removed without shifting the rest.
+
+    A Fenwick tree over live flags finds the ``offset``-th live entry in
+    O(log n), and a path-compressed "next live slot" forest skips removed entries,
+    so a page costs O(log n + limit) however many entries were removed. Slots are
+    stable for the lifetime of the index, and removed entries stay readable through
+    ``get`` and ``items``.
+    """
+
+    __slots__ = ("_items", "_tree", "_next", "_live", "_version")
+
+    def __init__(self) -> None:
+        self._items: list[T] = []
+        # 1-based Fenwick tree; _tree[0] is unused.
+        self._tree = array("I", [0])
+        # _next[i] leads to the first live slot at or after i; the last entry is a sentinel.
+        self._next = array("I", [0])
+        self._live = 0
+        # Bumped by every change, so a copy taken without a lock can be checked afterwards.
+        self._version = 0
+
+    @classmethod
+    def from_items(cls, items: list[T], live: list[bool]) -> SlotIndex[T]:
+        """Build an index in O(n) with slots in ``items`` order."""
+        index = cls()
+        size = len(items)
+        index._items = list(items)
+        index._live = sum(live)
+        tree = array("I", [0]) * (size + 1)
+        next_live = array("I", range(size + 1))
+        for slot, alive in enumerate(live):
+            node = slot + 1
+            if alive:
+                tree[node] += 1
+            else:
+                next_live[slot] = slot + 1
+            parent = node + (node & -node)
+            if parent <= size:
+                tree[parent] += tree[node]
+        index._tree = tree
+        index._next = next_live
+        return index
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __iter__(self) -> Iterator[T]:
+        return self.iter_from(0)
+
+    def append(self, item: T) -> int:
+        slot = len(self._items)
+        self._items.append(item)
+        self._live += 1
+
+        node = slot + 1
+        total = 1
+        child = node - 1
+        while child > node - (node & -node):
+            total += self._tree[child]
+            child -= child & -child
+        self._tree.append(total)
+
+        # The old sentinel becomes this live slot and a new sentinel follows it.
+        self._next[slot] = slot
+        self._next.append(slot + 1)
+        self._version += 1
+        return slot
+
+    def items(self) -> list[T]:
+        """Copy every entry, removed ones included, in slot order."""
+        return self._items[:]
+
+    def get(self, slot: int) -> T:
+        return self._items[slot]
+
+    def is_live(self, slot: int) -> bool:
+        return self._next[slot] == slot
+
+    def replace(self, slot: int, item: T) -> None:
+        if not self.is_live(slot):
+            raise KeyError(slot)
+        self._items[slot] = item
+        self._version += 1
+
+    def remove(self, slot: int) -> None:
+        if not self.is_live(slot):
+            raise KeyError(slot)
+        self._live -= 1
+        self._next[slot] = slot + 1
+        self._version += 1
+        tree = self._tree
+        node = slot + 1
+        while node < len(tree):
+            tree[node] -= 1
+            node += node & -node
+
+    def page(self, offset: int, limit: int) -> list[T]:
+        return self.scan(limit, offset=offset)[0]
+
+    def scan(self, limit: int, offset: int = 0, slot: int | None = None) -> tuple[list[T], int | None]:
+        """Return up to ``limit`` live entries and the slot the next page starts at, or None.
+
+        Starting from ``slot`` (a keyset cursor) costs O(limit); starting from
+        ``offset`` adds an O(log n) seek.
+        """
+        if slot is None:
+            if offset >= self._live:
+                return [], None
+            slot = self._seek(offset)
+        items = self._items
+        end = len(items)
+        if self._live == end:
+            # Nothing removed: slots and positions coincide, so slice directly.
+            stop = slot + limit
+            return items[slot:stop], stop if stop < end else None
+        slot = self._find(min(slot, end))
+        results: list[T] = []
+        while slot < end and len(results) < limit:
+            results.append(items[slot])
+            slot = self._find(slot + 1)
+        return results, slot if slot < end else None
+
+    def iter_from(self, slot: int) -> Iterator[T]:
+        """Yield live entries starting at ``slot``, which need not be live itself."""
+        items = self._items
+        end = len(items)
+        slot = self._find(slot)
+        while slot < end:
+            yield items[slot]
+            slot = self._find(slot + 1)
+
+    def _find(self, slot: int) -> int:
+        parent = self._next
+        while parent[slot] != slot:
+            # Path halving keeps repeated skips over removed runs near O(1).
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    def _seek(self, offset: int) -> int:
+        """Return the slot of the ``offset``-th (0-based) live entry."""
+        tree = self._tree
+        size = len(tree) - 1
+        node = 0
+        remaining = offset
+        step = 1 << (size.bit_length() - 1)
+        while step:
+            candidate = node + step
+            if candidate <= size and tree[candidate] <= remaining:
+                node = candidate
+                remaining -= tree[candidate]
+            step >>= 1
+        return node
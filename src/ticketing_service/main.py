@@ -1,44 +1,194 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
 from http import HTTPStatus
-from typing import Literal
+from threading import Lock
+from typing import Literal, ParamSpec, TypeVar
 from uuid import UUID
 
-from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi import FastAPI, Header, HTTPException, Query, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-
-from ticketing_service.api.runtime import RateLimiter, configure_logging, create_request_middleware
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from ticketing_service.api.admission import AdmissionMiddleware, QueueTicket, WaitingRoom, admitted_event
+from ticketing_service.api.cache import ResponseCache, etag_matches, make_etag
+from ticketing_service.api.cursors import decode_cursor, encode_cursor
+from ticketing_service.api.encoding import booking_json, encode_booking, encode_event, event_json, page_json
+from ticketing_service.api.idempotency import IdempotencyCache, IdempotencyMiddleware
+from ticketing_service.api.router import ShardRouter
+from ticketing_service.api.runtime import RateLimiter, RequestMiddleware, configure_logging
 from ticketing_service.api.schemas import (
+    BestAvailableRequest,
+    BookingBatchItemResult,
+    BookingBatchRequest,
+    BookingBatchResponse,
     BookingCreateRequest,
     BookingListResponse,
     BookingResponse,
     ErrorResponse,
     EventCreateRequest,
     EventListResponse,
+    EventReplicaRequest,
     EventResponse,
+    HoldCreateRequest,
+    QueueTicketResponse,
     SeatAvailabilityResponse,
+    SeatGroupResponse,
+    SeatLayoutResponse,
+    SeatRowResponse,
+    SeatSectionRequest,
+    SeatSectionResponse,
+    WaitingRoomConfigRequest,
+    WaitingRoomResponse,
 )
+from ticketing_service.api.streams import SeatStreams, snapshot_frame
 from ticketing_service.api.validation import validate_seat_numbers
 from ticketing_service.config import settings
-from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.metrics import LOCK_BUCKETS, MetricsRegistry, TimedLock
+from ticketing_service.models import Booking, Event, SeatLayout
+from ticketing_service.pipeline import BookingPipeline
+from ticketing_service.repositories import BookingRepository, EventRepository, SeatsUnavailable
+from ticketing_service.sharding import SoldOutRelay, client_key, colocated_id, is_internal, new_owned_id, shard_file
+from ticketing_service.snapshots import SnapshotScheduler, load_snapshot
+from ticketing_service.wal import WriteAheadLog, open_wal
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+sold_out_relay = (
+    SoldOutRelay(settings.shard_index, settings.shard_count, settings.shard_socket_dir)
+    if settings.shard_count > 1
+    else None
+)
+
+
+def publish_sold_out(event_id: UUID, sold_out: bool) -> None:
+    event_repository.mark_sold_out(event_id, sold_out)
+    if sold_out_relay is not None:
+        sold_out_relay.publish(event_id, sold_out)
+
+
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    "ticketing_http_request_duration_seconds",
+    "Time to answer HTTP requests, by method, route template and status code.",
+    labelnames=("method", "route", "status"),
+)
+lock_wait = metrics.histogram(
+    "ticketing_booking_lock_wait_seconds",
+    "Time spent waiting to acquire a booking repository lock stripe.",
+    buckets=LOCK_BUCKETS,
+)
+lock_hold = metrics.histogram(
+    "ticketing_booking_lock_hold_seconds",
+    "Time a booking repository lock stripe was held.",
+    buckets=LOCK_BUCKETS,
+)
+seat_streams = SeatStreams(
+    buffer_messages=settings.seat_stream_buffer_messages,
+    heartbeat_seconds=settings.seat_stream_heartbeat_seconds,
+)
+event_repository = EventRepository(id_factory=partial(new_owned_id, settings.shard_index, settings.shard_count))
+booking_repository = BookingRepository(
+    id_factory=partial(colocated_id, shard_count=settings.shard_count),
+    on_sold_out=publish_sold_out,
+    on_seats_changed=seat_streams.publish,
+    lock_factory=partial(TimedLock, lock_wait, lock_hold) if settings.metrics_lock_timing else Lock,
+)
+wal: WriteAheadLog | None = None
+snapshot_scheduler: SnapshotScheduler | None = None
+if settings.wal_path:
+    wal_path = shard_file(settings.wal_path, settings.shard_index, settings.shard_count)
+    snapshot_path = (
+        shard_file(settings.snapshot_path, settings.shard_index, settings.shard_count) or f"{wal_path}.snapshot"
+    )
+    wal = open_wal(
+        wal_path,
+        event_repository,
+        booking_repository,
+        fsync_policy=settings.wal_fsync_policy,
+        batch_interval=settings.wal_batch_interval_ms / 1000,
+        after_lsn=load_snapshot(snapshot_path, event_repository, booking_repository),
+    )
+    if settings.snapshot_interval_seconds > 0:
+        snapshot_scheduler = SnapshotScheduler(
+            snapshot_path,
+            event_repository,
+            booking_repository,
+            wal,
+            interval=settings.snapshot_interval_seconds,
+        )
+booking_pipeline = (
+    BookingPipeline(
+        booking_repository,
+        max_batch=settings.booking_pipeline_max_batch,
+        max_delay=settings.booking_pipeline_max_delay_us / 1_000_000,
+    )
+    if settings.booking_pipeline
+    else None
+)
+
 
-app = FastAPI(title="Ticketing Service")
-event_repository = EventRepository()
-booking_repository = BookingRepository()
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    if booking_pipeline is not None:
+        booking_pipeline.close()
+    if snapshot_scheduler is not None:
+        snapshot_scheduler.close()
+    if wal is not None:
+        wal.close()
+
+
+app = FastAPI(title="Ticketing Service", lifespan=lifespan)
+availability_cache = ResponseCache(max_entries=settings.availability_cache_max_entries)
 logger = configure_logging(settings.log_level)
 rate_limiter = RateLimiter(
     max_requests=settings.rate_limit_max_requests,
     window_seconds=settings.rate_limit_window_seconds,
 )
-app.middleware("http")(create_request_middleware(rate_limiter, max_body_bytes=settings.max_body_bytes, logger=logger))
+waiting_room = WaitingRoom(secret=settings.waiting_room_secret.encode() or None)
+idempotency_cache = IdempotencyCache(
+    max_entries=settings.idempotency_max_entries,
+    max_bytes=settings.idempotency_max_bytes,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+)
+# Both run inside the shard router, on the shard that owns the event. Replays come
+# first, so a retry gets its original response even after admission has lapsed.
+app.add_middleware(AdmissionMiddleware, waiting_room=waiting_room)
+app.add_middleware(IdempotencyMiddleware, cache=idempotency_cache)
+if settings.shard_count > 1:
+    app.add_middleware(
+        ShardRouter,
+        shard_index=settings.shard_index,
+        shard_count=settings.shard_count,
+        socket_dir=settings.shard_socket_dir,
+    )
+app.add_middleware(
+    RequestMiddleware,
+    rate_limiter=rate_limiter,
+    max_body_bytes=settings.max_body_bytes,
+    logger=logger,
+    latency=request_latency,
+)
 
 
 @app.get("/health")
-def health_check() -> dict[str, str]:
+async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=Response, include_in_schema=False)
+async def get_metrics() -> Response:
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.exception_handler(HTTPException)
-def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
     try:
         error_name = HTTPStatus(exc.status_code).phrase
     except ValueError:
@@ -49,13 +199,19 @@ def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse
 
 
 @app.exception_handler(RequestValidationError)
-def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
     response = ErrorResponse(error="Validation Error", detail="Request validation failed.")
     return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, content=response.model_dump())
 
 
+@app.exception_handler(SeatsUnavailable)
+async def seats_unavailable_handler(request: Request, exc: SeatsUnavailable) -> JSONResponse:
+    response = ErrorResponse(error="Conflict", detail=str(exc))
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content=response.model_dump())
+
+
 @app.exception_handler(Exception)
-def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     logger.exception("Unhandled error for request %s", request.url.path)
     response = ErrorResponse(error="Internal Server Error", detail="Unexpected server error.")
     return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=response.model_dump())
@@ -67,49 +223,95 @@ def unhandled_exception_handler(request: Request, exc: Exception) -> JSONRespons
     status_code=status.HTTP_201_CREATED,
     responses={400: {"model": ErrorResponse}},
 )
-def create_event(payload: EventCreateRequest) -> EventResponse:
+async def create_event(payload: EventCreateRequest) -> Response:
     try:
-        event = event_repository.create(
+        layout = _build_layout(payload.layout)
+        event = await _in_threadpool(
+            event_repository.create,
             name=payload.name,
             starts_at=payload.starts_at,
             venue=payload.venue,
             total_seats=payload.total_seats,
+            layout=layout,
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    return EventResponse(
-        id=event.id,
-        name=event.name,
-        starts_at=event.starts_at,
-        venue=event.venue,
-        total_seats=event.total_seats,
-        created_at=event.created_at,
-        updated_at=event.updated_at,
+    return event_json(event, status_code=status.HTTP_201_CREATED)
+
+
+@app.post("/internal/events", status_code=status.HTTP_204_NO_CONTENT, include_in_schema=False)
+async def replicate_event(request: Request, payload: EventReplicaRequest) -> Response:
+    if not is_internal(request.scope):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    try:
+        event = Event(**payload.model_dump(exclude={"layout"}), layout=_build_layout(payload.layout))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    await _in_threadpool(event_repository.replicate, event)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _build_layout(sections: list[SeatSectionRequest] | None) -> SeatLayout | None:
+    if sections is None:
+        return None
+    return SeatLayout.build(
+        (section.name, ((row.name, row.seats, row.tier) for row in section.rows)) for section in sections
     )
 
 
-@app.get("/events", response_model=EventListResponse)
-def list_events(
+@app.api_route(
+    "/internal/events/{event_id}/sold-out",
+    methods=["PUT", "DELETE"],
+    status_code=status.HTTP_204_NO_CONTENT,
+    include_in_schema=False,
+)
+async def replicate_sold_out(request: Request, event_id: UUID) -> Response:
+    if not is_internal(request.scope):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    await _in_threadpool(event_repository.mark_sold_out, event_id, request.method == "PUT")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@app.get("/events", response_model=EventListResponse, responses={400: {"model": ErrorResponse}})
+async def list_events(
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-) -> EventListResponse:
-    events = event_repository.list()
-    paged = events[offset : offset + limit]
-    return EventListResponse(
-        items=[
-            EventResponse(
-                id=event.id,
-                name=event.name,
-                starts_at=event.starts_at,
-                venue=event.venue,
-                total_seats=event.total_seats,
-                created_at=event.created_at,
-                updated_at=event.updated_at,
-            )
-            for event in paged
-        ],
-        total=len(events),
+    cursor: str | None = Query(None, description="next_cursor from a previous page; replaces offset."),
+    venue: str | None = Query(None, min_length=1, max_length=200),
+    starts_after: datetime | None = Query(None, description="Only events starting at or after this time."),
+    starts_before: datetime | None = Query(None, description="Only events starting before this time."),
+    available: bool | None = Query(None, description="true for events with seats left, false for sold out."),
+) -> Response:
+    if venue is None and starts_after is None and starts_before is None and available is None:
+        events, next_slot = await _in_threadpool(
+            event_repository.scan, limit, offset=offset, cursor=_decode_cursor("events", cursor)
+        )
+        total = event_repository.count()
+        listing = "events"
+    else:
+        for bound in (starts_after, starts_before):
+            if bound is not None and (bound.tzinfo is None or bound.tzinfo.utcoffset(bound) is None):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="starts_after and starts_before must be timezone-aware.",
+                )
+        # Cursors are only valid for the filters they were issued under.
+        listing = f"events:{venue}:{starts_after}:{starts_before}:{available}"
+        events, next_slot, total = await _in_threadpool(
+            event_repository.search,
+            limit,
+            venue=venue,
+            starts_after=starts_after,
+            starts_before=starts_before,
+            available=available,
+            offset=offset,
+            cursor=_decode_cursor(listing, cursor),
+        )
+    return page_json(
+        map(encode_event, events),
+        total=total,
+        next_cursor=encode_cursor(listing, next_slot) if next_slot is not None else None,
     )
 
 
@@ -118,20 +320,12 @@ def list_events(
     response_model=EventResponse,
     responses={404: {"model": ErrorResponse}},
 )
-def get_event(event_id: UUID) -> EventResponse:
+async def get_event(event_id: UUID) -> Response:
     event = event_repository.get(event_id)
     if event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
 
-    return EventResponse(
-        id=event.id,
-        name=event.name,
-        starts_at=event.starts_at,
-        venue=event.venue,
-        total_seats=event.total_seats,
-        created_at=event.created_at,
-        updated_at=event.updated_at,
-    )
+    return event_json(event)
 
 
 @app.get(
@@ -139,157 +333,480 @@ def get_event(event_id: UUID) -> EventResponse:
     response_model=SeatAvailabilityResponse,
     responses={404: {"model": ErrorResponse}},
 )
-def get_seat_availability(
+async def get_seat_availability(
     event_id: UUID,
     detail: Literal["count", "list", "range"] = Query("count"),
     offset: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=5000),
-) -> SeatAvailabilityResponse:
+    group_by: Literal["section", "tier"] | None = Query(
+        None,
+        description="Also count seats per section or price tier of the event's seat layout.",
+    ),
+    if_none_match: str | None = Header(None),
+) -> Response:
     event = event_repository.get(event_id)
     if event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+    if group_by is not None and event.layout is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Event has no seat layout.")
+
+    if detail != "list":
+        offset, limit = 0, 0
+    occupancy = booking_repository.peek_occupancy(event_id, event.total_seats)
+    if occupancy is None:
+        occupancy = await _in_threadpool(booking_repository.occupancy, event_id, event.total_seats)
+    version = occupancy.version
+    etag = make_etag(version, detail, offset, limit, group_by)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    body = availability_cache.get((event_id, version, detail, offset, limit, group_by))
+    if body is None:
+        # Counts and pages are cheap enough for the loop unless a booking thread holds the event's lock;
+        # full range maps always render in the threadpool.
+        rendered = None
+        if detail != "range":
+            rendered = _render_availability(event, detail, offset, limit, group_by, wait=False)
+        if rendered is None:
+            rendered = await _in_threadpool(_render_availability, event, detail, offset, limit, group_by)
+        version, body = rendered
+        # A booking may have landed since the version was read; key on what was rendered.
+        etag = make_etag(version, detail, offset, limit, group_by)
+        availability_cache.put((event_id, version, detail, offset, limit, group_by), body)
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _render_availability(
+    event: Event,
+    detail: str,
+    offset: int,
+    limit: int,
+    group_by: str | None,
+    wait: bool = True,
+) -> tuple[int, bytes] | None:
+    availability = booking_repository.availability(
+        event.id,
+        event.total_seats,
+        detail,
+        offset,
+        limit,
+        layout=event.layout,
+        group_by=group_by,
+        wait=wait,
+    )
+    if availability is None:
+        return None
+    body = SeatAvailabilityResponse(
+        capacity=event.total_seats,
+        booked_count=availability.booked_count,
+        available_count=availability.available_count,
+        available_seats=availability.available_seats,
+        available_ranges=availability.available_ranges,
+        groups=[SeatGroupResponse(**asdict(group)) for group in availability.groups]
+        if availability.groups is not None
+        else None,
+    ).model_dump_json().encode()
+    return availability.version, body
+
+
+@app.get(
+    "/events/{event_id}/layout",
+    response_model=SeatLayoutResponse,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_seat_layout(event_id: UUID) -> SeatLayoutResponse:
+    event = event_repository.get(event_id)
+    if event is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+    layout = event.layout
+    if layout is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event has no seat layout.")
+
+    sections: list[SeatSectionResponse] = []
+    for row in layout.rows:
+        if not sections or sections[-1].name != row.section:
+            sections.append(SeatSectionResponse(name=row.section, rows=[]))
+        sections[-1].rows.append(
+            SeatRowResponse(name=row.name, tier=row.tier, first_seat=row.first_seat, last_seat=row.last_seat)
+        )
+    return SeatLayoutResponse(sections=sections, tiers=list(layout.tiers))
+
+
+@app.get(
+    "/events/{event_id}/seats/stream",
+    response_class=Response,
+    responses={200: {"content": {"text/event-stream": {}}}, 404: {"model": ErrorResponse}},
+)
+async def stream_seat_availability(event_id: UUID) -> Response:
+    event = event_repository.get(event_id)
+    if event is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+
+    return seat_streams.response(event.id, partial(_seat_snapshot, event))
+
+
+def _seat_snapshot(event: Event) -> bytes:
+    availability = booking_repository.availability(event.id, event.total_seats, detail="range")
+    return snapshot_frame(
+        version=availability.version,
+        capacity=event.total_seats,
+        booked_count=availability.booked_count,
+        available_count=availability.available_count,
+        available_ranges=availability.available_ranges,
+    )
+
+
+@app.put(
+    "/events/{event_id}/waiting-room",
+    response_model=WaitingRoomResponse,
+    responses={404: {"model": ErrorResponse}},
+)
+async def open_waiting_room(event_id: UUID, payload: WaitingRoomConfigRequest) -> WaitingRoomResponse:
+    if event_repository.get(event_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+
+    waiting_room.open(
+        event_id,
+        rate_per_second=payload.rate_per_second,
+        burst=payload.burst,
+        admission_ttl_seconds=payload.admission_ttl_seconds,
+    )
+    return _waiting_room_response(event_id)
+
+
+@app.get(
+    "/events/{event_id}/waiting-room",
+    response_model=WaitingRoomResponse,
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_waiting_room(event_id: UUID) -> WaitingRoomResponse:
+    return _waiting_room_response(event_id)
+
+
+@app.delete(
+    "/events/{event_id}/waiting-room",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={404: {"model": ErrorResponse}},
+)
+async def close_waiting_room(event_id: UUID) -> Response:
+    if not waiting_room.close(event_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Waiting room not found.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@app.post(
+    "/events/{event_id}/waiting-room/tickets",
+    response_model=QueueTicketResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={404: {"model": ErrorResponse}},
+)
+async def join_waiting_room(request: Request, event_id: UUID) -> QueueTicketResponse:
+    try:
+        ticket = waiting_room.join(event_id, client_key(request.scope))
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Waiting room not found.") from exc
+    return _ticket_response(ticket)
+
+
+@app.get(
+    "/events/{event_id}/waiting-room/position",
+    response_model=QueueTicketResponse,
+    responses={403: {"model": ErrorResponse}},
+)
+async def get_queue_position(request: Request, event_id: UUID, x_queue_token: str = Header()) -> QueueTicketResponse:
+    try:
+        ticket = waiting_room.check(x_queue_token, client_key(request.scope))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
+    if ticket.event_id != event_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid queue token.")
+    return _ticket_response(ticket)
+
+
+def _waiting_room_response(event_id: UUID) -> WaitingRoomResponse:
+    state = waiting_room.state(event_id)
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Waiting room not found.")
+    return WaitingRoomResponse(
+        rate_per_second=state.rate_per_second,
+        burst=state.burst,
+        admission_ttl_seconds=state.admission_ttl_seconds,
+        issued=state.issued,
+        admitted=state.admitted,
+    )
+
+
+def _ticket_response(ticket: QueueTicket) -> QueueTicketResponse:
+    return QueueTicketResponse(
+        token=ticket.token,
+        position=ticket.position,
+        eta_seconds=ticket.eta_seconds,
+        admitted=ticket.admitted,
+    )
+
+
+_NOT_ADMITTED = "This event has a waiting room; send an admitted X-Queue-Token."
 
-    bookings = booking_repository.list_by_event(event_id)
-    booked_set = {seat for booking in bookings for seat in booking.seats}
-    booked_count = len(booked_set)
-    available_count = event.total_seats - booked_count
 
-    available_seats: list[int] | None = None
-    available_ranges: list[list[int]] | None = None
+def _require_admission(request: Request, event_id: UUID) -> None:
+    if waiting_room.is_gated(event_id) and admitted_event(request.scope) != event_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=_NOT_ADMITTED)
 
-    if detail == "list":
-        available_seats = _available_seats_page(
+
+@app.post(
+    "/bookings",
+    response_model=BookingResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def create_booking(request: Request, payload: BookingCreateRequest) -> Response:
+    event = event_repository.get(payload.event_id)
+    if event is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+    _require_admission(request, event.id)
+
+    try:
+        validate_seat_numbers(payload.seats, event.total_seats)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    # Taken seats raise SeatsUnavailable, which seats_unavailable_handler turns into a 409.
+    if booking_pipeline is not None:
+        # The pipeline thread books and syncs the batch; the loop only awaits the outcome.
+        booking = await asyncio.wrap_future(
+            booking_pipeline.submit(event.id, payload.seats, total_seats=event.total_seats)
+        )
+    else:
+        booking = await _in_threadpool(
+            booking_repository.reserve,
+            event_id=event.id,
+            seats=payload.seats,
             total_seats=event.total_seats,
-            booked_set=booked_set,
-            offset=offset,
-            limit=limit,
         )
-    elif detail == "range":
-        available_ranges = _available_seat_ranges(event.total_seats, booked_set)
 
-    return SeatAvailabilityResponse(
-        capacity=event.total_seats,
-        booked_count=booked_count,
-        available_count=available_count,
-        available_seats=available_seats,
-        available_ranges=available_ranges,
+    return booking_json(booking, status_code=status.HTTP_201_CREATED)
+
+
+@app.post(
+    "/bookings/best-available",
+    response_model=BookingResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def create_best_available_booking(request: Request, payload: BestAvailableRequest) -> Response:
+    event = event_repository.get(payload.event_id)
+    if event is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+    _require_admission(request, event.id)
+
+    booking = await _in_threadpool(
+        booking_repository.reserve_best_available,
+        event_id=event.id,
+        quantity=payload.quantity,
+        total_seats=event.total_seats,
+        contiguous=payload.contiguous,
     )
 
+    return booking_json(booking, status_code=status.HTTP_201_CREATED)
 
-def _available_seats_page(
-    total_seats: int,
-    booked_set: set[int],
-    offset: int,
-    limit: int,
-) -> list[int]:
-    results: list[int] = []
-    skipped = 0
-    for seat_number in range(1, total_seats + 1):
-        if seat_number in booked_set:
+
+@app.post("/bookings:batch", response_model=BookingBatchResponse)
+async def create_booking_batch(request: Request, payload: BookingBatchRequest) -> BookingBatchResponse:
+    results: list[BookingBatchItemResult | None] = [None] * len(payload.items)
+    accepted: list[tuple[int, Event]] = []
+    admitted = admitted_event(request.scope)
+    for index, item in enumerate(payload.items):
+        event = event_repository.get(item.event_id)
+        if event is None:
+            results[index] = _batch_error(index, status.HTTP_404_NOT_FOUND, "Event not found.")
             continue
-        if skipped < offset:
-            skipped += 1
+        if waiting_room.is_gated(event.id) and admitted != event.id:
+            results[index] = _batch_error(index, status.HTTP_403_FORBIDDEN, _NOT_ADMITTED)
             continue
-        results.append(seat_number)
-        if len(results) >= limit:
-            break
-    return results
-
-
-def _available_seat_ranges(total_seats: int, booked_set: set[int]) -> list[list[int]]:
-    ranges: list[list[int]] = []
-    start = None
-    for seat_number in range(1, total_seats + 1):
-        if seat_number in booked_set:
-            if start is not None:
-                ranges.append([start, seat_number - 1])
-                start = None
+        try:
+            validate_seat_numbers(item.seats, event.total_seats)
+        except ValueError as exc:
+            results[index] = _batch_error(index, status.HTTP_400_BAD_REQUEST, str(exc))
             continue
-        if start is None:
-            start = seat_number
-    if start is not None:
-        ranges.append([start, total_seats])
-    return ranges
+        accepted.append((index, event))
+
+    atomic = payload.mode == "atomic"
+    if atomic and len(accepted) < len(payload.items):
+        outcomes: list[Booking | ValueError | None] = [None] * len(accepted)
+    else:
+        outcomes = await _in_threadpool(
+            booking_repository.reserve_batch,
+            [(event.id, payload.items[index].seats, event.total_seats) for index, event in accepted],
+            atomic=atomic,
+        )
+    for (index, _), outcome in zip(accepted, outcomes):
+        if isinstance(outcome, Booking):
+            results[index] = BookingBatchItemResult(
+                index=index,
+                status_code=status.HTTP_201_CREATED,
+                booking=_booking_response(outcome),
+            )
+        elif outcome is None:
+            results[index] = _batch_error(index, status.HTTP_424_FAILED_DEPENDENCY, "Batch aborted.")
+        else:
+            status_code = (
+                status.HTTP_409_CONFLICT if isinstance(outcome, SeatsUnavailable) else status.HTTP_400_BAD_REQUEST
+            )
+            results[index] = _batch_error(index, status_code, str(outcome))
+
+    succeeded = sum(result.booking is not None for result in results)
+    return BookingBatchResponse(
+        mode=payload.mode,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
 
 
 @app.post(
-    "/bookings",
+    "/bookings/holds",
     response_model=BookingResponse,
     status_code=status.HTTP_201_CREATED,
     responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
 )
-def create_booking(payload: BookingCreateRequest) -> BookingResponse:
+async def create_hold(request: Request, payload: HoldCreateRequest) -> Response:
     event = event_repository.get(payload.event_id)
     if event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
+    _require_admission(request, event.id)
 
     try:
         validate_seat_numbers(payload.seats, event.total_seats)
-        booking = booking_repository.reserve(event_id=event.id, seats=payload.seats)
     except ValueError as exc:
-        detail = str(exc)
-        status_code = (
-            status.HTTP_409_CONFLICT if "already booked" in detail.lower() else status.HTTP_400_BAD_REQUEST
-        )
-        raise HTTPException(status_code=status_code, detail=detail) from exc
-
-    return BookingResponse(
-        id=booking.id,
-        event_id=booking.event_id,
-        seats=list(booking.seats),
-        status=booking.status,
-        created_at=booking.created_at,
-        updated_at=booking.updated_at,
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    booking = await _in_threadpool(
+        booking_repository.hold,
+        event_id=event.id,
+        seats=payload.seats,
+        ttl_seconds=payload.ttl_seconds,
+        total_seats=event.total_seats,
     )
 
+    return booking_json(booking, status_code=status.HTTP_201_CREATED)
+
+
+@app.post(
+    "/bookings/{booking_id}/confirm",
+    response_model=BookingResponse,
+    responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def confirm_hold(booking_id: UUID) -> Response:
+    return await _transition_booking(booking_id, booking_repository.confirm)
+
+
+@app.post(
+    "/bookings/{booking_id}/release",
+    response_model=BookingResponse,
+    responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def release_hold(booking_id: UUID) -> Response:
+    return await _transition_booking(booking_id, booking_repository.release)
+
+
+@app.post(
+    "/bookings/{booking_id}/cancel",
+    response_model=BookingResponse,
+    responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}},
+)
+async def cancel_booking(booking_id: UUID) -> Response:
+    return await _transition_booking(booking_id, booking_repository.cancel)
+
+
+async def _transition_booking(booking_id: UUID, transition: Callable[[UUID], Booking]) -> Response:
+    if booking_repository.get(booking_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found.")
+    try:
+        booking = await _in_threadpool(transition, booking_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return booking_json(booking)
+
 
 @app.get(
     "/bookings/{booking_id}",
     response_model=BookingResponse,
     responses={404: {"model": ErrorResponse}},
 )
-def get_booking(booking_id: UUID) -> BookingResponse:
+async def get_booking(booking_id: UUID) -> Response:
     booking = booking_repository.get(booking_id)
     if booking is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found.")
 
-    return BookingResponse(
-        id=booking.id,
-        event_id=booking.event_id,
-        seats=list(booking.seats),
-        status=booking.status,
-        created_at=booking.created_at,
-        updated_at=booking.updated_at,
-    )
+    return booking_json(booking)
 
 
 @app.get(
     "/events/{event_id}/bookings",
     response_model=BookingListResponse,
-    responses={404: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
 )
-def list_event_bookings(
+async def list_event_bookings(
     event_id: UUID,
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-) -> BookingListResponse:
+    cursor: str | None = Query(None, description="next_cursor from a previous page; replaces offset."),
+) -> Response:
     event = event_repository.get(event_id)
     if event is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found.")
 
-    bookings = booking_repository.list_by_event(event_id)
-    paged = bookings[offset : offset + limit]
-    return BookingListResponse(
-        items=[
-            BookingResponse(
-                id=booking.id,
-                event_id=booking.event_id,
-                seats=list(booking.seats),
-                status=booking.status,
-                created_at=booking.created_at,
-                updated_at=booking.updated_at,
-            )
-            for booking in paged
-        ],
-        total=len(bookings),
-    )
\ No newline at end of file
+    listing = f"bookings:{event_id}"
+    bookings, next_slot = await _in_threadpool(
+        booking_repository.scan_by_event,
+        event_id,
+        limit,
+        offset=offset,
+        cursor=_decode_cursor(listing, cursor),
+    )
+    return page_json(
+        map(encode_booking, bookings),
+        total=booking_repository.count_by_event(event_id),
+        next_cursor=encode_cursor(listing, next_slot) if next_slot is not None else None,
+    )
+
+
+async def _in_threadpool(call: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a repository call that takes a repository lock in the threadpool.
+
+    Hold expiry, pipeline batches and snapshot export hold the same striped locks
+    from their own threads, for as long as a batch or a whole event's bookings
+    take; booking threads also take the event index lock to flag sold-out events,
+    and writes may wait for the write-ahead log. On the loop, handlers only make
+    lock-free reads (gets, counts, seat map versions), try a lock without waiting
+    for it, or await the booking pipeline.
+    """
+    return await run_in_threadpool(call, *args, **kwargs)
+
+
+def _decode_cursor(listing: str, cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(listing, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+def _batch_error(index: int, status_code: int, detail: str) -> BookingBatchItemResult:
+    return BookingBatchItemResult(
+        index=index,
+        status_code=status_code,
+        error=ErrorResponse(error=HTTPStatus(status_code).phrase, detail=detail),
+    )
+
+
+def _booking_response(booking: Booking) -> BookingResponse:
+    return BookingResponse(
+        id=booking.id,
+        event_id=booking.event_id,
+        seats=list(booking.seats),
+        status=booking.status,
+        created_at=booking.created_at,
+        updated_at=booking.updated_at,
+        expires_at=booking.expires_at,
+    )
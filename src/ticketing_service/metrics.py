@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from types import TracebackType
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOCK_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1)
+
+
+class Histogram:
+    """Fixed-bucket histogram whose counts are split across single-writer lists.
+
+    Each writer, such as the event loop or one lock stripe, gets its own counts
+    from ``writer`` and updates them with a bisect and two additions, only ever
+    from one thread at a time, so recording takes no lock of its own. A scrape
+    adds the writers' counts together; it may see an observation half-applied,
+    which the next scrape corrects.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.bounds = tuple(buckets)
+        self._writers: list[tuple[tuple[str, ...], list[float]]] = []
+        self._lock = Lock()
+
+    def writer(self, labels: tuple[str, ...] = ()) -> list[float]:
+        """Counts for one series, to be updated by a single thread or under a lock the writer holds.
+
+        An observation adds one to slot ``bisect_left(bounds, value)`` (the slot
+        after the last bound is +Inf) and the value to the last slot, the sum.
+        """
+        counts = [0] * (len(self.bounds) + 2)
+        with self._lock:
+            self._writers.append((labels, counts))
+        return counts
+
+    def collect(self) -> dict[tuple[str, ...], list[float]]:
+        with self._lock:
+            writers = list(self._writers)
+        totals: dict[tuple[str, ...], list[float]] = {}
+        for labels, counts in writers:
+            total = totals.get(labels)
+            if total is None:
+                totals[labels] = list(counts)
+            else:
+                for index, value in enumerate(counts):
+                    total[index] += value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts in sorted(self.collect().items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip((*self.bounds, math.inf), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == math.inf else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{{{','.join([*pairs, le])}}} {cumulative}")
+            suffix = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{suffix} {counts[-1]!r}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The process's metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Histogram] = []
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(histogram)
+        return histogram
+
+    def render(self) -> bytes:
+        lines = [line for metric in self._metrics for line in metric.render()]
+        return ("\n".join(lines) + "\n").encode()
+
+
+class TimedLock:
+    """A ``Lock`` context manager that records how long callers waited for it and held it.
+
+    Both histograms are updated while the lock is held, so the lock itself
+    serializes its writers. An uncontended acquire counts a zero wait without
+    reading the clock.
+    """
+
+    __slots__ = ("_lock", "_wait_bounds", "_wait", "_hold_bounds", "_hold", "_acquired_at")
+
+    def __init__(self, wait: Histogram, hold: Histogram) -> None:
+        self._lock = Lock()
+        self._wait_bounds = wait.bounds
+        self._wait = wait.writer()
+        self._hold_bounds = hold.bounds
+        self._hold = hold.writer()
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        lock = self._lock
+        if lock.acquire(False):
+            self._acquired_at = perf_counter()
+            self._wait[0] += 1
+        elif not blocking:
+            return False
+        else:
+            started = perf_counter()
+            lock.acquire()
+            self._acquired_at = acquired_at = perf_counter()
+            waited = acquired_at - started
+            wait = self._wait
+            wait[bisect_left(self._wait_bounds, waited)] += 1
+            wait[-1] += waited
+        return True
+
+    def release(self) -> None:
+        held = perf_counter() - self._acquired_at
+        hold = self._hold
+        hold[bisect_left(self._hold_bounds, held)] += 1
+        hold[-1] += held
+        self._lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.release()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
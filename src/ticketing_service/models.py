@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import StrEnum
@@ -16,6 +17,70 @@ class BookingStatus(StrEnum):
     CANCELLED = "CANCELLED"
 
 
+@dataclass(frozen=True, slots=True)
+class SeatRow:
+    section: str
+    name: str
+    tier: str
+    first_seat: int
+    last_seat: int
+
+
+@dataclass(frozen=True, slots=True)
+class SeatLayout:
+    """Sections of rows numbered consecutively from seat 1, each row sold at one price tier.
+
+    ``sections`` and ``tiers`` list names in order of first appearance; each row
+    refers to them by position in ``row_sections`` and ``row_tiers``.
+    """
+
+    rows: tuple[SeatRow, ...]
+    sections: tuple[str, ...] = field(init=False)
+    tiers: tuple[str, ...] = field(init=False)
+    row_sections: tuple[int, ...] = field(init=False)
+    row_tiers: tuple[int, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        if not self.rows:
+            raise ValueError("Seat layout must have at least one row.")
+        sections: dict[str, int] = {}
+        tiers: dict[str, int] = {}
+        names: set[tuple[str, str]] = set()
+        next_seat = 1
+        for row in self.rows:
+            if row.first_seat != next_seat or row.last_seat < row.first_seat:
+                raise ValueError("Seat layout rows must number seats consecutively from 1.")
+            if (row.section, row.name) in names:
+                raise ValueError(f"Row {row.name!r} appears twice in section {row.section!r}.")
+            if row.section in sections and sections[row.section] != len(sections) - 1:
+                raise ValueError(f"Section {row.section!r} must be contiguous.")
+            names.add((row.section, row.name))
+            sections.setdefault(row.section, len(sections))
+            tiers.setdefault(row.tier, len(tiers))
+            next_seat = row.last_seat + 1
+        object.__setattr__(self, "sections", tuple(sections))
+        object.__setattr__(self, "tiers", tuple(tiers))
+        object.__setattr__(self, "row_sections", tuple(sections[row.section] for row in self.rows))
+        object.__setattr__(self, "row_tiers", tuple(tiers[row.tier] for row in self.rows))
+
+    @classmethod
+    def build(cls, sections: Iterable[tuple[str, Iterable[tuple[str, int, str]]]]) -> SeatLayout:
+        """Number ``(section, [(row, seat_count, tier), ...])`` consecutively from seat 1."""
+        rows: list[SeatRow] = []
+        next_seat = 1
+        for section, section_rows in sections:
+            for name, seat_count, tier in section_rows:
+                if seat_count <= 0:
+                    raise ValueError("Seat layout rows must have at least one seat.")
+                rows.append(SeatRow(section, name, tier, next_seat, next_seat + seat_count - 1))
+                next_seat += seat_count
+        return cls(tuple(rows))
+
+    @property
+    def seat_count(self) -> int:
+        return self.rows[-1].last_seat
+
+
 @dataclass(frozen=True, slots=True)
 class Event:
     id: UUID
@@ -25,6 +90,7 @@ class Event:
     total_seats: int
     created_at: datetime
     updated_at: datetime
+    layout: SeatLayout | None = None
 
     def __post_init__(self) -> None:
         if not self.name.strip():
@@ -35,6 +101,8 @@ class Event:
             raise ValueError("Event total_seats must be positive.")
         if self.starts_at.tzinfo is None or self.starts_at.tzinfo.utcoffset(self.starts_at) is None:
             raise ValueError("Event starts_at must be timezone-aware.")
+        if self.layout is not None and self.layout.seat_count != self.total_seats:
+            raise ValueError("Event seat layout must cover exactly total_seats seats.")
 
 
 @dataclass(frozen=True, slots=True)
@@ -45,6 +113,7 @@ class Booking:
     status: BookingStatus
     created_at: datetime
     updated_at: datetime
+    expires_at: datetime | None = None
 
     def __post_init__(self) -> None:
         if not self.seats:
@@ -53,3 +122,31 @@ class Booking:
             raise ValueError("Booking seats must be positive integers.")
         if len(set(self.seats)) != len(self.seats):
             raise ValueError("Booking seats must be unique.")
+
+
+@dataclass(frozen=True, slots=True)
+class SeatAvailability:
+    version: int
+    capacity: int
+    booked_count: int
+    available_count: int
+    available_seats: list[int] | None = None
+    available_ranges: list[list[int]] | None = None
+    groups: list[SeatGroup] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SeatGroup:
+    name: str
+    capacity: int
+    booked_count: int
+    available_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class SeatChange:
+    version: int
+    taken: tuple[int, ...]
+    released: tuple[int, ...]
+    booked_count: int
+    available_count: int
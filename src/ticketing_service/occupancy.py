@@ -0,0 +1,465 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+
+from ticketing_service.models import SeatLayout
+
+# Number of booked seats encoded by each possible byte value.
+_POPCOUNT = bytes(value.bit_count() for value in range(256))
+# Seats per Fenwick leaf. Larger blocks shrink the tree at the cost of a short scan.
+_BLOCK_SEATS = 64
+
+
+def _free_run_tables() -> tuple[bytes, bytes, bytes]:
+    """Leading, trailing and longest run of free (zero) bits, in seat order, for every byte."""
+    prefix = bytearray(256)
+    suffix = bytearray(256)
+    longest = bytearray(256)
+    for value in range(256):
+        free = [not value & (1 << bit) for bit in range(8)]
+        run = best = 0
+        for is_free in free:
+            run = run + 1 if is_free else 0
+            best = max(best, run)
+        prefix[value] = next((bit for bit in range(8) if not free[bit]), 8)
+        suffix[value] = next((bit for bit in range(8) if not free[7 - bit]), 8)
+        longest[value] = best
+    return bytes(prefix), bytes(suffix), bytes(longest)
+
+
+_RUN_PREFIX, _RUN_SUFFIX, _RUN_LONGEST = _free_run_tables()
+
+
+class SeatOccupancy:
+    """Bitmap of booked seats for a single event with incremental free-seat indexes.
+
+    Seat ``n`` maps to bit ``(n - 1) % 8`` of byte ``(n - 1) // 8``, so the bitmap
+    costs roughly ``capacity / 8`` bytes and stays the source of truth for
+    conflict checks. Two derived indexes are updated on every mutation:
+
+    * a sorted list of free intervals, so ranges are listed in O(ranges);
+    * a Fenwick tree of free seats per 64-seat block, so paging seeks to an
+      offset in O(log n) instead of walking every seat before it.
+
+    A third index, a segment tree of free-run lengths, is built the first time
+    ``find_adjacent`` needs it and maintained from then on. Free-seat counters
+    per section and price tier of a seat layout work the same way, starting
+    with the first ``layout_counts`` call.
+
+    ``version`` increases on every change so readers can cache derived views.
+    """
+
+    __slots__ = (
+        "_bits",
+        "_capacity",
+        "_booked",
+        "_free_starts",
+        "_free_ends",
+        "_tree",
+        "_runs",
+        "_layout_counts",
+        "_version",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self._bits = bytearray((capacity + 7) // 8)
+        self._capacity = capacity
+        self._booked = 0
+        self._free_starts = array("I", [1])
+        self._free_ends = array("I", [capacity])
+        self._tree = array("I")
+        self._runs: _FreeRuns | None = None
+        self._layout_counts: LayoutCounts | None = None
+        self._version = 0
+        self._rebuild_tree()
+
+    @classmethod
+    def from_bitmap(cls, capacity: int, bits: bytes) -> SeatOccupancy:
+        """Rebuild an occupancy, indexes included, from a bitmap produced by ``bitmap``."""
+        occupancy = cls(capacity)
+        if len(bits) != len(occupancy._bits):
+            raise ValueError("bitmap does not match capacity.")
+        occupancy._bits[:] = bits
+        occupancy._booked = sum(_POPCOUNT[value] for value in bits)
+
+        starts = array("I")
+        ends = array("I")
+        start: int | None = None
+        for byte_index, value in enumerate(bits):
+            base = byte_index << 3
+            if value == 0:
+                if start is None:
+                    start = base + 1
+                continue
+            for bit in range(8):
+                seat = base + bit + 1
+                if value & (1 << bit):
+                    if start is not None:
+                        starts.append(start)
+                        ends.append(seat - 1)
+                        start = None
+                elif start is None:
+                    start = seat
+        if start is not None and start <= capacity:
+            starts.append(start)
+            ends.append(capacity)
+        occupancy._free_starts = starts
+        occupancy._free_ends = ends
+        occupancy._rebuild_tree()
+        return occupancy
+
+    @property
+    def bitmap(self) -> bytes:
+        return bytes(self._bits)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def booked_count(self) -> int:
+        return self._booked
+
+    @property
+    def available_count(self) -> int:
+        return self._capacity - self._booked
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        if capacity <= self._capacity:
+            return
+        previous = self._capacity
+        self._bits.extend(bytes((capacity + 7) // 8 - len(self._bits)))
+        self._capacity = capacity
+        if self._free_ends and self._free_ends[-1] == previous:
+            self._free_ends[-1] = capacity
+        else:
+            self._free_starts.append(previous + 1)
+            self._free_ends.append(capacity)
+        self._rebuild_tree()
+        self._runs = None
+        self._layout_counts = None
+        self._version += 1
+
+    def is_booked(self, seat: int) -> bool:
+        index = seat - 1
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def any_booked(self, seats: Iterable[int]) -> bool:
+        bits = self._bits
+        for seat in seats:
+            index = seat - 1
+            if bits[index >> 3] & (1 << (index & 7)):
+                return True
+        return False
+
+    def occupy(self, seats: Iterable[int]) -> None:
+        """Mark seats as booked. Callers must check ``any_booked`` first."""
+        bits = self._bits
+        starts = self._free_starts
+        ends = self._free_ends
+        count = 0
+        for seat in seats:
+            index = seat - 1
+            bits[index >> 3] |= 1 << (index & 7)
+            self._add_free(index // _BLOCK_SEATS, -1)
+            count += 1
+
+            position = bisect_right(starts, seat) - 1
+            start, end = starts[position], ends[position]
+            if start == end:
+                del starts[position]
+                del ends[position]
+            elif seat == start:
+                starts[position] = seat + 1
+            elif seat == end:
+                ends[position] = seat - 1
+            else:
+                ends[position] = seat - 1
+                starts.insert(position + 1, seat + 1)
+                ends.insert(position + 1, end)
+        self._booked += count
+        self._version += 1
+        if self._runs is not None:
+            self._runs.refresh(bits, seats)
+        if self._layout_counts is not None:
+            self._layout_counts.add(seats, -1)
+
+    def release(self, seats: Iterable[int]) -> None:
+        """Mark seats as available. Callers must only release booked seats."""
+        bits = self._bits
+        starts = self._free_starts
+        ends = self._free_ends
+        count = 0
+        for seat in seats:
+            index = seat - 1
+            bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+            self._add_free(index // _BLOCK_SEATS, 1)
+            count += 1
+
+            position = bisect_right(starts, seat)
+            joins_left = position > 0 and ends[position - 1] == seat - 1
+            joins_right = position < len(starts) and starts[position] == seat + 1
+            if joins_left and joins_right:
+                ends[position - 1] = ends[position]
+                del starts[position]
+                del ends[position]
+            elif joins_left:
+                ends[position - 1] = seat
+            elif joins_right:
+                starts[position] = seat
+            else:
+                starts.insert(position, seat)
+                ends.insert(position, seat)
+        self._booked -= count
+        self._version += 1
+        if self._runs is not None:
+            self._runs.refresh(bits, seats)
+        if self._layout_counts is not None:
+            self._layout_counts.add(seats, 1)
+
+    def available_seats(self, offset: int, limit: int) -> list[int]:
+        if offset >= self.available_count:
+            return []
+        seat = self._seek(offset)
+        starts = self._free_starts
+        ends = self._free_ends
+        results: list[int] = []
+        position = bisect_right(starts, seat) - 1
+        while position < len(starts) and len(results) < limit:
+            end = min(ends[position], seat + limit - len(results) - 1)
+            results.extend(range(seat, end + 1))
+            position += 1
+            if position < len(starts):
+                seat = starts[position]
+        return results
+
+    def find_adjacent(self, quantity: int) -> int | None:
+        """Return the first seat of the lowest run of ``quantity`` free seats, or None."""
+        if quantity <= 0 or quantity > self.available_count:
+            return None
+        if self._runs is None:
+            self._runs = _FreeRuns(self._bits, self._capacity)
+        return self._runs.find(self._bits, quantity)
+
+    def available_ranges(self) -> list[list[int]]:
+        return [[start, end] for start, end in zip(self._free_starts, self._free_ends)]
+
+    def layout_counts(self, layout: SeatLayout) -> LayoutCounts:
+        """Free seats per section and tier of ``layout``, counted once and then kept current."""
+        counts = self._layout_counts
+        if counts is None or counts.layout is not layout:
+            counts = self._layout_counts = LayoutCounts(layout, self._bits, self._capacity)
+        return counts
+
+    def _rebuild_tree(self) -> None:
+        bits = self._bits
+        block_bytes = _BLOCK_SEATS // 8
+        size = (self._capacity + _BLOCK_SEATS - 1) // _BLOCK_SEATS
+        tree = array("I", bytes(4 * (size + 1)))
+        for block in range(size):
+            chunk = bits[block * block_bytes : (block + 1) * block_bytes]
+            seats_in_block = min(_BLOCK_SEATS, self._capacity - block * _BLOCK_SEATS)
+            node = block + 1
+            tree[node] += seats_in_block - sum(_POPCOUNT[value] for value in chunk)
+            parent = node + (node & -node)
+            if parent <= size:
+                tree[parent] += tree[node]
+        self._tree = tree
+
+    def _add_free(self, block: int, delta: int) -> None:
+        tree = self._tree
+        size = len(tree) - 1
+        node = block + 1
+        while node <= size:
+            tree[node] += delta
+            node += node & -node
+
+    def _seek(self, offset: int) -> int:
+        """Return the seat number of the ``offset``-th (0-based) available seat."""
+        tree = self._tree
+        size = len(tree) - 1
+        block = 0
+        remaining = offset
+        step = 1 << (size.bit_length() - 1)
+        while step:
+            node = block + step
+            if node <= size and tree[node] <= remaining:
+                block = node
+                remaining -= tree[node]
+            step >>= 1
+
+        bits = self._bits
+        index = block * _BLOCK_SEATS
+        while True:
+            value = bits[index >> 3]
+            free = 8 - _POPCOUNT[value]
+            if remaining >= free:
+                remaining -= free
+                index += 8
+                continue
+            for bit in range(8):
+                if not value & (1 << bit):
+                    if not remaining:
+                        return index + bit + 1
+                    remaining -= 1
+
+
+class LayoutCounts:
+    """Free seats per section and per price tier of a ``SeatLayout``.
+
+    Seats are mapped to their row by bisecting the rows' first seats, so keeping
+    the counters current costs O(log rows) per booked or released seat and a
+    summary reads O(sections) or O(tiers) numbers, whatever the capacity.
+    """
+
+    __slots__ = ("layout", "_row_starts", "_row_ends", "section_capacity", "tier_capacity", "section_free", "tier_free")
+
+    def __init__(self, layout: SeatLayout, bits: bytearray, capacity: int) -> None:
+        self.layout = layout
+        self._row_starts = array("I", (row.first_seat for row in layout.rows))
+        self._row_ends = array("I", (row.last_seat for row in layout.rows))
+        self.section_capacity = array("I", bytes(4 * len(layout.sections)))
+        self.tier_capacity = array("I", bytes(4 * len(layout.tiers)))
+        self.section_free = array("I", bytes(4 * len(layout.sections)))
+        self.tier_free = array("I", bytes(4 * len(layout.tiers)))
+        for row, section, tier in zip(layout.rows, layout.row_sections, layout.row_tiers):
+            last_seat = min(row.last_seat, capacity)
+            size = row.last_seat - row.first_seat + 1
+            # Seats beyond the bitmap do not exist yet and count as taken.
+            free = max(0, last_seat - row.first_seat + 1) - _count_booked(bits, row.first_seat, last_seat)
+            self.section_capacity[section] += size
+            self.tier_capacity[tier] += size
+            self.section_free[section] += free
+            self.tier_free[tier] += free
+
+    def add(self, seats: Iterable[int], delta: int) -> None:
+        starts = self._row_starts
+        ends = self._row_ends
+        row_sections = self.layout.row_sections
+        row_tiers = self.layout.row_tiers
+        for seat in seats:
+            row = bisect_right(starts, seat) - 1
+            if row >= 0 and seat <= ends[row]:
+                self.section_free[row_sections[row]] += delta
+                self.tier_free[row_tiers[row]] += delta
+
+
+def _count_booked(bits: bytearray, first_seat: int, last_seat: int) -> int:
+    if last_seat < first_seat:
+        return 0
+    first, last = first_seat - 1, last_seat - 1
+    first_byte, last_byte = first >> 3, last >> 3
+    if first_byte == last_byte:
+        return _POPCOUNT[bits[first_byte] & ((0xFF << (first & 7)) & (0xFF >> (7 - (last & 7))))]
+    count = _POPCOUNT[bits[first_byte] & (0xFF << (first & 7)) & 0xFF]
+    count += sum(_POPCOUNT[value] for value in bits[first_byte + 1 : last_byte])
+    return count + _POPCOUNT[bits[last_byte] & (0xFF >> (7 - (last & 7)))]
+
+
+class _FreeRuns:
+    """Segment tree over bitmap bytes holding each span's leading, trailing and longest free run.
+
+    Leaves are whole bytes resolved through lookup tables, so the tree has
+    ``capacity / 8`` leaves, an update touches O(log n) nodes and finding the
+    lowest run of ``n`` free seats descends the tree once.
+    """
+
+    __slots__ = ("_size", "_capacity", "_prefix", "_suffix", "_longest")
+
+    def __init__(self, bits: bytearray, capacity: int) -> None:
+        leaves = len(bits)
+        size = 1
+        while size < leaves:
+            size <<= 1
+        self._size = size
+        self._capacity = capacity
+        self._prefix = array("I", bytes(8 * size))
+        self._suffix = array("I", bytes(8 * size))
+        self._longest = array("I", bytes(8 * size))
+        for leaf in range(size):
+            self._set_leaf(leaf, self._leaf_value(bits, leaf))
+        span = 8
+        level_start = size
+        while level_start > 1:
+            level_start >>= 1
+            for node in range(level_start, level_start * 2):
+                self._combine(node, span)
+            span <<= 1
+
+    def refresh(self, bits: bytearray, seats: Iterable[int]) -> None:
+        for leaf in {(seat - 1) >> 3 for seat in seats}:
+            self._set_leaf(leaf, self._leaf_value(bits, leaf))
+            node = (leaf + self._size) >> 1
+            span = 8
+            while node:
+                self._combine(node, span)
+                node >>= 1
+                span <<= 1
+
+    def find(self, bits: bytearray, quantity: int) -> int | None:
+        longest = self._longest
+        if longest[1] < quantity:
+            return None
+        prefix = self._prefix
+        suffix = self._suffix
+        node = 1
+        start = 0
+        span = self._size * 8
+        while node < self._size:
+            span >>= 1
+            left = node * 2
+            if longest[left] >= quantity:
+                node = left
+            elif suffix[left] + prefix[left + 1] >= quantity:
+                return start + span - suffix[left] + 1
+            else:
+                node = left + 1
+                start += span
+        # A single byte holds the run; scan its eight seats.
+        value = self._leaf_value(bits, node - self._size)
+        run = 0
+        for bit in range(8):
+            run = run + 1 if not value & (1 << bit) else 0
+            if run == quantity:
+                return start + bit - quantity + 2
+        return None
+
+    def _leaf_value(self, bits: bytearray, leaf: int) -> int:
+        if leaf >= len(bits):
+            return 0xFF
+        value = bits[leaf]
+        # Bits past the capacity are padding and must never look free.
+        valid = self._capacity - leaf * 8
+        if valid < 8:
+            value |= (0xFF << valid) & 0xFF
+        return value
+
+    def _set_leaf(self, leaf: int, value: int) -> None:
+        node = leaf + self._size
+        self._prefix[node] = _RUN_PREFIX[value]
+        self._suffix[node] = _RUN_SUFFIX[value]
+        self._longest[node] = _RUN_LONGEST[value]
+
+    def _combine(self, node: int, child_span: int) -> None:
+        prefix = self._prefix
+        suffix = self._suffix
+        longest = self._longest
+        left = node * 2
+        right = left + 1
+        left_prefix = prefix[left]
+        right_suffix = suffix[right]
+        prefix[node] = left_prefix if left_prefix < child_span else child_span + prefix[right]
+        suffix[node] = right_suffix if right_suffix < child_span else child_span + suffix[left]
+        longest[node] = max(longest[left], longest[right], suffix[left] + prefix[right])
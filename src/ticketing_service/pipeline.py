@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future
+from threading import Condition, Thread
+from time import monotonic
+from uuid import UUID
+
+from ticketing_service.models import Booking
+from ticketing_service.repositories import BookingRepository
+
+logger = logging.getLogger("ticketing_service")
+
+_Request = tuple[UUID, list[int] | tuple[int, ...], int | None, Future]
+
+
+class BookingPipeline:
+    """Queue of seat reservations applied by a single writer thread in batches.
+
+    Callers enqueue a request and wait on its future. The writer takes up to
+    ``max_batch`` requests at a time and hands them to
+    ``BookingRepository.reserve_batch``, so each event's lock is taken once per
+    batch rather than once per booking, and the whole batch shares one log sync.
+    Conflicts are resolved in arrival order, exactly as if the requests had been
+    made one after another.
+
+    ``max_delay`` is how long the writer waits for a batch to fill after its first
+    request arrives. Zero (the default) adds no latency: batches are whatever
+    queued up while the previous one was being applied, so they only grow under
+    load. A small delay trades latency for larger batches.
+    """
+
+    def __init__(self, repository: BookingRepository, max_batch: int = 256, max_delay: float = 0.0) -> None:
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive.")
+        self._repository = repository
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: list[_Request] = []
+        self._first_at = 0.0
+        self._condition = Condition()
+        self._closed = False
+        self._thread = Thread(target=self._run, name="booking-pipeline", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        event_id: UUID,
+        seats: list[int] | tuple[int, ...],
+        total_seats: int | None = None,
+    ) -> Future[Booking]:
+        """Queue a reservation. The future fails with ``ValueError`` when it is rejected."""
+        future: Future[Booking] = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Booking pipeline is closed.")
+            pending = self._pending
+            pending.append((event_id, seats, total_seats, future))
+            if len(pending) == 1:
+                self._first_at = monotonic()
+                self._condition.notify()
+            elif len(pending) == self._max_batch:
+                self._condition.notify()
+        return future
+
+    def reserve(self, event_id: UUID, seats: list[int] | tuple[int, ...], total_seats: int | None = None) -> Booking:
+        return self.submit(event_id, seats, total_seats).result()
+
+    def close(self) -> None:
+        """Apply everything already queued, then stop the writer."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                deadline = self._first_at + self._max_delay
+                while len(self._pending) < self._max_batch and not self._closed:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[: self._max_batch]
+                # Anything left over has already waited, so the next batch goes out at once.
+                del self._pending[: self._max_batch]
+            self._apply(batch)
+
+    def _apply(self, batch: list[_Request]) -> None:
+        try:
+            outcomes = self._repository.reserve_batch(
+                [(event_id, seats, total_seats) for event_id, seats, total_seats, _ in batch]
+            )
+        except Exception as exc:
+            logger.exception("Booking pipeline batch of %d failed", len(batch))
+            for *_, future in batch:
+                future.set_exception(exc)
+            return
+        for (*_, future), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Booking):
+                future.set_result(outcome)
+            else:
+                future.set_exception(outcome or ValueError("Booking was not applied."))
@@ -1,32 +1,140 @@
 from __future__ import annotations
 
-from datetime import datetime
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from dataclasses import replace
+from datetime import datetime, timedelta
 from threading import Lock
+from typing import Protocol
 from uuid import UUID, uuid4
 
-from ticketing_service.models import Booking, BookingStatus, Event, utc_now
+from ticketing_service.holds import HoldExpiryTimer
+from ticketing_service.indexes import SlotIndex
+from ticketing_service.models import (
+    Booking,
+    BookingStatus,
+    Event,
+    SeatAvailability,
+    SeatChange,
+    SeatGroup,
+    SeatLayout,
+    utc_now,
+)
+from ticketing_service.occupancy import SeatOccupancy
+from ticketing_service.wal import WriteAheadLog, encode_booking, encode_event
+
+
+_STATUS_ORDER = {BookingStatus.PENDING: 0, BookingStatus.CONFIRMED: 1, BookingStatus.CANCELLED: 2}
+
+
+class SeatsUnavailable(ValueError):
+    """The requested seats are already taken, or not enough are left."""
+
+
+class StripeLock(Protocol):
+    """A ``threading.Lock`` look-alike, such as ``metrics.TimedLock``, guarding one stripe of events."""
+
+    def acquire(self, blocking: bool = True) -> bool: ...
+
+    def release(self) -> None: ...
+
+    def __enter__(self) -> object: ...
+
+    def __exit__(self, *exc_info: object) -> object: ...
 
 
 class EventRepository:
-    def __init__(self) -> None:
+    def __init__(self, wal: WriteAheadLog | None = None, id_factory: Callable[[], UUID] = uuid4) -> None:
         self._events: dict[UUID, Event] = {}
+        # Events in creation order, so pages never copy the whole collection.
+        self._order: SlotIndex[Event] = SlotIndex()
+        self._slots: dict[UUID, int] = {}
+        # Secondary indexes: ``(starts_at, slot)`` keys across all events and per venue.
+        self._by_time = _StartsAtIndex()
+        self._by_venue: dict[str, _StartsAtIndex] = {}
+        self._sold_out: set[UUID] = set()
         self._lock = Lock()
+        self._wal = wal
+        self._id_factory = id_factory
+
+    def attach_wal(self, wal: WriteAheadLog) -> None:
+        self._wal = wal
 
-    def create(self, name: str, starts_at: datetime, venue: str, total_seats: int) -> Event:
+    def create(
+        self,
+        name: str,
+        starts_at: datetime,
+        venue: str,
+        total_seats: int,
+        layout: SeatLayout | None = None,
+    ) -> Event:
         now = utc_now()
         event = Event(
-            id=uuid4(),
+            id=self._id_factory(),
             name=name,
             starts_at=starts_at,
             venue=venue,
             total_seats=total_seats,
             created_at=now,
             updated_at=now,
+            layout=layout,
         )
+        self.replicate(event)
+        return event
+
+    def replicate(self, event: Event) -> None:
+        """Store and log an event created elsewhere, such as on another shard."""
         # Lock to keep writes consistent under concurrency.
         with self._lock:
-            self._events[event.id] = event
-        return event
+            if self._wal:
+                self._wal.check()
+            self._store(event)
+            lsn = self._wal.append("event", {"event": encode_event(event)}) if self._wal else 0
+        if lsn:
+            self._wal.wait(lsn)
+
+    def restore(self, event: Event) -> None:
+        with self._lock:
+            self._store(event)
+
+    def _store(self, event: Event) -> None:
+        slot = self._slots.get(event.id)
+        if slot is None:
+            slot = self._slots[event.id] = self._order.append(event)
+        else:
+            self._unindex(self._order.get(slot), slot)
+            self._order.replace(slot, event)
+        self._events[event.id] = event
+        sold_out = event.id in self._sold_out
+        key = (event.starts_at.timestamp(), slot)
+        self._by_time.add(key, sold_out)
+        venue = _venue_key(event.venue)
+        by_venue = self._by_venue.get(venue)
+        if by_venue is None:
+            by_venue = self._by_venue[venue] = _StartsAtIndex()
+        by_venue.add(key, sold_out)
+
+    def _unindex(self, event: Event, slot: int) -> None:
+        key = (event.starts_at.timestamp(), slot)
+        self._by_time.discard(key)
+        self._by_venue[_venue_key(event.venue)].discard(key)
+
+    def mark_sold_out(self, event_id: UUID, sold_out: bool) -> None:
+        """Record whether an event has seats left. Unknown events keep the flag until stored."""
+        with self._lock:
+            if sold_out:
+                self._sold_out.add(event_id)
+            else:
+                self._sold_out.discard(event_id)
+            event = self._events.get(event_id)
+            if event is not None:
+                key = (event.starts_at.timestamp(), self._slots[event_id])
+                self._by_time.mark(key, sold_out)
+                self._by_venue[_venue_key(event.venue)].mark(key, sold_out)
+
+    def is_sold_out(self, event_id: UUID) -> bool:
+        return event_id in self._sold_out
 
     def get(self, event_id: UUID) -> Event | None:
         return self._events.get(event_id)
@@ -34,52 +142,606 @@ class EventRepository:
     def list(self) -> list[Event]:
         return list(self._events.values())
 
+    def count(self) -> int:
+        return len(self._events)
+
+    def scan(self, limit: int, offset: int = 0, cursor: int | None = None) -> tuple[list[Event], int | None]:
+        """Return a page of events in creation order and the cursor of the next page, if any."""
+        with self._lock:
+            return self._order.scan(limit, offset=offset, slot=cursor)
+
+    def search(
+        self,
+        limit: int,
+        venue: str | None = None,
+        starts_after: datetime | None = None,
+        starts_before: datetime | None = None,
+        available: bool | None = None,
+        offset: int = 0,
+        cursor: int | None = None,
+    ) -> tuple[list[Event], int | None, int]:
+        """Return a page of matching events by start time, the next page's cursor and the match count.
+
+        ``starts_after`` is inclusive and ``starts_before`` exclusive. ``available``
+        keeps only events with seats left (``True``) or only sold-out ones (``False``).
+        Each filter has its own sorted keys, so bounds, count and offset are all
+        found by bisection and a page costs O(log n + limit).
+        """
+        with self._lock:
+            index = self._by_time if venue is None else self._by_venue.get(_venue_key(venue))
+            if index is None:
+                return [], None, 0
+            low = (starts_after.timestamp(), -1) if starts_after is not None else None
+            high = (starts_before.timestamp(), -1) if starts_before is not None else None
+            keys = index.keys if available is None else index.available if available else index.sold_out
+            start, stop = _bounds(keys, low, high)
+            total = stop - start
+            get = self._order.get
+
+            if cursor is not None:
+                if cursor >= len(self._order):
+                    return [], None, total
+                position = max(start, bisect_left(keys, (get(cursor).starts_at.timestamp(), cursor)))
+            else:
+                position = start + offset
+            end = min(position + limit, stop)
+            events = [get(slot) for _, slot in keys[position:end]]
+            return events, keys[end][1] if end < stop else None, total
+
+
+class _StartsAtIndex:
+    """Sorted ``(starts_at, slot)`` keys, split again into sorted available and sold-out keys."""
+
+    __slots__ = ("keys", "available", "sold_out")
 
-class BookingRepository:
     def __init__(self) -> None:
+        self.keys: list[tuple[float, int]] = []
+        self.available: list[tuple[float, int]] = []
+        self.sold_out: list[tuple[float, int]] = []
+
+    def add(self, key: tuple[float, int], sold_out: bool) -> None:
+        insort(self.keys, key)
+        insort(self.sold_out if sold_out else self.available, key)
+
+    def discard(self, key: tuple[float, int]) -> None:
+        _discard(self.keys, key)
+        if not _discard(self.available, key):
+            _discard(self.sold_out, key)
+
+    def mark(self, key: tuple[float, int], sold_out: bool) -> None:
+        source, target = (self.available, self.sold_out) if sold_out else (self.sold_out, self.available)
+        if _discard(source, key):
+            insort(target, key)
+
+
+def _discard(keys: list[tuple[float, int]], key: tuple[float, int]) -> bool:
+    position = bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        del keys[position]
+        return True
+    return False
+
+
+def _bounds(
+    keys: list[tuple[float, int]],
+    low: tuple[float, int] | None,
+    high: tuple[float, int] | None,
+) -> tuple[int, int]:
+    start = bisect_left(keys, low) if low is not None else 0
+    stop = bisect_left(keys, high) if high is not None else len(keys)
+    return start, max(start, stop)
+
+
+def _venue_key(venue: str) -> str:
+    return venue.strip().casefold()
+
+
+class BookingRepository:
+    def __init__(
+        self,
+        lock_stripes: int = 64,
+        wal: WriteAheadLog | None = None,
+        id_factory: Callable[[UUID], UUID] | None = None,
+        on_sold_out: Callable[[UUID, bool], None] | None = None,
+        on_seats_changed: Callable[[UUID, SeatChange], None] | None = None,
+        lock_factory: Callable[[], StripeLock] = Lock,
+    ) -> None:
+        if lock_stripes <= 0:
+            raise ValueError("lock_stripes must be positive.")
         self._bookings: dict[UUID, Booking] = {}
-        self._event_bookings: dict[UUID, list[Booking]] = {}
-        self._occupied_seats: dict[UUID, set[int]] = {}
-        self._lock = Lock()
+        # Active (non-cancelled) bookings per event in creation order.
+        self._event_bookings: dict[UUID, SlotIndex[Booking]] = {}
+        # Slot of each booking in its event's index, so status changes are O(1).
+        self._booking_slots: dict[UUID, int] = {}
+        self._occupancy: dict[UUID, SeatOccupancy] = {}
+        self._hold_timer = HoldExpiryTimer(self._expire_holds)
+        # Events hash onto a fixed set of stripes so bookings for different events rarely
+        # contend. Shared dicts are only touched with single, atomic operations.
+        self._locks = tuple(lock_factory() for _ in range(lock_stripes))
+        self._wal = wal
+        # Builds a booking id from its event id, e.g. so both map to the same shard.
+        self._id_factory = id_factory
+        # Told whenever an event runs out of seats or gets some back.
+        self._on_sold_out = on_sold_out
+        self._sold_out: set[UUID] = set()
+        # Told about every seat taken or released, e.g. to stream it to watchers.
+        self._on_seats_changed = on_seats_changed
+
+    def attach_wal(self, wal: WriteAheadLog) -> None:
+        self._wal = wal
+
+    def _lock_for(self, event_id: UUID) -> StripeLock:
+        return self._locks[self._stripe(event_id)]
+
+    def _stripe(self, event_id: UUID) -> int:
+        # Shards own IDs by their low bits (sharding.shard_for), so striping on those
+        # would leave each shard only a fraction of the stripes; use the high half.
+        return (event_id.int >> 64) % len(self._locks)
 
     def reserve(
         self,
         event_id: UUID,
         seats: list[int] | tuple[int, ...],
         status: BookingStatus = BookingStatus.CONFIRMED,
+        total_seats: int | None = None,
+    ) -> Booking:
+        return self._insert(event_id, seats, status, total_seats, expires_at=None)
+
+    def hold(
+        self,
+        event_id: UUID,
+        seats: list[int] | tuple[int, ...],
+        ttl_seconds: float,
+        total_seats: int | None = None,
+    ) -> Booking:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive.")
+        expires_at = utc_now() + timedelta(seconds=ttl_seconds)
+        booking = self._insert(event_id, seats, BookingStatus.PENDING, total_seats, expires_at=expires_at)
+        self._hold_timer.schedule(booking.id, expires_at.timestamp())
+        return booking
+
+    def confirm(self, booking_id: UUID) -> Booking:
+        booking = self._require(booking_id)
+        with self._lock_for(booking.event_id):
+            booking = self._bookings[booking_id]
+            if booking.status is not BookingStatus.PENDING:
+                raise ValueError("Booking is not pending.")
+            self._check_log()
+            now = utc_now()
+            if booking.expires_at is not None and booking.expires_at <= now:
+                lsn = self._log(self._replace(booking, BookingStatus.CANCELLED, now))
+                expired = True
+            else:
+                booking = self._replace(booking, BookingStatus.CONFIRMED, now)
+                lsn = self._log(booking)
+                expired = False
+        self._sync(lsn)
+        if expired:
+            raise ValueError("Hold has expired.")
+        return booking
+
+    def release(self, booking_id: UUID) -> Booking:
+        booking = self._require(booking_id)
+        with self._lock_for(booking.event_id):
+            booking = self._bookings[booking_id]
+            if booking.status is not BookingStatus.PENDING:
+                raise ValueError("Booking is not pending.")
+            self._check_log()
+            booking = self._replace(booking, BookingStatus.CANCELLED, utc_now())
+            lsn = self._log(booking)
+        self._sync(lsn)
+        return booking
+
+    def cancel(self, booking_id: UUID) -> Booking:
+        booking = self._require(booking_id)
+        with self._lock_for(booking.event_id):
+            booking = self._bookings[booking_id]
+            if booking.status is BookingStatus.CANCELLED:
+                raise ValueError("Booking is already cancelled.")
+            self._check_log()
+            booking = self._replace(booking, BookingStatus.CANCELLED, utc_now())
+            lsn = self._log(booking)
+        self._sync(lsn)
+        return booking
+
+    def _insert(
+        self,
+        event_id: UUID,
+        seats: list[int] | tuple[int, ...],
+        status: BookingStatus,
+        total_seats: int | None,
+        expires_at: datetime | None,
     ) -> Booking:
+        booking = self._new_booking(event_id, seats, status, utc_now(), expires_at)
+        # Without a known capacity the bitmap grows to fit the highest seat requested.
+        capacity = max(total_seats or 0, max(booking.seats))
+
+        with self._lock_for(event_id):
+            self._check_log()
+            self._place(booking, capacity)
+            lsn = self._log(booking)
+
+        self._sync(lsn)
+        return booking
+
+    def reserve_best_available(
+        self,
+        event_id: UUID,
+        quantity: int,
+        total_seats: int,
+        contiguous: bool = True,
+    ) -> Booking:
+        """Pick and book ``quantity`` seats in one step, preferring the lowest-numbered ones.
+
+        Adjacent seats are used whenever a long enough free run exists. Without
+        ``contiguous`` the lowest available seats are taken otherwise.
+        """
+        if quantity <= 0:
+            raise ValueError("quantity must be positive.")
+        now = utc_now()
+        with self._lock_for(event_id):
+            occupancy = self._occupancy_for(event_id, total_seats)
+            first_seat = occupancy.find_adjacent(quantity)
+            if first_seat is not None:
+                seats = range(first_seat, first_seat + quantity)
+            elif contiguous:
+                raise SeatsUnavailable("Not enough adjacent seats available.")
+            elif occupancy.available_count >= quantity:
+                seats = occupancy.available_seats(0, quantity)
+            else:
+                raise SeatsUnavailable("Not enough seats available.")
+            booking = self._new_booking(event_id, seats, BookingStatus.CONFIRMED, now, None)
+            self._check_log()
+            self._place(booking, total_seats)
+            lsn = self._log(booking)
+        self._sync(lsn)
+        return booking
+
+    def reserve_batch(
+        self,
+        items: list[tuple[UUID, list[int] | tuple[int, ...], int | None]],
+        atomic: bool = False,
+    ) -> list[Booking | ValueError | None]:
+        """Reserve many ``(event_id, seats, total_seats)`` items, taking each event's lock once.
+
+        Each result is the new booking or the ``ValueError`` that rejected the item.
+        In atomic mode every involved lock is held together and nothing is booked
+        unless every item fits; when one does not, the items that would have
+        succeeded get ``None``. All items share a single log sync.
+        """
         now = utc_now()
-        requested_seats = tuple(seats)
-        booking = Booking(
-            id=uuid4(),
+        results: list[Booking | ValueError | None] = [None] * len(items)
+        bookings: dict[UUID, list[tuple[int, Booking, int]]] = {}
+        for index, (event_id, seats, total_seats) in enumerate(items):
+            try:
+                booking = self._new_booking(event_id, seats, BookingStatus.CONFIRMED, now, None)
+            except ValueError as exc:
+                results[index] = exc
+                continue
+            capacity = max(total_seats or 0, max(booking.seats))
+            bookings.setdefault(event_id, []).append((index, booking, capacity))
+
+        lsn = 0
+        if atomic:
+            # Stripes are always taken in index order, so concurrent batches cannot deadlock.
+            stripes = sorted({self._stripe(event_id) for event_id in bookings})
+            with ExitStack() as stack:
+                for stripe in stripes:
+                    stack.enter_context(self._locks[stripe])
+                self._check_log()
+                for event_bookings in bookings.values():
+                    self._check_batch(event_bookings, results)
+                if any(result is not None for result in results):
+                    return results
+                for event_bookings in bookings.values():
+                    for index, booking, capacity in event_bookings:
+                        self._place(booking, capacity)
+                        results[index] = booking
+                        lsn = self._log(booking) or lsn
+        else:
+            for event_id, event_bookings in bookings.items():
+                with self._lock_for(event_id):
+                    self._check_log()
+                    for index, booking, capacity in event_bookings:
+                        try:
+                            self._place(booking, capacity)
+                        except ValueError as exc:
+                            results[index] = exc
+                            continue
+                        results[index] = booking
+                        lsn = self._log(booking) or lsn
+        self._sync(lsn)
+        return results
+
+    def _check_batch(
+        self,
+        event_bookings: list[tuple[int, Booking, int]],
+        results: list[Booking | ValueError | None],
+    ) -> None:
+        """Flag items that would collide with booked seats or each other. Callers hold the lock."""
+        claimed: set[int] = set()
+        for index, booking, capacity in event_bookings:
+            occupancy = self._occupancy_for(booking.event_id, capacity)
+            if occupancy.any_booked(booking.seats) or not claimed.isdisjoint(booking.seats):
+                results[index] = SeatsUnavailable("One or more seats are already booked.")
+            claimed.update(booking.seats)
+
+    def _new_booking(
+        self,
+        event_id: UUID,
+        seats: Iterable[int],
+        status: BookingStatus,
+        now: datetime,
+        expires_at: datetime | None,
+    ) -> Booking:
+        return Booking(
+            id=self._id_factory(event_id) if self._id_factory else uuid4(),
             event_id=event_id,
-            seats=requested_seats,
+            seats=tuple(seats),
             status=status,
             created_at=now,
             updated_at=now,
+            expires_at=expires_at,
         )
 
-        with self._lock:
-            if event_id not in self._occupied_seats:
-                self._occupied_seats[event_id] = set()
+    def restore(self, booking: Booking, total_seats: int | None = None) -> None:
+        """Apply a logged booking state.
+
+        Statuses only move forward (PENDING, CONFIRMED, CANCELLED), so replaying a
+        record that a snapshot already reflects, or replaying it twice, is a no-op.
+        """
+        capacity = max(total_seats or 0, max(booking.seats))
+        with self._lock_for(booking.event_id):
+            existing = self._bookings.get(booking.id)
+            if existing is not None:
+                if _STATUS_ORDER[booking.status] > _STATUS_ORDER[existing.status]:
+                    self._replace(existing, booking.status, booking.updated_at)
+                return
+
+            if booking.status is BookingStatus.CANCELLED:
+                # Keep it in the event's history so snapshots still see it.
+                self._bookings[booking.id] = booking
+                event_bookings = self._event_bookings.get(booking.event_id)
+                if event_bookings is None:
+                    event_bookings = self._event_bookings[booking.event_id] = SlotIndex()
+                event_bookings.remove(event_bookings.append(booking))
+                return
+            self._place(booking, capacity)
+        if booking.status is BookingStatus.PENDING and booking.expires_at is not None:
+            self._hold_timer.schedule(booking.id, booking.expires_at.timestamp())
+
+    def export_event(self, event_id: UUID, attempts: int = 3) -> tuple[bytes | None, int, list[Booking]]:
+        """Copy an event's occupancy bitmap, capacity and bookings as of one instant.
+
+        The event's lock is held to copy the bitmap, which is O(seats / 8), and to
+        check the booking index's version afterwards. Bookings are copied outside
+        the lock and the copy is retried if a write landed meanwhile; only after
+        ``attempts`` misses are they copied under the lock, in O(bookings).
+        """
+        lock = self._lock_for(event_id)
+        for _ in range(attempts):
+            with lock:
+                occupancy = self._occupancy.get(event_id)
+                event_bookings = self._event_bookings.get(event_id)
+                if occupancy is None:
+                    return None, 0, []
+                if event_bookings is None:
+                    return occupancy.bitmap, occupancy.capacity, []
+                bitmap, capacity, version = occupancy.bitmap, occupancy.capacity, event_bookings.version
+            bookings = event_bookings.items()
+            with lock:
+                if self._event_bookings.get(event_id) is event_bookings and event_bookings.version == version:
+                    return bitmap, capacity, bookings
+        with lock:
+            occupancy = self._occupancy[event_id]
+            return occupancy.bitmap, occupancy.capacity, self._event_bookings[event_id].items()
+
+    def load_event(self, event_id: UUID, occupancy: SeatOccupancy, bookings: list[Booking]) -> None:
+        """Install an exported event state in bulk, replacing whatever was there."""
+        live = [booking.status is not BookingStatus.CANCELLED for booking in bookings]
+        event_bookings = SlotIndex.from_items(bookings, live)
+        with self._lock_for(event_id):
+            self._occupancy[event_id] = occupancy
+            self._event_bookings[event_id] = event_bookings
+            for slot, booking in enumerate(bookings):
+                self._bookings[booking.id] = booking
+                if live[slot]:
+                    self._booking_slots[booking.id] = slot
+            self._track_sold_out(event_id, occupancy)
+        for booking in bookings:
+            if booking.status is BookingStatus.PENDING and booking.expires_at is not None:
+                self._hold_timer.schedule(booking.id, booking.expires_at.timestamp())
+
+    def _place(self, booking: Booking, capacity: int) -> None:
+        """Index ``booking`` and occupy its seats. Callers hold the event's lock."""
+        occupancy = self._occupancy_for(booking.event_id, capacity)
+        if occupancy.any_booked(booking.seats):
+            raise SeatsUnavailable("One or more seats are already booked.")
+
+        self._bookings[booking.id] = booking
+        event_bookings = self._event_bookings.get(booking.event_id)
+        if event_bookings is None:
+            event_bookings = self._event_bookings[booking.event_id] = SlotIndex()
+        self._booking_slots[booking.id] = event_bookings.append(booking)
+        occupancy.occupy(booking.seats)
+        self._seats_changed(booking.event_id, occupancy, taken=booking.seats)
+
+    def _seats_changed(
+        self,
+        event_id: UUID,
+        occupancy: SeatOccupancy,
+        taken: tuple[int, ...] = (),
+        released: tuple[int, ...] = (),
+    ) -> None:
+        """Notify listeners of a change to an event's seats. Callers hold the event's lock."""
+        self._track_sold_out(event_id, occupancy)
+        if self._on_seats_changed is not None:
+            change = SeatChange(
+                version=occupancy.version,
+                taken=taken,
+                released=released,
+                booked_count=occupancy.booked_count,
+                available_count=occupancy.available_count,
+            )
+            self._on_seats_changed(event_id, change)
+
+    def _track_sold_out(self, event_id: UUID, occupancy: SeatOccupancy) -> None:
+        """Report sold-out transitions to ``on_sold_out``. Callers hold the event's lock."""
+        sold_out = occupancy.available_count == 0
+        if sold_out == (event_id in self._sold_out):
+            return
+        if sold_out:
+            self._sold_out.add(event_id)
+        else:
+            self._sold_out.discard(event_id)
+        if self._on_sold_out is not None:
+            self._on_sold_out(event_id, sold_out)
 
-            current_occupied = self._occupied_seats[event_id]
-            if any(seat in current_occupied for seat in requested_seats):
-                raise ValueError("One or more seats are already booked.")
+    def _occupancy_for(self, event_id: UUID, capacity: int) -> SeatOccupancy:
+        occupancy = self._occupancy.get(event_id)
+        if occupancy is None:
+            occupancy = self._occupancy[event_id] = SeatOccupancy(capacity)
+        else:
+            occupancy.ensure_capacity(capacity)
+        return occupancy
 
-            self._bookings[booking.id] = booking
+    def _check_log(self) -> None:
+        """Refuse a change before making it if the log can no longer record it. Callers hold the event's lock."""
+        if self._wal:
+            self._wal.check()
 
-            if event_id not in self._event_bookings:
-                self._event_bookings[event_id] = []
-            self._event_bookings[event_id].append(booking)
+    def _log(self, booking: Booking) -> int:
+        return self._wal.append("booking", {"booking": encode_booking(booking)}) if self._wal else 0
 
-            current_occupied.update(requested_seats)
+    def _sync(self, lsn: int) -> None:
+        if lsn:
+            self._wal.wait(lsn)
 
+    def _require(self, booking_id: UUID) -> Booking:
+        booking = self._bookings.get(booking_id)
+        if booking is None:
+            raise KeyError(booking_id)
         return booking
 
+    def _replace(self, booking: Booking, status: BookingStatus, now: datetime) -> Booking:
+        """Swap in a new status for ``booking``. Callers hold the event's lock."""
+        updated = replace(booking, status=status, updated_at=now, expires_at=None)
+        self._bookings[booking.id] = updated
+        event_bookings = self._event_bookings[booking.event_id]
+        slot = self._booking_slots[booking.id]
+        event_bookings.replace(slot, updated)
+        if status is BookingStatus.CANCELLED:
+            # Releasing is O(seats) on the bitmap and O(log n) on the booking index.
+            event_bookings.remove(slot)
+            del self._booking_slots[booking.id]
+            occupancy = self._occupancy[booking.event_id]
+            occupancy.release(booking.seats)
+            self._seats_changed(booking.event_id, occupancy, released=booking.seats)
+        return updated
+
+    def _expire_holds(self, booking_ids: list[UUID]) -> None:
+        now = utc_now()
+        for booking_id in booking_ids:
+            booking = self._bookings.get(booking_id)
+            if booking is None or booking.status is not BookingStatus.PENDING:
+                continue
+            with self._lock_for(booking.event_id):
+                booking = self._bookings[booking_id]
+                expires_at = booking.expires_at
+                if booking.status is BookingStatus.PENDING and expires_at is not None and expires_at <= now:
+                    try:
+                        self._check_log()
+                    except RuntimeError:
+                        # Holds stay pending rather than expire unlogged; replay expires them later.
+                        return
+                    self._log(self._replace(booking, BookingStatus.CANCELLED, now))
+
     def get(self, booking_id: UUID) -> Booking | None:
         return self._bookings.get(booking_id)
 
     def list_by_event(self, event_id: UUID) -> list[Booking]:
-        return list(self._event_bookings.get(event_id, []))
+        return list(self._event_bookings.get(event_id, ()))
+
+    def page_by_event(self, event_id: UUID, offset: int, limit: int) -> list[Booking]:
+        return self.scan_by_event(event_id, limit, offset=offset)[0]
+
+    def scan_by_event(
+        self,
+        event_id: UUID,
+        limit: int,
+        offset: int = 0,
+        cursor: int | None = None,
+    ) -> tuple[list[Booking], int | None]:
+        """Return a page of an event's active bookings and the cursor of the next page, if any."""
+        event_bookings = self._event_bookings.get(event_id)
+        if event_bookings is None:
+            return [], None
+        with self._lock_for(event_id):
+            return event_bookings.scan(limit, offset=offset, slot=cursor)
+
+    def count_by_event(self, event_id: UUID) -> int:
+        return len(self._event_bookings.get(event_id, ()))
+
+    def peek_occupancy(self, event_id: UUID, total_seats: int) -> SeatOccupancy | None:
+        """Return the event's seat map if it already covers ``total_seats``, without taking a lock."""
+        occupancy = self._occupancy.get(event_id)
+        return occupancy if occupancy is not None and occupancy.capacity >= total_seats else None
+
+    def occupancy(self, event_id: UUID, total_seats: int) -> SeatOccupancy:
+        occupancy = self.peek_occupancy(event_id, total_seats)
+        if occupancy is not None:
+            return occupancy
+        with self._lock_for(event_id):
+            occupancy = self._occupancy.get(event_id)
+            if occupancy is None:
+                occupancy = self._occupancy[event_id] = SeatOccupancy(total_seats)
+            else:
+                occupancy.ensure_capacity(total_seats)
+        return occupancy
+
+    def availability(
+        self,
+        event_id: UUID,
+        total_seats: int,
+        detail: str = "count",
+        offset: int = 0,
+        limit: int = 0,
+        layout: SeatLayout | None = None,
+        group_by: str | None = None,
+        wait: bool = True,
+    ) -> SeatAvailability | None:
+        """Describe the event's seats; with ``wait=False``, ``None`` if that would mean waiting for a lock."""
+        occupancy = self.occupancy(event_id, total_seats) if wait else self.peek_occupancy(event_id, total_seats)
+        if occupancy is None:
+            return None
+        # Hold the event's lock so the counts, seats and version describe one state.
+        lock = self._lock_for(event_id)
+        if not lock.acquire(wait):
+            return None
+        try:
+            return SeatAvailability(
+                version=occupancy.version,
+                capacity=occupancy.capacity,
+                booked_count=occupancy.booked_count,
+                available_count=occupancy.available_count,
+                available_seats=occupancy.available_seats(offset, limit) if detail == "list" else None,
+                available_ranges=occupancy.available_ranges() if detail == "range" else None,
+                groups=_seat_groups(occupancy, layout, group_by) if layout is not None and group_by else None,
+            )
+        finally:
+            lock.release()
+
 
+def _seat_groups(occupancy: SeatOccupancy, layout: SeatLayout, group_by: str) -> list[SeatGroup]:
+    counts = occupancy.layout_counts(layout)
+    if group_by == "section":
+        names, capacities, free = layout.sections, counts.section_capacity, counts.section_free
+    elif group_by == "tier":
+        names, capacities, free = layout.tiers, counts.tier_capacity, counts.tier_free
+    else:
+        raise ValueError(f"Unknown seat grouping {group_by!r}.")
+    return [
+        SeatGroup(name=name, capacity=capacity, booked_count=capacity - available, available_count=available)
+        for name, capacity, available in zip(names, capacities, free)
+    ]
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import socket
+import tempfile
+
 import uvicorn
 
 from ticketing_service.config import settings
+from ticketing_service.sharding import socket_path
 
 
 def main() -> None:
+    if settings.workers > 1:
+        serve(settings.workers)
+        return
     uvicorn.run(
         "ticketing_service.main:app",
         host=settings.host,
@@ -14,5 +23,52 @@ def main() -> None:
     )
 
 
+def serve(workers: int) -> None:
+    """Run ``workers`` shard processes that share the public port.
+
+    Each process owns the events whose ids hash to its shard index and listens on
+    the public port (the kernel spreads connections via SO_REUSEPORT) plus a
+    private Unix socket that peers relay owner-bound requests to.
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("Multi-worker mode needs SO_REUSEPORT support.")
+    socket_dir = settings.shard_socket_dir or tempfile.mkdtemp(prefix="ticketing-shards-")
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(workers):
+        # Spawned children read their shard settings from the environment on import.
+        os.environ.update(
+            SHARD_INDEX=str(index),
+            SHARD_COUNT=str(workers),
+            SHARD_SOCKET_DIR=socket_dir,
+        )
+        process = context.Process(target=_run_shard, args=(index, socket_dir), name=f"shard-{index}")
+        process.start()
+        processes.append(process)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def _run_shard(index: int, socket_dir: str) -> None:
+    public = socket.socket(socket.AF_INET6 if ":" in settings.host else socket.AF_INET, socket.SOCK_STREAM)
+    public.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    public.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    public.bind((settings.host, settings.port))
+
+    path = socket_path(socket_dir, index)
+    path.unlink(missing_ok=True)
+    private = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    private.bind(str(path))
+
+    config = uvicorn.Config("ticketing_service.main:app", log_level=settings.log_level.lower())
+    uvicorn.Server(config).run(sockets=[public, private])
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import socket
+from collections.abc import MutableMapping
+from http.client import HTTPConnection
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Thread
+from typing import Any
+from uuid import UUID, uuid4
+
+logger = logging.getLogger("ticketing_service")
+
+# Carries the original client's key on requests relayed between shards.
+CLIENT_HEADER = b"x-shard-client"
+
+
+def shard_for(key: UUID, shard_count: int) -> int:
+    """Return the shard that owns ``key``; uuid4 bits are uniform, so a modulus spreads evenly."""
+    return key.int % shard_count
+
+
+def new_owned_id(shard_index: int, shard_count: int) -> UUID:
+    """Draw a random UUID owned by ``shard_index``; this takes ``shard_count`` draws on average."""
+    while True:
+        candidate = uuid4()
+        if shard_count == 1 or candidate.int % shard_count == shard_index:
+            return candidate
+
+
+def colocated_id(key: UUID, shard_count: int) -> UUID:
+    """Draw a random UUID owned by the same shard as ``key``."""
+    return new_owned_id(shard_for(key, shard_count), shard_count)
+
+
+def socket_path(directory: Path | str, shard_index: int) -> Path:
+    return Path(directory) / f"shard-{shard_index}.sock"
+
+
+def shard_file(path: str, shard_index: int, shard_count: int) -> str:
+    """Give each shard its own copy of a data file such as the write-ahead log."""
+    return path if shard_count == 1 or not path else f"{path}.shard{shard_index}"
+
+
+def is_internal(scope: MutableMapping[str, Any]) -> bool:
+    """Whether a request arrived over a shard's Unix socket rather than the public listener."""
+    server = scope.get("server")
+    return server is not None and server[1] is None
+
+
+def client_key(scope: MutableMapping[str, Any]) -> str:
+    """Identify the client behind a request: its address, or the one a peer shard relayed it for."""
+    if is_internal(scope):
+        for name, value in scope["headers"]:
+            if name == CLIENT_HEADER:
+                return value.decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class SoldOutRelay:
+    """Copy sold-out changes of this shard's events to every peer, off the booking path.
+
+    Peers answer event listings from their own copy of each event, so they need
+    the flag as well. Changes are sent in order by one background thread;
+    delivery is best effort and a peer that is down misses the change.
+    """
+
+    def __init__(self, shard_index: int, shard_count: int, socket_dir: Path | str) -> None:
+        self._peers = [str(socket_path(socket_dir, index)) for index in range(shard_count) if index != shard_index]
+        self._queue: SimpleQueue[tuple[UUID, bool]] = SimpleQueue()
+        Thread(target=self._run, name="sold-out-relay", daemon=True).start()
+
+    def publish(self, event_id: UUID, sold_out: bool) -> None:
+        self._queue.put((event_id, sold_out))
+
+    def _run(self) -> None:
+        while True:
+            event_id, sold_out = self._queue.get()
+            for peer in self._peers:
+                connection = _UnixHTTPConnection(peer)
+                try:
+                    connection.request("PUT" if sold_out else "DELETE", f"/internal/events/{event_id}/sold-out")
+                    connection.getresponse().read()
+                except OSError:
+                    logger.warning("Could not relay sold-out state of %s to %s", event_id, peer)
+                finally:
+                    connection.close()
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost", timeout=5)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Event as StopSignal
+from threading import Thread
+from uuid import UUID
+
+from ticketing_service.models import Booking, BookingStatus
+from ticketing_service.occupancy import SeatOccupancy
+from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.wal import WriteAheadLog, decode_event, drop_segments, encode_event
+
+logger = logging.getLogger("ticketing_service")
+
+# Layout: MAGIC, per-event bitmap and booking sections, JSON header, header length, MAGIC.
+# The header sits at the end so sections can be streamed out before their offsets are known.
+_MAGIC = b"TKSNAP01"
+_TRAILER = struct.Struct("<Q")
+# Booking id, status, created/updated/expires in epoch microseconds (-1 for none), seat count.
+_BOOKING = struct.Struct("<16sBqqqI")
+_STATUSES = list(BookingStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def write_snapshot(
+    path: Path | str,
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+    wal: WriteAheadLog | None = None,
+) -> int:
+    """Write a snapshot of both repositories and return the LSN it covers.
+
+    The log is rotated first, so every record at or below the returned LSN is
+    already reflected in memory when each event is copied. Events are copied one
+    at a time under their own lock; records that land meanwhile are replayed on
+    recovery, which is safe because repository restores are idempotent. Once the
+    snapshot is durable the log segments it covers are deleted.
+    """
+    path = Path(path)
+    covered_lsn = wal.rotate() - 1 if wal is not None else 0
+    temporary = path.with_name(path.name + ".tmp")
+    entries = []
+    with open(temporary, "wb") as handle:
+        handle.write(_MAGIC)
+        for event in event_repository.list():
+            bitmap, capacity, bookings = booking_repository.export_event(event.id)
+            entry = encode_event(event)
+            entry["capacity"] = capacity
+            entry["bitmap"] = None
+            if bitmap is not None:
+                entry["bitmap"] = handle.tell()
+                handle.write(bitmap)
+            entry["bookings"] = [handle.tell(), len(bookings)]
+            handle.write(_encode_bookings(bookings))
+            entries.append(entry)
+        header = json.dumps({"lsn": covered_lsn, "events": entries}, separators=(",", ":")).encode()
+        handle.write(header)
+        handle.write(_TRAILER.pack(len(header)))
+        handle.write(_MAGIC)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+    _fsync_directory(path.parent)
+    if wal is not None:
+        drop_segments(wal.path, covered_lsn)
+    return covered_lsn
+
+
+def load_snapshot(
+    path: Path | str,
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+) -> int:
+    """Load the snapshot at ``path`` and return the LSN it covers, or 0 if there is none."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        size = len(view)
+        if view[: len(_MAGIC)] != _MAGIC or view[size - len(_MAGIC) :] != _MAGIC:
+            raise ValueError(f"{path} is not a ticketing snapshot.")
+        header_end = size - len(_MAGIC) - _TRAILER.size
+        (header_length,) = _TRAILER.unpack_from(view, header_end)
+        header = json.loads(view[header_end - header_length : header_end])
+
+        for entry in header["events"]:
+            event = decode_event(entry)
+            event_repository.restore(event)
+            if entry["bitmap"] is None:
+                continue
+            capacity = entry["capacity"]
+            bitmap_offset = entry["bitmap"]
+            occupancy = SeatOccupancy.from_bitmap(
+                capacity,
+                view[bitmap_offset : bitmap_offset + (capacity + 7) // 8],
+            )
+            offset, count = entry["bookings"]
+            bookings = _decode_bookings(view, offset, count, event.id)
+            booking_repository.load_event(event.id, occupancy, bookings)
+    return header["lsn"]
+
+
+class SnapshotScheduler:
+    """Background thread that snapshots the repositories every ``interval`` seconds."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        event_repository: EventRepository,
+        booking_repository: BookingRepository,
+        wal: WriteAheadLog,
+        interval: float,
+    ) -> None:
+        self._path = Path(path)
+        self._event_repository = event_repository
+        self._booking_repository = booking_repository
+        self._wal = wal
+        self._interval = interval
+        self._stop = StopSignal()
+        self._thread = Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_lsn = self._wal.next_lsn
+        while not self._stop.wait(self._interval):
+            # Skip idle periods; there is nothing new to compact.
+            if self._wal.next_lsn == last_lsn:
+                continue
+            last_lsn = self._wal.next_lsn
+            try:
+                write_snapshot(self._path, self._event_repository, self._booking_repository, self._wal)
+            except Exception:
+                logger.exception("Failed to write snapshot to %s", self._path)
+
+
+def _encode_bookings(bookings: list[Booking]) -> bytes:
+    buffer = bytearray()
+    pack = _BOOKING.pack
+    for booking in bookings:
+        expires_at = booking.expires_at
+        buffer += pack(
+            booking.id.bytes,
+            _STATUS_CODES[booking.status],
+            (booking.created_at - _EPOCH) // _MICROSECOND,
+            (booking.updated_at - _EPOCH) // _MICROSECOND,
+            (expires_at - _EPOCH) // _MICROSECOND if expires_at is not None else -1,
+            len(booking.seats),
+        )
+        buffer += struct.pack(f"<{len(booking.seats)}I", *booking.seats)
+    return bytes(buffer)
+
+
+def _decode_bookings(view: mmap.mmap, offset: int, count: int, event_id: UUID) -> list[Booking]:
+    bookings = []
+    unpack_from = _BOOKING.unpack_from
+    record_size = _BOOKING.size
+    seat_formats: dict[int, struct.Struct] = {}
+    for _ in range(count):
+        raw_id, status_code, created_us, updated_us, expires_us, seat_count = unpack_from(view, offset)
+        offset += record_size
+        seat_format = seat_formats.get(seat_count)
+        if seat_format is None:
+            seat_format = seat_formats[seat_count] = struct.Struct(f"<{seat_count}I")
+        seats = seat_format.unpack_from(view, offset)
+        offset += seat_format.size
+        created_at = _EPOCH + timedelta(microseconds=created_us)
+        bookings.append(
+            _trusted_booking(
+                UUID(bytes=raw_id),
+                event_id,
+                seats,
+                _STATUSES[status_code],
+                created_at,
+                created_at if updated_us == created_us else _EPOCH + timedelta(microseconds=updated_us),
+                _EPOCH + timedelta(microseconds=expires_us) if expires_us >= 0 else None,
+            )
+        )
+    return bookings
+
+
+def _trusted_booking(
+    booking_id: UUID,
+    event_id: UUID,
+    seats: tuple[int, ...],
+    status: BookingStatus,
+    created_at: datetime,
+    updated_at: datetime,
+    expires_at: datetime | None,
+) -> Booking:
+    # Snapshots only hold bookings that passed validation when they were created, and
+    # re-running __post_init__ would dominate cold-start time for large events.
+    booking = object.__new__(Booking)
+    set_field = object.__setattr__
+    set_field(booking, "id", booking_id)
+    set_field(booking, "event_id", event_id)
+    set_field(booking, "seats", seats)
+    set_field(booking, "status", status)
+    set_field(booking, "created_at", created_at)
+    set_field(booking, "updated_at", updated_at)
+    set_field(booking, "expires_at", expires_at)
+    return booking
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime
+from enum import StrEnum
+from pathlib import Path
+from threading import Condition, Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from ticketing_service.models import Booking, BookingStatus, Event, SeatLayout, SeatRow
+
+if TYPE_CHECKING:
+    from ticketing_service.repositories import BookingRepository, EventRepository
+
+logger = logging.getLogger("ticketing_service")
+
+
+class FsyncPolicy(StrEnum):
+    ALWAYS = "always"
+    BATCHED = "batched"
+    OS = "os"
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log written by a single group-commit thread.
+
+    ``append`` only queues a record and returns its log sequence number (LSN);
+    ``wait`` blocks until that LSN is safe under the configured policy:
+
+    * ``always``: fsynced. Records queued while an fsync is in flight share the
+      next one, so concurrent writers cost one fsync per batch, not per record.
+    * ``batched``: written to the OS; fsync runs at most every ``batch_interval``.
+    * ``os``: written to the OS; flushing to disk is left to the kernel.
+
+    ``rotate`` seals the active file as a segment named after the first LSN that
+    follows it, which lets snapshots discard the log prefix they cover.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        fsync_policy: FsyncPolicy | str = FsyncPolicy.ALWAYS,
+        batch_interval: float = 0.005,
+        next_lsn: int = 1,
+    ) -> None:
+        self._path = Path(path)
+        self._file = open(self._path, "ab")
+        self._policy = FsyncPolicy(fsync_policy)
+        self._batch_interval = batch_interval
+        self._lock = Lock()
+        # Held by whoever is touching the file: the writer thread or ``rotate``.
+        self._io_lock = Lock()
+        self._work = Condition(self._lock)
+        self._done = Condition(self._lock)
+        self._pending: list[bytes] = []
+        self._next_lsn = next_lsn
+        self._written_lsn = next_lsn - 1
+        self._synced_lsn = next_lsn - 1
+        self._error: OSError | None = None
+        self._closed = False
+        self._thread = Thread(target=self._run, name="wal-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def next_lsn(self) -> int:
+        return self._next_lsn
+
+    def append(self, op: str, payload: dict[str, Any]) -> int:
+        body = json.dumps({"op": op, **payload}, separators=(",", ":")).encode()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write-ahead log is closed.")
+            self._raise_if_failed()
+            lsn = self._next_lsn
+            self._next_lsn += 1
+            self._pending.append(b'{"lsn":%d,' % lsn + body[1:] + b"\n")
+            if len(self._pending) == 1:
+                self._work.notify()
+        return lsn
+
+    def check(self) -> None:
+        """Raise if a write has failed; nothing logged since can be made durable."""
+        with self._lock:
+            self._raise_if_failed()
+
+    def wait(self, lsn: int) -> None:
+        with self._lock:
+            while True:
+                self._raise_if_failed()
+                safe_lsn = self._synced_lsn if self._policy is FsyncPolicy.ALWAYS else self._written_lsn
+                if safe_lsn >= lsn:
+                    return
+                self._done.wait()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Write-ahead log is unavailable.") from self._error
+
+    def rotate(self) -> int:
+        """Seal the active file and return the first LSN the new file will hold."""
+        with self._io_lock:
+            with self._lock:
+                first_lsn = self._written_lsn + 1
+            self._file.flush()
+            if self._policy is not FsyncPolicy.OS:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._path, segment_path(self._path, first_lsn))
+            self._file = open(self._path, "ab")
+        return first_lsn
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._work.notify()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        last_sync = monotonic()
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    if self._policy is FsyncPolicy.BATCHED and self._synced_lsn < self._written_lsn:
+                        remaining = self._batch_interval - (monotonic() - last_sync)
+                        if remaining <= 0:
+                            break
+                        self._work.wait(remaining)
+                    else:
+                        self._work.wait()
+                batch, self._pending = self._pending, []
+                upto = self._next_lsn - 1
+                closed = self._closed
+
+            try:
+                with self._io_lock:
+                    if batch:
+                        self._file.write(b"".join(batch))
+                        self._file.flush()
+                    if self._policy is FsyncPolicy.ALWAYS:
+                        sync = bool(batch)
+                    elif self._policy is FsyncPolicy.BATCHED:
+                        sync = closed or monotonic() - last_sync >= self._batch_interval
+                    else:
+                        sync = False
+                    if sync:
+                        os.fsync(self._file.fileno())
+                        last_sync = monotonic()
+                    # Publish under the I/O lock so ``rotate`` never splits a batch.
+                    with self._lock:
+                        self._written_lsn = upto
+                        if sync:
+                            self._synced_lsn = upto
+                        self._done.notify_all()
+                        if closed and not self._pending:
+                            return
+            except OSError as exc:
+                logger.exception("Write-ahead log write failed")
+                with self._lock:
+                    self._error = exc
+                    self._done.notify_all()
+                return
+
+
+def encode_event(event: Event) -> dict[str, Any]:
+    data = {
+        "id": str(event.id),
+        "name": event.name,
+        "starts_at": event.starts_at.isoformat(),
+        "venue": event.venue,
+        "total_seats": event.total_seats,
+        "created_at": event.created_at.isoformat(),
+        "updated_at": event.updated_at.isoformat(),
+    }
+    if event.layout is not None:
+        data["layout"] = [[row.section, row.name, row.tier, row.last_seat] for row in event.layout.rows]
+    return data
+
+
+def decode_event(data: dict[str, Any]) -> Event:
+    layout = None
+    if "layout" in data:
+        rows, first_seat = [], 1
+        for section, name, tier, last_seat in data["layout"]:
+            rows.append(SeatRow(section, name, tier, first_seat, last_seat))
+            first_seat = last_seat + 1
+        layout = SeatLayout(tuple(rows))
+    return Event(
+        id=UUID(data["id"]),
+        name=data["name"],
+        starts_at=datetime.fromisoformat(data["starts_at"]),
+        venue=data["venue"],
+        total_seats=data["total_seats"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        updated_at=datetime.fromisoformat(data["updated_at"]),
+        layout=layout,
+    )
+
+
+def encode_booking(booking: Booking) -> dict[str, Any]:
+    return {
+        "id": str(booking.id),
+        "event_id": str(booking.event_id),
+        "seats": list(booking.seats),
+        "status": booking.status.value,
+        "created_at": booking.created_at.isoformat(),
+        "updated_at": booking.updated_at.isoformat(),
+        "expires_at": booking.expires_at.isoformat() if booking.expires_at else None,
+    }
+
+
+def decode_booking(data: dict[str, Any]) -> Booking:
+    return Booking(
+        id=UUID(data["id"]),
+        event_id=UUID(data["event_id"]),
+        seats=tuple(data["seats"]),
+        status=BookingStatus(data["status"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+        updated_at=datetime.fromisoformat(data["updated_at"]),
+        expires_at=datetime.fromisoformat(data["expires_at"]) if data["expires_at"] else None,
+    )
+
+
+def segment_path(path: Path, first_lsn: int) -> Path:
+    return path.with_name(f"{path.name}.{first_lsn:016d}")
+
+
+def segment_paths(path: Path | str) -> list[tuple[int, Path]]:
+    """Return sealed segments of the log at ``path`` as (first LSN, path), oldest first."""
+    path = Path(path)
+    segments = []
+    for candidate in path.parent.glob(f"{path.name}.*"):
+        suffix = candidate.name[len(path.name) + 1 :]
+        if suffix.isdigit():
+            segments.append((int(suffix), candidate))
+    return sorted(segments)
+
+
+def drop_segments(path: Path | str, upto_lsn: int) -> None:
+    """Delete sealed segments whose records all have an LSN at or below ``upto_lsn``."""
+    for first_lsn, segment in segment_paths(path):
+        # A segment holds the records *before* the LSN in its name.
+        if first_lsn - 1 <= upto_lsn:
+            segment.unlink(missing_ok=True)
+
+
+def replay(
+    path: Path | str,
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+    after_lsn: int = 0,
+) -> int:
+    """Apply log records newer than ``after_lsn`` and return the last LSN in the log.
+
+    Sealed segments entirely at or below ``after_lsn`` are skipped without being
+    read. A torn record at the end of the active file, left by a crash mid-write,
+    is truncated so appends resume cleanly.
+    """
+    path = Path(path)
+    last_lsn = after_lsn
+    for first_lsn, segment in segment_paths(path):
+        last_lsn = max(last_lsn, first_lsn - 1)
+        if first_lsn - 1 > after_lsn:
+            _replay_file(segment, event_repository, booking_repository, after_lsn)
+    if path.exists():
+        last_lsn = max(last_lsn, _replay_file(path, event_repository, booking_repository, after_lsn, truncate=True))
+    return last_lsn
+
+
+def _replay_file(
+    path: Path,
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+    after_lsn: int,
+    truncate: bool = False,
+) -> int:
+    last_lsn = after_lsn
+    good_bytes = 0
+    with open(path, "rb") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("Truncating torn write-ahead log record at byte %d", good_bytes)
+                break
+            if not line.endswith(b"\n"):
+                break
+            good_bytes += len(line)
+            lsn = record["lsn"]
+            last_lsn = max(last_lsn, lsn)
+            if lsn > after_lsn:
+                apply_record(record, event_repository, booking_repository)
+    if truncate and good_bytes < path.stat().st_size:
+        os.truncate(path, good_bytes)
+    return last_lsn
+
+
+def open_wal(
+    path: Path | str,
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+    fsync_policy: FsyncPolicy | str = FsyncPolicy.ALWAYS,
+    batch_interval: float = 0.005,
+    after_lsn: int = 0,
+) -> WriteAheadLog:
+    """Replay the log at ``path`` past ``after_lsn`` and start logging repository writes."""
+    last_lsn = replay(path, event_repository, booking_repository, after_lsn=after_lsn)
+    wal = WriteAheadLog(path, fsync_policy=fsync_policy, batch_interval=batch_interval, next_lsn=last_lsn + 1)
+    event_repository.attach_wal(wal)
+    booking_repository.attach_wal(wal)
+    return wal
+
+
+def apply_record(
+    record: dict[str, Any],
+    event_repository: EventRepository,
+    booking_repository: BookingRepository,
+) -> None:
+    op = record["op"]
+    if op == "event":
+        event_repository.restore(decode_event(record["event"]))
+    elif op == "booking":
+        booking = decode_booking(record["booking"])
+        event = event_repository.get(booking.event_id)
+        booking_repository.restore(booking, total_seats=event.total_seats if event else None)
+    else:
+        raise ValueError(f"Unknown write-ahead log record: {op}")
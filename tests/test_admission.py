@@ -0,0 +1,69 @@
+from uuid import uuid4
+
+import pytest
+
+from ticketing_service.api import admission
+from ticketing_service.api.admission import WaitingRoom
+
+
+def test_waiting_room_admits_in_order_at_the_configured_rate(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(admission, "time", lambda: now[0])
+    room = WaitingRoom(secret=b"secret")
+    event_id = uuid4()
+    room.open(event_id, rate_per_second=2, burst=1, admission_ttl_seconds=60)
+
+    tickets = [room.join(event_id) for _ in range(5)]
+    assert [ticket.admitted for ticket in tickets] == [True, False, False, False, False]
+    assert [ticket.position for ticket in tickets[1:]] == [1, 2, 3, 4]
+    assert tickets[4].eta_seconds == 2.0
+
+    now[0] += 1.0
+    assert [room.check(ticket.token).admitted for ticket in tickets] == [True, True, True, False, False]
+    assert room.check(tickets[4].token).position == 2
+    assert room.state(event_id).admitted == 3
+
+    # Slowing the queue keeps everyone's place.
+    room.open(event_id, rate_per_second=1, burst=1, admission_ttl_seconds=60)
+    now[0] += 1.0
+    assert room.check(tickets[3].token).admitted is True
+    assert room.check(tickets[4].token).admitted is False
+
+    now[0] += 120
+    assert room.check(tickets[0].token).expired is True
+
+
+def test_waiting_room_rejects_forged_and_stale_tokens() -> None:
+    room = WaitingRoom(secret=b"secret")
+    event_id = uuid4()
+    room.open(event_id, rate_per_second=10)
+    token = room.join(event_id).token
+
+    with pytest.raises(ValueError):
+        WaitingRoom(secret=b"other").check(token)
+    with pytest.raises(ValueError):
+        room.check(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+    with pytest.raises(ValueError):
+        room.check("garbage")
+
+    room.close(event_id)
+    room.open(event_id, rate_per_second=10)
+    with pytest.raises(ValueError):
+        room.check(token)
+    with pytest.raises(KeyError):
+        room.join(uuid4())
+
+
+def test_waiting_room_tokens_are_bound_to_their_client_and_spent_once() -> None:
+    room = WaitingRoom(secret=b"secret")
+    event_id = uuid4()
+    room.open(event_id, rate_per_second=10, burst=1)
+    token = room.join(event_id, "10.0.0.1").token
+
+    with pytest.raises(ValueError):
+        room.check(token, "10.0.0.2")
+    ticket = room.check(token, "10.0.0.1")
+    assert room.claim(ticket) is True
+    assert room.claim(ticket) is False
+    room.release(ticket)
+    assert room.claim(ticket) is True
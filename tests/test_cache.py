@@ -0,0 +1,22 @@
+from ticketing_service.api.cache import ResponseCache, etag_matches, make_etag
+
+
+def test_response_cache_evicts_least_recently_used() -> None:
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert len(cache) == 2
+
+
+def test_etag_matching_handles_lists_and_weak_tags() -> None:
+    etag = make_etag(3, "count")
+    assert etag_matches(etag, etag) is True
+    assert etag_matches(f'"other", W/{etag}', etag) is True
+    assert etag_matches("*", etag) is True
+    assert etag_matches(make_etag(4, "count"), etag) is False
+    assert etag_matches(None, etag) is False
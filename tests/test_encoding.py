@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from ticketing_service.api.encoding import encode_booking, encode_event
+from ticketing_service.api.schemas import BookingResponse, EventResponse
+from ticketing_service.models import Booking, BookingStatus, Event
+
+
+def test_encoders_match_pydantic_output() -> None:
+    moments = [
+        datetime(2026, 1, 1, tzinfo=timezone.utc),
+        datetime(2026, 1, 1, 1, 2, 3, 123000, tzinfo=timezone.utc),
+        datetime(2026, 1, 1, 1, 2, 3, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    ]
+    for moment in moments:
+        event = Event(
+            id=uuid4(),
+            name='Quote " and ünïcode\n\x01 </tag>',
+            starts_at=moment,
+            venue="Hall \\ 1",
+            total_seats=10,
+            created_at=moment,
+            updated_at=moment,
+        )
+        fields = {field: getattr(event, field) for field in EventResponse.model_fields}
+        expected = EventResponse.model_validate(fields).model_dump_json()
+        assert encode_event(event) == expected
+
+        for expires_at in (None, moment):
+            booking = Booking(
+                id=uuid4(),
+                event_id=event.id,
+                seats=(3, 1, 2),
+                status=BookingStatus.PENDING,
+                created_at=moment,
+                updated_at=moment,
+                expires_at=expires_at,
+            )
+            fields = {field: getattr(booking, field) for field in BookingResponse.model_fields}
+            expected = BookingResponse.model_validate(fields).model_dump_json()
+            assert encode_booking(booking) == expected
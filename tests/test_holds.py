@@ -0,0 +1,57 @@
+from time import sleep
+from uuid import uuid4
+
+import pytest
+
+from ticketing_service.holds import HoldExpiryTimer
+from ticketing_service.models import BookingStatus
+from ticketing_service.repositories import BookingRepository
+
+
+def test_expiry_timer_pops_only_due_deadlines() -> None:
+    timer = HoldExpiryTimer(on_expire=lambda ids: None)
+    early, late = uuid4(), uuid4()
+    timer._heap.extend([(10.0, early), (20.0, late)])
+
+    assert timer.pop_due(5.0) == []
+    assert timer.pop_due(10.0) == [early]
+    assert len(timer) == 1
+
+
+def test_hold_confirm_and_release() -> None:
+    repo = BookingRepository()
+    event_id = uuid4()
+
+    held = repo.hold(event_id=event_id, seats=[1, 2], ttl_seconds=60, total_seats=10)
+    assert held.status is BookingStatus.PENDING
+    assert held.expires_at is not None
+    with pytest.raises(ValueError):
+        repo.reserve(event_id=event_id, seats=[2], total_seats=10)
+
+    confirmed = repo.confirm(held.id)
+    assert confirmed.status is BookingStatus.CONFIRMED
+    assert confirmed.expires_at is None
+    assert repo.list_by_event(event_id) == [confirmed]
+    with pytest.raises(ValueError):
+        repo.release(held.id)
+
+    other = repo.hold(event_id=event_id, seats=[3], ttl_seconds=60, total_seats=10)
+    assert repo.release(other.id).status is BookingStatus.CANCELLED
+    assert repo.occupancy(event_id, 10).booked_count == 2
+
+
+def test_expired_hold_frees_seats_in_background() -> None:
+    repo = BookingRepository()
+    event_id = uuid4()
+
+    held = repo.hold(event_id=event_id, seats=[5], ttl_seconds=0.05, total_seats=10)
+    for _ in range(100):
+        if repo.get(held.id).status is BookingStatus.CANCELLED:
+            break
+        sleep(0.02)
+
+    assert repo.get(held.id).status is BookingStatus.CANCELLED
+    assert repo.occupancy(event_id, 10).booked_count == 0
+    with pytest.raises(ValueError):
+        repo.confirm(held.id)
+    assert repo.reserve(event_id=event_id, seats=[5], total_seats=10).status is BookingStatus.CONFIRMED
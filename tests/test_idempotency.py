@@ -0,0 +1,138 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from ticketing_service import main
+from ticketing_service.api import idempotency
+from ticketing_service.api.idempotency import IdempotencyCache
+from ticketing_service.pipeline import BookingPipeline
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+
+def create_event() -> str:
+    main.event_repository = EventRepository()
+    main.booking_repository = BookingRepository()
+    if main.booking_pipeline is not None:
+        # The writer books into the repository it was built with, so give it the fresh one.
+        main.booking_pipeline.close()
+        main.booking_pipeline = BookingPipeline(main.booking_repository)
+    main.idempotency_cache.clear()
+    event = main.event_repository.create(
+        name="Retry Night",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Hall",
+        total_seats=10,
+    )
+    return str(event.id)
+
+
+def test_retries_replay_the_original_response() -> None:
+    event_id = create_event()
+    client = TestClient(main.app)
+    headers = {"Idempotency-Key": "order-1"}
+
+    first = client.post("/bookings", json={"event_id": event_id, "seats": [1, 2]}, headers=headers)
+    retry = client.post("/bookings", json={"event_id": event_id, "seats": [1, 2]}, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+    reused = client.post("/bookings", json={"event_id": event_id, "seats": [3]}, headers=headers)
+    assert reused.status_code == 422
+    other = client.post("/bookings", json={"event_id": event_id, "seats": [3]}, headers={"Idempotency-Key": "order-2"})
+    assert other.status_code == 201
+    assert main.booking_repository.count_by_event(UUID(event_id)) == 2
+    assert client.post("/bookings", json={}, headers={"Idempotency-Key": "x" * 300}).status_code == 400
+
+    # Another client picking the same key gets its own booking, not the first client's response.
+    neighbour = TestClient(main.app, client=("10.0.0.2", 50000))
+    theirs = neighbour.post("/bookings", json={"event_id": event_id, "seats": [4]}, headers=headers)
+    assert theirs.status_code == 201
+    assert "idempotent-replayed" not in theirs.headers
+    assert theirs.json()["seats"] == [4]
+
+
+def test_admission_rejections_are_not_replayed() -> None:
+    event_id = create_event()
+    client = TestClient(main.app)
+    headers = {"Idempotency-Key": "order-1"}
+    booking = {"event_id": event_id, "seats": [1]}
+    client.put(f"/events/{event_id}/waiting-room", json={"rate_per_second": 1, "burst": 1})
+    try:
+        assert client.post("/bookings", json=booking, headers=headers).status_code == 403
+        token = client.post(f"/events/{event_id}/waiting-room/tickets").json()["token"]
+        admitted = client.post("/bookings", json=booking, headers={**headers, "X-Queue-Token": token})
+        assert admitted.status_code == 201
+        assert "idempotent-replayed" not in admitted.headers
+    finally:
+        client.delete(f"/events/{event_id}/waiting-room")
+
+
+def test_concurrent_duplicates_run_once() -> None:
+    event_id = create_event()
+    body = json.dumps({"event_id": event_id, "seats": [7]}).encode()
+
+    async def post() -> tuple[int, bytes]:
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        response: list[dict] = []
+
+        async def receive() -> dict:
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            response.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/bookings",
+            "raw_path": b"/bookings",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"idempotency-key", b"checkout-42"),
+            ],
+            "client": ("10.9.8.7", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        await main.app(scope, receive, send)
+        return response[0]["status"], b"".join(message.get("body", b"") for message in response[1:])
+
+    async def scenario() -> list[tuple[int, bytes]]:
+        return await asyncio.gather(*(post() for _ in range(50)))
+
+    results = asyncio.run(scenario())
+    assert {status for status, _ in results} == {201}
+    assert len({content for _, content in results}) == 1
+    assert main.booking_repository.count_by_event(UUID(event_id)) == 1
+
+
+def test_cache_is_bounded_by_entries_bytes_and_age(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(idempotency, "monotonic", lambda: now[0])
+    cache = IdempotencyCache(max_entries=3, max_bytes=2_000, ttl_seconds=60)
+    for index in range(5):
+        cache.store(("client", f"key-{index}", "/bookings"), b"f", 201, [], b"x" * 100)
+    assert len(cache) == 3
+    assert cache.get(("client", "key-0", "/bookings")) is None
+    assert cache.get(("client", "key-4", "/bookings")).body == b"x" * 100
+
+    cache.store(("client", "big", "/bookings"), b"f", 201, [], b"x" * 1_500)
+    assert cache.size <= 2_000
+    assert cache.get(("client", "big", "/bookings")) is not None
+    assert cache.store(("client", "huge", "/bookings"), b"f", 201, [], b"x" * 5_000).body == b"x" * 5_000
+    assert cache.get(("client", "huge", "/bookings")) is None
+
+    now[0] += 61
+    assert cache.get(("client", "big", "/bookings")) is None
+    assert len(cache) == 0
+    assert cache.size == 0
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from ticketing_service.indexes import SlotIndex
+
+
+def test_slot_index_pages_skip_removed_entries() -> None:
+    rng = random.Random(3)
+    index: SlotIndex[int] = SlotIndex()
+    expected: list[int] = []
+    for value in range(500):
+        assert index.append(value) == value
+        expected.append(value)
+        if rng.random() < 0.4:
+            victim = rng.choice(expected)
+            index.remove(victim)
+            expected.remove(victim)
+
+    assert len(index) == len(expected)
+    assert list(index) == expected
+    for offset in (0, 1, 50, len(expected) - 1, len(expected)):
+        assert index.page(offset, 25) == expected[offset : offset + 25]
+
+
+def test_slot_index_replace_and_remove_guard_dead_slots() -> None:
+    index: SlotIndex[str] = SlotIndex()
+    slot = index.append("pending")
+    index.replace(slot, "confirmed")
+    assert index.get(slot) == "confirmed"
+
+    index.remove(slot)
+    assert index.get(slot) == "confirmed"
+    assert index.is_live(slot) is False
+    with pytest.raises(KeyError):
+        index.remove(slot)
+    with pytest.raises(KeyError):
+        index.replace(slot, "again")
+
+
+def test_slot_index_from_items_matches_incremental_build() -> None:
+    items = list(range(100))
+    live = [value % 3 != 0 for value in items]
+    index = SlotIndex.from_items(items, live)
+
+    expected = [value for value in items if value % 3 != 0]
+    assert len(index) == len(expected)
+    assert index.page(10, 20) == expected[10:30]
+    assert index.items() == items
+    index.remove(1)
+    assert index.page(0, 2) == [2, 4]
+
+
+def test_slot_index_scan_follows_cursors_across_removals() -> None:
+    index: SlotIndex[int] = SlotIndex()
+    for value in range(10):
+        index.append(value)
+
+    page, cursor = index.scan(4)
+    assert (page, cursor) == ([0, 1, 2, 3], 4)
+    index.remove(4)
+    index.remove(5)
+    page, cursor = index.scan(4, slot=cursor)
+    assert (page, cursor) == ([6, 7, 8, 9], None)
+    assert index.scan(4, offset=20) == ([], None)
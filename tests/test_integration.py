@@ -1,14 +1,26 @@
+import threading
 from datetime import datetime, timedelta, timezone
 
 from fastapi.testclient import TestClient
 
 from ticketing_service import main
+from ticketing_service.pipeline import BookingPipeline
 from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.wal import open_wal
 
 
 def reset_repositories() -> None:
     main.event_repository = EventRepository()
-    main.booking_repository = BookingRepository()
+    main.booking_repository = BookingRepository(on_sold_out=main.publish_sold_out)
+    restart_pipeline()
+    main.rate_limiter.clear()
+
+
+def restart_pipeline() -> None:
+    if main.booking_pipeline is not None:
+        # The writer books into the repository it was built with, so give it the fresh one.
+        main.booking_pipeline.close()
+        main.booking_pipeline = BookingPipeline(main.booking_repository)
 
 
 def test_event_and_booking_flow_end_to_end() -> None:
@@ -87,3 +99,392 @@ def test_invalid_event_start_date_is_rejected() -> None:
     }
     response = client.post("/events", json=event_payload)
     assert response.status_code == 422
+
+
+def test_seat_availability_supports_conditional_requests() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "Polling Event",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 10,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+
+    first = client.get(f"/events/{event_id}/seats?detail=range")
+    assert first.status_code == 200
+    assert first.json()["available_ranges"] == [[1, 10]]
+    etag = first.headers["etag"]
+
+    unchanged = client.get(f"/events/{event_id}/seats?detail=range", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [4]}).status_code == 201
+
+    changed = client.get(f"/events/{event_id}/seats?detail=range", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["available_ranges"] == [[1, 3], [5, 10]]
+
+
+def test_seat_layout_rolls_up_availability_by_section_and_tier() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    layout = [
+        {
+            "name": "Floor",
+            "rows": [{"name": "A", "seats": 4, "tier": "vip"}, {"name": "B", "seats": 4, "tier": "gold"}],
+        },
+        {"name": "Balcony", "rows": [{"name": "A", "seats": 2, "tier": "gold"}]},
+    ]
+    event_payload = {
+        "name": "Sectioned Show",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Opera House",
+        "total_seats": 10,
+    }
+    mismatched = client.post("/events", json={**event_payload, "total_seats": 12, "layout": layout})
+    assert mismatched.status_code == 400
+    flat_id = client.post("/events", json=event_payload).json()["id"]
+    assert client.get(f"/events/{flat_id}/seats?group_by=section").status_code == 400
+    assert client.get(f"/events/{flat_id}/layout").status_code == 404
+    event_id = client.post("/events", json={**event_payload, "layout": layout}).json()["id"]
+
+    fetched = client.get(f"/events/{event_id}/layout").json()
+    assert fetched["tiers"] == ["vip", "gold"]
+    assert fetched["sections"][1] == {
+        "name": "Balcony",
+        "rows": [{"name": "A", "tier": "gold", "first_seat": 9, "last_seat": 10}],
+    }
+
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [1, 5, 9]}).status_code == 201
+    by_section = client.get(f"/events/{event_id}/seats?group_by=section")
+    assert by_section.json()["groups"] == [
+        {"name": "Floor", "capacity": 8, "booked_count": 2, "available_count": 6},
+        {"name": "Balcony", "capacity": 2, "booked_count": 1, "available_count": 1},
+    ]
+    booking_id = client.post("/bookings", json={"event_id": event_id, "seats": [10]}).json()["id"]
+    assert client.post(f"/bookings/{booking_id}/cancel").status_code == 200
+    etag = by_section.headers["etag"]
+    by_tier = client.get(f"/events/{event_id}/seats?group_by=tier", headers={"If-None-Match": etag})
+    assert by_tier.json()["groups"] == [
+        {"name": "vip", "capacity": 4, "booked_count": 1, "available_count": 3},
+        {"name": "gold", "capacity": 6, "booked_count": 2, "available_count": 4},
+    ]
+
+
+def test_replicated_event_keeps_its_seat_layout() -> None:
+    reset_repositories()
+    layout = [{"name": "Floor", "rows": [{"name": "A", "seats": 4, "tier": "vip"}]}]
+    now = datetime.now(timezone.utc).isoformat()
+    replica = {
+        "id": "8f0c5ad2-5b0e-4a8e-9d43-3c1f6f9b2a11",
+        "name": "Sharded Show",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Opera House",
+        "total_seats": 4,
+        "created_at": now,
+        "updated_at": now,
+        "layout": layout,
+    }
+
+    async def over_shard_socket(scope, receive, send) -> None:
+        await main.app({**scope, "server": ("shard", None)}, receive, send)
+
+    assert TestClient(main.app).post("/internal/events", json=replica).status_code == 404
+    assert TestClient(over_shard_socket).post("/internal/events", json=replica).status_code == 204
+    fetched = TestClient(main.app).get(f"/events/{replica['id']}/layout").json()
+    assert fetched["sections"] == [
+        {"name": "Floor", "rows": [{"name": "A", "tier": "vip", "first_seat": 1, "last_seat": 4}]}
+    ]
+
+
+def test_hold_then_confirm_flow() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "Checkout Event",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 5,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+
+    hold = client.post("/bookings/holds", json={"event_id": event_id, "seats": [1, 2], "ttl_seconds": 120})
+    assert hold.status_code == 201
+    assert hold.json()["status"] == "PENDING"
+    assert hold.json()["expires_at"] is not None
+    hold_id = hold.json()["id"]
+
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [2]}).status_code == 409
+
+    confirm = client.post(f"/bookings/{hold_id}/confirm")
+    assert confirm.status_code == 200
+    assert confirm.json()["status"] == "CONFIRMED"
+    assert client.post(f"/bookings/{hold_id}/release").status_code == 409
+
+    second_hold_id = client.post("/bookings/holds", json={"event_id": event_id, "seats": [3]}).json()["id"]
+    release = client.post(f"/bookings/{second_hold_id}/release")
+    assert release.status_code == 200
+    assert release.json()["status"] == "CANCELLED"
+    assert client.get(f"/events/{event_id}/seats").json()["booked_count"] == 2
+
+
+def test_cancelled_booking_frees_seats_and_leaves_listing() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "Refund Event",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 5,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+    booking_id = client.post("/bookings", json={"event_id": event_id, "seats": [1, 2]}).json()["id"]
+
+    cancel = client.post(f"/bookings/{booking_id}/cancel")
+    assert cancel.status_code == 200
+    assert cancel.json()["status"] == "CANCELLED"
+    assert client.post(f"/bookings/{booking_id}/cancel").status_code == 409
+    assert client.post("/bookings/00000000-0000-4000-8000-000000000000/cancel").status_code == 404
+
+    assert client.get(f"/events/{event_id}/bookings").json() == {"items": [], "total": 0, "next_cursor": None}
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [1]}).status_code == 201
+
+
+def test_batch_booking_modes() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "Box Office",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 5,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+    items = [
+        {"event_id": event_id, "seats": [1, 2]},
+        {"event_id": event_id, "seats": [2]},
+        {"event_id": event_id, "seats": [9]},
+        {"event_id": "00000000-0000-4000-8000-000000000000", "seats": [1]},
+    ]
+
+    atomic = client.post("/bookings:batch", json={"mode": "atomic", "items": items})
+    assert atomic.status_code == 200
+    assert atomic.json()["succeeded"] == 0
+    assert [result["status_code"] for result in atomic.json()["results"]] == [424, 424, 400, 404]
+    assert client.get(f"/events/{event_id}/seats").json()["booked_count"] == 0
+
+    best_effort = client.post("/bookings:batch", json={"items": items})
+    body = best_effort.json()
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    assert [result["status_code"] for result in body["results"]] == [201, 409, 400, 404]
+    assert body["results"][0]["booking"]["seats"] == [1, 2]
+    assert client.get(f"/events/{event_id}/seats").json()["booked_count"] == 2
+
+
+def test_best_available_allocates_adjacent_seats() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "On Sale",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 6,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [2, 5]}).status_code == 201
+
+    pair = client.post("/bookings/best-available", json={"event_id": event_id, "quantity": 2})
+    assert pair.status_code == 201
+    assert pair.json()["seats"] == [3, 4]
+    assert client.post("/bookings/best-available", json={"event_id": event_id, "quantity": 2}).status_code == 409
+
+    scattered = client.post("/bookings/best-available", json={"event_id": event_id, "quantity": 2, "contiguous": False})
+    assert scattered.json()["seats"] == [1, 6]
+
+
+def test_request_middleware_sets_request_id_and_limits_body() -> None:
+    client = TestClient(main.app)
+
+    assert client.get("/health", headers={"X-Request-Id": "abc-123"}).headers["x-request-id"] == "abc-123"
+    assert client.get("/health").headers["x-request-id"]
+
+    oversized = client.post("/events", content=b"{}", headers={"Content-Length": str(10_000_000)})
+    assert oversized.status_code == 413
+    assert oversized.json()["error"] == "Payload Too Large"
+
+
+def test_list_endpoints_page_with_cursors() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+
+    event_payload = {
+        "name": "Paged",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Main Hall",
+        "total_seats": 10,
+    }
+    event_ids = [client.post("/events", json=event_payload).json()["id"] for _ in range(3)]
+    first = client.get("/events?limit=2").json()
+    second = client.get(f"/events?limit=2&cursor={first['next_cursor']}").json()
+    assert [event["id"] for event in first["items"] + second["items"]] == event_ids
+    assert second["next_cursor"] is None
+    assert client.get("/events?offset=1&limit=1").json()["items"][0]["id"] == event_ids[1]
+
+    for seat in range(1, 6):
+        client.post("/bookings", json={"event_id": event_ids[0], "seats": [seat]})
+    page = client.get(f"/events/{event_ids[0]}/bookings?limit=3").json()
+    rest = client.get(f"/events/{event_ids[0]}/bookings?limit=3&cursor={page['next_cursor']}").json()
+    assert [booking["seats"] for booking in page["items"] + rest["items"]] == [[1], [2], [3], [4], [5]]
+    assert client.get(f"/events/{event_ids[1]}/bookings?cursor={page['next_cursor']}").status_code == 400
+    assert client.get("/events?cursor=not-a-cursor").status_code == 400
+
+
+def test_events_filter_by_venue_time_window_and_availability() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+    base = datetime.now(timezone.utc) + timedelta(days=1)
+    ids = []
+    for day, venue in enumerate(["Arena", "Club", "arena ", "Arena", "Arena"]):
+        payload = {"name": f"Show {day}", "starts_at": (base + timedelta(days=day)).isoformat(), "venue": venue}
+        ids.append(client.post("/events", json={**payload, "total_seats": 1}).json()["id"])
+    assert client.post("/bookings", json={"event_id": ids[3], "seats": [1]}).status_code == 201
+
+    def names(**params) -> tuple[list[str], int]:
+        body = client.get("/events", params=params).json()
+        return [item["name"] for item in body["items"]], body["total"]
+
+    assert names(venue="ARENA") == (["Show 0", "Show 2", "Show 3", "Show 4"], 4)
+    window = {
+        "starts_after": (base + timedelta(days=1)).isoformat(),
+        "starts_before": (base + timedelta(days=4)).isoformat(),
+    }
+    assert names(**window) == (["Show 1", "Show 2", "Show 3"], 3)
+    assert names(venue="arena", available="true", **window) == (["Show 2"], 1)
+    assert names(venue="arena", available="false") == (["Show 3"], 1)
+
+    first = client.get("/events", params={"venue": "arena", "available": "true", "limit": 2}).json()
+    assert [item["name"] for item in first["items"]] == ["Show 0", "Show 2"]
+    second = client.get("/events", params={"venue": "arena", "available": "true", "cursor": first["next_cursor"]})
+    assert [item["name"] for item in second.json()["items"]] == ["Show 4"]
+    assert second.json()["next_cursor"] is None
+    assert client.get("/events", params={"venue": "club", "cursor": first["next_cursor"]}).status_code == 400
+
+    booking = client.get(f"/events/{ids[3]}/bookings").json()["items"][0]
+    client.post(f"/bookings/{booking['id']}/cancel")
+    assert names(venue="arena", available="false") == ([], 0)
+    assert client.get("/events", params={"starts_after": "2030-01-01T00:00:00"}).status_code == 400
+
+
+def test_waiting_room_gates_bookings_for_flagged_events() -> None:
+    reset_repositories()
+    client = TestClient(main.app)
+    event_payload = {
+        "name": "Hot On-Sale",
+        "starts_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat(),
+        "venue": "Stadium",
+        "total_seats": 10,
+    }
+    event_id = client.post("/events", json=event_payload).json()["id"]
+    config = {"rate_per_second": 0.001, "burst": 1}
+    assert client.put(f"/events/{event_id}/waiting-room", json=config).json()["issued"] == 0
+
+    booking = {"event_id": event_id, "seats": [1]}
+    assert client.post("/bookings", json=booking).status_code == 403
+    first = client.post(f"/events/{event_id}/waiting-room/tickets").json()
+    second = client.post(f"/events/{event_id}/waiting-room/tickets").json()
+    assert first["admitted"] is True
+    assert second["admitted"] is False
+    assert second["position"] == 1
+
+    polled = client.get(f"/events/{event_id}/waiting-room/position", headers={"X-Queue-Token": second["token"]})
+    assert polled.json()["position"] == 1
+    waiting = client.post("/bookings", json=booking, headers={"X-Queue-Token": second["token"]})
+    assert waiting.status_code == 429
+    assert int(waiting.headers["retry-after"]) > 0
+    assert client.post("/bookings", json=booking, headers={"X-Queue-Token": "forged.token"}).status_code == 403
+
+    shared = TestClient(main.app, client=("10.0.0.2", 50000))
+    assert shared.post("/bookings", json=booking, headers={"X-Queue-Token": first["token"]}).status_code == 403
+    # A request that books nothing hands the admission back.
+    rejected = client.post("/bookings", json={**booking, "seats": [11]}, headers={"X-Queue-Token": first["token"]})
+    assert rejected.status_code == 400
+    admitted = client.post("/bookings", json=booking, headers={"X-Queue-Token": first["token"]})
+    assert admitted.status_code == 201
+    replayed = client.post("/bookings", json={**booking, "seats": [3]}, headers={"X-Queue-Token": first["token"]})
+    assert replayed.status_code == 403
+    assert replayed.json()["detail"] == "Queue token has already been used."
+    batch = client.post("/bookings:batch", json={"items": [{"event_id": event_id, "seats": [2]}]})
+    assert batch.json()["results"][0]["status_code"] == 403
+
+    assert client.delete(f"/events/{event_id}/waiting-room").status_code == 204
+    assert client.post("/bookings", json={"event_id": event_id, "seats": [2]}).status_code == 201
+
+
+def test_locking_repository_calls_run_in_the_threadpool(tmp_path, monkeypatch) -> None:
+    threads: dict[str, list[str]] = {"reserve": [], "events": [], "waiting": [], "trying": [], "get": []}
+
+    class RecordingRepository(BookingRepository):
+        def reserve_batch(self, *args, **kwargs):
+            threads["reserve"].append(threading.current_thread().name)
+            return super().reserve_batch(*args, **kwargs)
+
+        def availability(self, *args, **kwargs):
+            waiting = "waiting" if kwargs.get("wait", True) else "trying"
+            threads.setdefault(waiting, []).append(threading.current_thread().name)
+            return super().availability(*args, **kwargs)
+
+        def get(self, *args, **kwargs):
+            threads["get"].append(threading.current_thread().name)
+            return super().get(*args, **kwargs)
+
+    class RecordingEvents(EventRepository):
+        def scan(self, *args, **kwargs):
+            threads["events"].append(threading.current_thread().name)
+            return super().scan(*args, **kwargs)
+
+        def search(self, *args, **kwargs):
+            threads["events"].append(threading.current_thread().name)
+            return super().search(*args, **kwargs)
+
+    reset_repositories()
+    main.event_repository = RecordingEvents()
+    main.booking_repository = RecordingRepository()
+    pipeline = BookingPipeline(main.booking_repository)
+    monkeypatch.setattr(main, "booking_pipeline", pipeline)
+    client = TestClient(main.app)
+    event = main.event_repository.create(
+        name="Durable", starts_at=datetime.now(timezone.utc) + timedelta(days=1), venue="Hall", total_seats=5
+    )
+    booking = client.post("/bookings", json={"event_id": str(event.id), "seats": [1]})
+    assert booking.status_code == 201
+    assert client.get(f"/events/{event.id}/seats?detail=range").status_code == 200
+    assert client.get(f"/events/{event.id}/seats?detail=count").status_code == 200
+    assert client.get(f"/bookings/{booking.json()['id']}").status_code == 200
+    assert client.get("/events").json()["total"] == 1
+    assert client.get("/events?available=true").json()["total"] == 1
+
+    wal = open_wal(tmp_path / "bookings.wal", main.event_repository, main.booking_repository)
+    monkeypatch.setattr(main, "wal", wal)
+    assert client.post("/bookings", json={"event_id": str(event.id), "seats": [2]}).status_code == 201
+    assert client.post("/bookings", json={"event_id": str(event.id), "seats": [2]}).status_code == 409
+    pipeline.close()
+    wal.close()
+
+    # Booking threads hold the same striped locks, so the loop only reads without them or tries them.
+    assert threads["reserve"] and all(name == "booking-pipeline" for name in threads["reserve"])
+    assert all(name.startswith("AnyIO worker") for name in threads["events"] + threads["waiting"])
+    assert len(threads["events"]) == 2
+    on_loop = threads["get"] + threads["trying"]
+    assert threads["waiting"] and threads["trying"] and threads["get"]
+    assert not any(name.startswith("AnyIO worker") for name in on_loop)
+    assert '"seats":[2]' in (tmp_path / "bookings.wal").read_text()
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from ticketing_service import main
+from ticketing_service.metrics import LOCK_BUCKETS, MetricsRegistry, TimedLock
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+
+def test_histogram_merges_writers_into_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", labelnames=("route",), buckets=(0.1, 1.0))
+    first, second = histogram.writer(("/a",)), histogram.writer(("/a",))
+    first[0] += 1
+    first[-1] += 0.05
+    second[2] += 1
+    second[-1] += 3.0
+
+    assert registry.render().decode().splitlines() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a",le="1.0"} 1',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 2',
+        'demo_seconds_sum{route="/a"} 3.05',
+        'demo_seconds_count{route="/a"} 2',
+    ]
+
+
+def test_timed_lock_records_contended_waits_and_holds() -> None:
+    registry = MetricsRegistry()
+    wait = registry.histogram("wait_seconds", "Wait.", buckets=LOCK_BUCKETS)
+    hold = registry.histogram("hold_seconds", "Hold.", buckets=LOCK_BUCKETS)
+    lock = TimedLock(wait, hold)
+    acquired = threading.Event()
+
+    def holder() -> None:
+        with lock:
+            acquired.set()
+            time.sleep(0.02)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    acquired.wait()
+    with lock:
+        pass
+    thread.join()
+
+    waits, holds = wait.collect()[()], hold.collect()[()]
+    assert sum(waits[:-1]) == sum(holds[:-1]) == 2
+    # The holder got the lock at once; the main thread waited for most of the sleep.
+    assert waits[0] == 1 and waits[-1] >= 0.01
+    assert holds[-1] >= 0.02
+
+
+def test_metrics_endpoint_reports_requests_by_route_template() -> None:
+    main.event_repository = EventRepository()
+    main.booking_repository = BookingRepository()
+    main.rate_limiter.clear()
+    client = TestClient(main.app)
+    missing = "00000000-0000-0000-0000-000000000000"
+    for _ in range(3):
+        assert client.get(f"/events/{missing}/seats").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    series = 'ticketing_http_request_duration_seconds_count{method="GET",route="/events/{event_id}/seats",status="404"}'
+    assert any(line.startswith(series) and int(line.split()[-1]) >= 3 for line in text.splitlines())
+    assert f"/events/{missing}" not in text
+    assert "# TYPE ticketing_booking_lock_hold_seconds histogram" in text
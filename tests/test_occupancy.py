@@ -0,0 +1,135 @@
+import random
+
+from ticketing_service.models import SeatLayout
+from ticketing_service.occupancy import SeatOccupancy
+
+
+def test_occupancy_counts_and_memory() -> None:
+    occupancy = SeatOccupancy(100_000)
+    assert occupancy.nbytes == 12_500
+    assert occupancy.available_count == 100_000
+
+    occupancy.occupy([1, 2, 100_000])
+    assert occupancy.booked_count == 3
+    assert occupancy.available_count == 99_997
+    assert occupancy.any_booked([5, 100_000]) is True
+    assert occupancy.any_booked([5, 6]) is False
+
+    occupancy.release([2])
+    assert occupancy.booked_count == 2
+    assert occupancy.is_booked(2) is False
+
+
+def test_occupancy_pages_and_ranges_match_brute_force() -> None:
+    rng = random.Random(7)
+    capacity = 203
+    occupancy = SeatOccupancy(capacity)
+    booked = set(rng.sample(range(1, capacity + 1), 90))
+    occupancy.occupy(booked)
+
+    free = [seat for seat in range(1, capacity + 1) if seat not in booked]
+    for offset in (0, 1, 17, 100, 112, 500):
+        assert occupancy.available_seats(offset=offset, limit=25) == free[offset : offset + 25]
+
+    expected_ranges: list[list[int]] = []
+    for seat in free:
+        if expected_ranges and expected_ranges[-1][1] == seat - 1:
+            expected_ranges[-1][1] = seat
+        else:
+            expected_ranges.append([seat, seat])
+    assert occupancy.available_ranges() == expected_ranges
+
+
+def test_occupancy_grows_to_new_capacity() -> None:
+    occupancy = SeatOccupancy(3)
+    occupancy.occupy([3])
+    occupancy.ensure_capacity(10)
+    assert occupancy.capacity == 10
+    assert occupancy.available_ranges() == [[1, 2], [4, 10]]
+
+
+def test_occupancy_indexes_track_occupy_and_release() -> None:
+    rng = random.Random(11)
+    capacity = 1_000
+    occupancy = SeatOccupancy(capacity)
+    booked: set[int] = set()
+    for _ in range(2_000):
+        seat = rng.randint(1, capacity)
+        if seat in booked:
+            occupancy.release([seat])
+            booked.discard(seat)
+        else:
+            occupancy.occupy([seat])
+            booked.add(seat)
+
+    free = [seat for seat in range(1, capacity + 1) if seat not in booked]
+    for offset in (0, 63, 64, 65, 300, len(free) - 1, len(free)):
+        assert occupancy.available_seats(offset=offset, limit=100) == free[offset : offset + 100]
+    assert sum(end - start + 1 for start, end in occupancy.available_ranges()) == len(free)
+    assert occupancy.booked_count == len(booked)
+
+
+def test_find_adjacent_matches_brute_force() -> None:
+    rng = random.Random(11)
+    capacity = 211
+    occupancy = SeatOccupancy(capacity)
+    booked: set[int] = set()
+
+    def lowest_run(quantity: int) -> int | None:
+        run = 0
+        for seat in range(1, capacity + 1):
+            run = run + 1 if seat not in booked else 0
+            if run == quantity:
+                return seat - quantity + 1
+        return None
+
+    for _ in range(200):
+        quantity = rng.randint(1, 24)
+        assert occupancy.find_adjacent(quantity) == lowest_run(quantity)
+        free = [seat for seat in range(1, capacity + 1) if seat not in booked]
+        if rng.random() < 0.6 and free:
+            chosen = rng.sample(free, min(len(free), 3))
+            occupancy.occupy(chosen)
+            booked.update(chosen)
+        elif booked:
+            chosen = rng.sample(sorted(booked), min(len(booked), 3))
+            occupancy.release(chosen)
+            booked.difference_update(chosen)
+
+
+def test_layout_counts_track_bookings_per_section_and_tier() -> None:
+    rng = random.Random(11)
+    sections = [
+        (f"S{section}", [(str(row), rng.randint(1, 30), rng.choice(["gold", "silver", "bronze"])) for row in range(8)])
+        for section in range(5)
+    ]
+    layout = SeatLayout.build(sections)
+    capacity = layout.seat_count
+    occupancy = SeatOccupancy(capacity)
+    booked = set(rng.sample(range(1, capacity + 1), capacity // 3))
+    occupancy.occupy(booked)
+    counts = occupancy.layout_counts(layout)
+
+    for _ in range(300):
+        seat = rng.randint(1, capacity)
+        if seat in booked:
+            occupancy.release([seat])
+            booked.discard(seat)
+        else:
+            occupancy.occupy([seat])
+            booked.add(seat)
+
+    assert occupancy.layout_counts(layout) is counts
+    for names, row_groups, capacities, free in (
+        (layout.sections, layout.row_sections, counts.section_capacity, counts.section_free),
+        (layout.tiers, layout.row_tiers, counts.tier_capacity, counts.tier_free),
+    ):
+        for group in range(len(names)):
+            seats = [
+                seat
+                for row, row_group in zip(layout.rows, row_groups)
+                if row_group == group
+                for seat in range(row.first_seat, row.last_seat + 1)
+            ]
+            assert capacities[group] == len(seats)
+            assert free[group] == sum(seat not in booked for seat in seats)
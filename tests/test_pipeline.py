@@ -0,0 +1,93 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ticketing_service import main
+from ticketing_service.models import Booking
+from ticketing_service.pipeline import BookingPipeline
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+
+class CountingRepository(BookingRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[int] = []
+
+    def reserve_batch(self, items, atomic=False):
+        self.batches.append(len(items))
+        return super().reserve_batch(items, atomic=atomic)
+
+
+def test_pipeline_resolves_conflicts_in_arrival_order() -> None:
+    repository = CountingRepository()
+    # A long delay holds the first batch open until it is full.
+    pipeline = BookingPipeline(repository, max_batch=3, max_delay=5.0)
+    event_id = uuid4()
+    futures = [
+        pipeline.submit(event_id, [1, 2], total_seats=10),
+        pipeline.submit(event_id, [2, 3], total_seats=10),
+        pipeline.submit(event_id, [4], total_seats=10),
+    ]
+
+    assert futures[0].result(timeout=5).seats == (1, 2)
+    with pytest.raises(ValueError, match="already booked"):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5).seats == (4,)
+    assert repository.batches == [3]
+    assert sorted(seat for booking in repository.list_by_event(event_id) for seat in booking.seats) == [1, 2, 4]
+    pipeline.close()
+
+
+def test_pipeline_batches_concurrent_callers() -> None:
+    repository = CountingRepository()
+    pipeline = BookingPipeline(repository, max_batch=64, max_delay=0.002)
+    event_ids = [uuid4() for _ in range(4)]
+    threads, per_thread = 16, 50
+    results: list[Booking] = []
+
+    def worker(index: int) -> None:
+        event_id = event_ids[index % len(event_ids)]
+        first_seat = (index // len(event_ids)) * per_thread + 1
+        for seat in range(first_seat, first_seat + per_thread):
+            results.append(pipeline.reserve(event_id, [seat], total_seats=threads * per_thread))
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    pipeline.close()
+
+    assert len(results) == len({booking.id for booking in results}) == threads * per_thread
+    assert sum(repository.batches) == threads * per_thread
+    assert len(repository.batches) < threads * per_thread
+    assert max(repository.batches) <= 64
+    with pytest.raises(RuntimeError):
+        pipeline.submit(event_ids[0], [1])
+
+
+def test_booking_endpoint_uses_pipeline_when_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    main.event_repository = EventRepository()
+    main.booking_repository = CountingRepository()
+    pipeline = BookingPipeline(main.booking_repository)
+    monkeypatch.setattr(main, "booking_pipeline", pipeline)
+    main.rate_limiter.clear()
+    client = TestClient(main.app)
+    event = main.event_repository.create(
+        name="Pipelined",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Hall",
+        total_seats=5,
+    )
+
+    created = client.post("/bookings", json={"event_id": str(event.id), "seats": [1, 2]})
+    conflict = client.post("/bookings", json={"event_id": str(event.id), "seats": [2]})
+    pipeline.close()
+
+    assert created.status_code == 201
+    assert created.json()["seats"] == [1, 2]
+    assert conflict.status_code == 409
+    assert main.booking_repository.batches == [1, 1]
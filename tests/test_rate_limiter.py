@@ -1,3 +1,4 @@
+from ticketing_service.api import runtime
 from ticketing_service.api.runtime import RateLimiter
 
 
@@ -6,3 +7,20 @@ def test_rate_limiter_blocks_after_limit() -> None:
     assert limiter.allow("client") is True
     assert limiter.allow("client") is True
     assert limiter.allow("client") is False
+
+
+def test_rate_limiter_replenishes_and_expires_idle_clients(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(runtime, "time", lambda: now[0])
+    limiter = RateLimiter(max_requests=2, window_seconds=60, shards=1)
+
+    assert limiter.allow("client") is True
+    assert limiter.allow("client") is True
+    assert limiter.allow("client") is False
+    now[0] += 30
+    assert limiter.allow("client") is True
+    assert limiter.allow("client") is False
+
+    now[0] += 120
+    limiter.allow("other")
+    assert len(limiter) == 1
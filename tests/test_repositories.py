@@ -1,5 +1,12 @@
+import random
 from datetime import datetime, timedelta, timezone
+from threading import Lock, Thread
+from uuid import uuid4
 
+import pytest
+
+from ticketing_service.indexes import SlotIndex
+from ticketing_service.metrics import Histogram, TimedLock
 from ticketing_service.models import BookingStatus
 from ticketing_service.repositories import BookingRepository, EventRepository
 
@@ -31,3 +38,137 @@ def test_booking_repository_create_and_filter() -> None:
     booking = repo.reserve(event_id=event_id, seats=[1, 2, 3], status=BookingStatus.CONFIRMED)
     assert repo.get(booking.id) is not None
     assert repo.list_by_event(event_id) == [booking]
+
+
+def test_booking_repository_locks_are_per_event() -> None:
+    repo = BookingRepository(lock_stripes=8)
+    busy_event, other_event = uuid4(), uuid4()
+    while repo._lock_for(other_event) is repo._lock_for(busy_event):
+        other_event = uuid4()
+
+    with repo._lock_for(busy_event):
+        worker = Thread(target=repo.reserve, kwargs={"event_id": other_event, "seats": [1], "total_seats": 5})
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+    assert len(repo.list_by_event(other_event)) == 1
+
+
+@pytest.mark.parametrize("timed", [False, True])
+def test_availability_can_skip_a_busy_lock(timed: bool) -> None:
+    wait, hold = Histogram("wait", "Lock wait."), Histogram("hold", "Lock hold.")
+    repo = BookingRepository(lock_factory=(lambda: TimedLock(wait, hold)) if timed else Lock)
+    event_id = uuid4()
+    assert repo.availability(event_id, 10, wait=False) is None
+    repo.reserve(event_id=event_id, seats=[1, 2], total_seats=10)
+
+    with repo._lock_for(event_id):
+        # Checked from another thread, as the event loop would while a booking thread holds the lock.
+        results = []
+        worker = Thread(target=lambda: results.append(repo.availability(event_id, 10, wait=False)))
+        worker.start()
+        worker.join(timeout=5)
+        assert results == [None]
+    assert repo.availability(event_id, 10, wait=False).booked_count == 2
+
+
+def test_booking_repository_cancel_releases_seats_and_index() -> None:
+    repo = BookingRepository()
+    event_id = uuid4()
+    first = repo.reserve(event_id=event_id, seats=[1, 2], total_seats=10)
+    second = repo.reserve(event_id=event_id, seats=[3], total_seats=10)
+
+    cancelled = repo.cancel(first.id)
+    assert cancelled.status is BookingStatus.CANCELLED
+    assert repo.get(first.id) == cancelled
+    assert repo.page_by_event(event_id, offset=0, limit=10) == [second]
+    assert repo.count_by_event(event_id) == 1
+    assert repo.occupancy(event_id, 10).booked_count == 1
+    with pytest.raises(ValueError):
+        repo.cancel(first.id)
+
+    assert repo.reserve(event_id=event_id, seats=[1], total_seats=10).seats == (1,)
+
+
+def test_reserve_batch_best_effort_and_atomic() -> None:
+    repo = BookingRepository()
+    first, second = uuid4(), uuid4()
+    repo.reserve(event_id=first, seats=[1], total_seats=10)
+
+    results = repo.reserve_batch([(first, [1, 2], 10), (second, [1], 10), (second, [1, 3], 10)])
+    assert isinstance(results[0], ValueError)
+    assert results[1].seats == (1,)
+    assert isinstance(results[2], ValueError)
+
+    results = repo.reserve_batch([(first, [5], 10), (second, [2], 10), (second, [2], 10)], atomic=True)
+    assert results[0] is None and results[1] is None
+    assert isinstance(results[2], ValueError)
+    assert repo.count_by_event(first) == 1
+
+    results = repo.reserve_batch([(first, [5], 10), (second, [2], 10)], atomic=True)
+    assert [booking.seats for booking in results] == [(5,), (2,)]
+
+
+def test_event_search_matches_a_full_scan() -> None:
+    events = EventRepository()
+    bookings = BookingRepository(on_sold_out=events.mark_sold_out)
+    base = datetime.now(timezone.utc) + timedelta(days=1)
+    rng = random.Random(7)
+    created = [
+        events.create(
+            name=f"Event {index}",
+            starts_at=base + timedelta(hours=rng.randrange(48)),
+            venue=rng.choice(["North", "South"]),
+            total_seats=1,
+        )
+        for index in range(300)
+    ]
+    for event in rng.sample(created, 100):
+        bookings.reserve(event.id, [1], total_seats=1)
+
+    after, before = base + timedelta(hours=10), base + timedelta(hours=30)
+    for venue in (None, "north"):
+        for available in (None, True, False):
+            expected = sorted(
+                (
+                    event
+                    for event in created
+                    if (venue is None or event.venue.casefold() == venue)
+                    and after <= event.starts_at < before
+                    and (available is None or events.is_sold_out(event.id) is not available)
+                ),
+                key=lambda event: (event.starts_at, created.index(event)),
+            )
+            found, cursor = [], None
+            while True:
+                page, cursor, total = events.search(7, venue, after, before, available, cursor=cursor)
+                found.extend(page)
+                if cursor is None:
+                    break
+            assert found == expected
+            assert total == len(expected)
+            assert events.search(7, venue, after, before, available, offset=5)[0] == expected[5:12]
+
+
+def test_event_search_pages_past_sold_out_events_without_visiting_them(monkeypatch: pytest.MonkeyPatch) -> None:
+    events = EventRepository()
+    base = datetime.now(timezone.utc) + timedelta(days=1)
+    created = [
+        events.create(name=f"Event {index}", starts_at=base + timedelta(minutes=index), venue="North", total_seats=1)
+        for index in range(2000)
+    ]
+    for event in created[:1900]:
+        events.mark_sold_out(event.id, True)
+    events.mark_sold_out(created[0].id, False)
+    expected = [created[0], *created[1900:]]
+
+    visited = []
+    get = SlotIndex.get
+    monkeypatch.setattr(SlotIndex, "get", lambda index, slot: (visited.append(slot), get(index, slot))[1])
+    page, cursor, total = events.search(10, "north", base, base + timedelta(days=2), True, offset=50)
+
+    assert total == len(expected)
+    assert page == expected[50:60]
+    assert cursor is not None
+    assert len(visited) == 10
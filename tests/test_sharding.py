@@ -0,0 +1,141 @@
+import json
+from datetime import datetime, timezone
+from threading import Thread
+from time import sleep
+from uuid import uuid4
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from ticketing_service.api.router import ShardRouter
+from ticketing_service.api.schemas import EventReplicaRequest
+from ticketing_service.repositories import BookingRepository
+from ticketing_service.sharding import client_key, colocated_id, new_owned_id, shard_for, socket_path
+
+
+def echo_app(name: str, received: list[tuple[str, bytes]]):
+    async def app(scope, receive, send) -> None:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        received.append((scope["path"], body))
+        if scope["path"] == "/internal/events":
+            # Accept the replica only if the real endpoint would: a JSON body that parses as an event.
+            status_code = 204 if (b"content-type", b"application/json") in scope["headers"] else 422
+            try:
+                EventReplicaRequest.model_validate_json(body)
+            except ValidationError:
+                status_code = 422
+            await send({"type": "http.response.start", "status": status_code, "headers": []})
+        elif scope["path"] == "/events":
+            now = datetime.now(timezone.utc).isoformat()
+            event = {
+                "id": str(uuid4()),
+                "name": name,
+                "starts_at": now,
+                "venue": "Hall",
+                "total_seats": 10,
+                "created_at": now,
+                "updated_at": now,
+            }
+            await send({"type": "http.response.start", "status": 201, "headers": [(b"x-shard", name.encode())]})
+            await send({"type": "http.response.body", "body": json.dumps(event).encode()})
+        elif scope["path"] == "/bookings:batch":
+            items = json.loads(body)["items"]
+            results = [{"index": index, "status_code": 201, "booking": name} for index in range(len(items))]
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": json.dumps({"results": results}).encode()})
+        else:
+            status_code = 200
+            content = json.dumps({"shard": name, "path": scope["path"]}).encode()
+            headers = [(b"x-shard", name.encode())]
+            await send({"type": "http.response.start", "status": status_code, "headers": headers})
+            await send({"type": "http.response.body", "body": content})
+
+    return app
+
+
+def test_owned_ids_map_to_their_shard() -> None:
+    for index in range(4):
+        assert shard_for(new_owned_id(index, 4), 4) == index
+    event_id = uuid4()
+    assert shard_for(colocated_id(event_id, 4), 4) == shard_for(event_id, 4)
+
+
+@pytest.mark.parametrize("shard_count", [2, 8, 64])
+def test_owned_ids_spread_over_every_lock_stripe(shard_count: int) -> None:
+    repository = BookingRepository()
+    locks = {id(repository._lock_for(new_owned_id(shard_count - 1, shard_count))) for _ in range(1500)}
+    assert len(locks) == 64
+
+
+def test_client_key_trusts_relayed_clients_only_over_shard_sockets() -> None:
+    headers = [(b"x-shard-client", b"10.0.0.9")]
+    assert client_key({"server": ("shard", None), "client": None, "headers": headers}) == "10.0.0.9"
+    assert client_key({"server": ("api", 8000), "client": ("10.0.0.1", 5000), "headers": headers}) == "10.0.0.1"
+    assert client_key({"server": ("api", 8000), "client": None, "headers": []}) == "unknown"
+
+
+def test_router_forwards_owner_bound_requests(tmp_path, caplog) -> None:
+    remote_requests: list[tuple[str, bytes]] = []
+    local_requests: list[tuple[str, bytes]] = []
+    server = uvicorn.Server(
+        uvicorn.Config(
+            echo_app("remote", remote_requests),
+            uds=str(socket_path(tmp_path, 1)),
+            lifespan="off",
+            log_level="warning",
+        )
+    )
+    thread = Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        sleep(0.01)
+    try:
+        router = ShardRouter(echo_app("local", local_requests), shard_index=0, shard_count=2, socket_dir=tmp_path)
+        client = TestClient(router)
+        remote_event, local_event = new_owned_id(1, 2), new_owned_id(0, 2)
+
+        seats = client.get(f"/events/{remote_event}/seats?detail=list")
+        assert seats.json() == {"shard": "remote", "path": f"/events/{remote_event}/seats"}
+        assert seats.headers["x-shard"] == "remote"
+        assert client.get(f"/events/{local_event}/seats").json()["shard"] == "local"
+        assert client.post(f"/bookings/{colocated_id(remote_event, 2)}/confirm").json()["shard"] == "remote"
+
+        payload = {"event_id": str(remote_event), "seats": [1]}
+        assert client.post("/bookings", json=payload).json()["shard"] == "remote"
+        assert json.loads(remote_requests[-1][1]) == payload
+        payload = {"event_id": str(local_event), "seats": [1]}
+        assert client.post("/bookings/holds", json=payload).json()["shard"] == "local"
+        assert json.loads(local_requests[-1][1]) == payload
+
+        items = [{"event_id": str(event_id), "seats": [1]} for event_id in (remote_event, local_event, remote_event)]
+        batch = client.post("/bookings:batch", json={"items": items}).json()
+        assert [result["booking"] for result in batch["results"]] == ["remote", "local", "remote"]
+        assert [result["index"] for result in batch["results"]] == [0, 1, 2]
+        assert client.post("/bookings:batch", json={"mode": "atomic", "items": items}).status_code == 400
+
+        created = client.post("/events", json={"name": "Replicated"})
+        assert created.status_code == 201
+        assert created.json()["name"] == "local"
+        assert remote_requests[-1][0] == "/internal/events"
+        assert json.loads(remote_requests[-1][1]) == {**created.json(), "layout": None}
+        layout = [{"name": "Stalls", "rows": [{"name": "A", "seats": 10, "tier": "standard"}]}]
+        created = client.post("/events", json={"name": "Laid out", "layout": layout})
+        assert json.loads(remote_requests[-1][1]) == {**created.json(), "layout": layout}
+        assert "Failed to replicate" not in caplog.text
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def test_router_reports_unreachable_owner(tmp_path) -> None:
+    router = ShardRouter(echo_app("local", []), shard_index=0, shard_count=2, socket_dir=tmp_path)
+    response = TestClient(router).get(f"/events/{new_owned_id(1, 2)}/seats")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Shard unavailable."
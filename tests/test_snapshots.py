@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from ticketing_service.indexes import SlotIndex
+from ticketing_service.models import BookingStatus
+from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.snapshots import load_snapshot, write_snapshot
+from ticketing_service.wal import open_wal, segment_paths
+
+
+def test_snapshot_and_log_tail_restore_full_state(tmp_path: Path) -> None:
+    wal_path = tmp_path / "ticketing.wal"
+    snapshot_path = tmp_path / "ticketing.snapshot"
+    events, bookings = EventRepository(), BookingRepository()
+    log = open_wal(wal_path, events, bookings)
+    event = events.create(
+        name="Snapshot Show",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Main Hall",
+        total_seats=100,
+    )
+    confirmed = bookings.reserve(event_id=event.id, seats=[1, 2, 3], total_seats=100)
+    cancelled = bookings.reserve(event_id=event.id, seats=[10], total_seats=100)
+    bookings.cancel(cancelled.id)
+    held = bookings.hold(event_id=event.id, seats=[20], ttl_seconds=60, total_seats=100)
+
+    covered_lsn = write_snapshot(snapshot_path, events, bookings, log)
+    assert covered_lsn == 5
+    assert segment_paths(wal_path) == []
+
+    # Changes after the snapshot only live in the log tail.
+    bookings.confirm(held.id)
+    tail = bookings.reserve(event_id=event.id, seats=[50], total_seats=100)
+    log.close()
+
+    restored_events, restored_bookings = EventRepository(), BookingRepository()
+    after_lsn = load_snapshot(snapshot_path, restored_events, restored_bookings)
+    assert after_lsn == covered_lsn
+    log = open_wal(wal_path, restored_events, restored_bookings, after_lsn=after_lsn)
+
+    assert restored_events.get(event.id) == event
+    assert restored_bookings.get(confirmed.id) == confirmed
+    assert restored_bookings.get(cancelled.id).status is BookingStatus.CANCELLED
+    assert restored_bookings.get(held.id).status is BookingStatus.CONFIRMED
+    assert restored_bookings.get(tail.id) == tail
+    assert restored_bookings.page_by_event(event.id, offset=0, limit=10) == [
+        confirmed,
+        restored_bookings.get(held.id),
+        tail,
+    ]
+    availability = restored_bookings.availability(event.id, 100, detail="range")
+    assert availability.booked_count == 5
+    assert availability.available_ranges == [[4, 19], [21, 49], [51, 100]]
+    assert log.next_lsn == 8
+    log.close()
+
+
+def test_snapshot_without_log_round_trips(tmp_path: Path) -> None:
+    snapshot_path = tmp_path / "ticketing.snapshot"
+    events, bookings = EventRepository(), BookingRepository()
+    event = events.create(
+        name="Quiet Show",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Side Room",
+        total_seats=9,
+    )
+    assert write_snapshot(snapshot_path, events, bookings) == 0
+
+    restored_events, restored_bookings = EventRepository(), BookingRepository()
+    assert load_snapshot(snapshot_path, restored_events, restored_bookings) == 0
+    assert restored_events.get(event.id) == event
+    assert restored_bookings.count_by_event(event.id) == 0
+
+
+def test_export_retries_when_a_booking_lands_during_the_copy(monkeypatch: pytest.MonkeyPatch) -> None:
+    bookings = BookingRepository()
+    event_id = uuid4()
+    first = bookings.reserve(event_id=event_id, seats=[1], total_seats=10)
+    copies = []
+    items = SlotIndex.items
+
+    def racing_items(index: SlotIndex) -> list:
+        copies.append(items(index))
+        if len(copies) == 1:
+            # The stripe lock is free while bookings are copied, so this write gets in.
+            bookings.reserve(event_id=event_id, seats=[2], total_seats=10)
+        return copies[-1]
+
+    monkeypatch.setattr(SlotIndex, "items", racing_items)
+    bitmap, capacity, exported = bookings.export_event(event_id)
+
+    assert len(copies) == 2
+    assert capacity == 10
+    assert [booking.seats for booking in exported] == [first.seats, (2,)]
+    assert bitmap == bookings.occupancy(event_id, 10).bitmap
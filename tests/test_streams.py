@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from ticketing_service import main
+from ticketing_service.api.streams import SeatStreams
+from ticketing_service.models import SeatChange
+from ticketing_service.repositories import BookingRepository, EventRepository
+
+SUBSCRIBERS = 2000
+
+
+def frames(chunks: list[bytes]) -> list[tuple[str, dict]]:
+    parsed = []
+    for frame in b"".join(chunks).decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def test_thousands_of_subscribers_share_coalesced_frames() -> None:
+    async def scenario() -> None:
+        streams = SeatStreams(buffer_messages=4, heartbeat_seconds=60)
+        event_id = uuid4()
+        left = asyncio.Event()
+        slow_gate = asyncio.Event()
+        received: list[list[bytes]] = [[] for _ in range(SUBSCRIBERS)]
+
+        async def receive() -> dict:
+            await left.wait()
+            return {"type": "http.disconnect"}
+
+        def sender(index: int):
+            async def send(message: dict) -> None:
+                if message["type"] == "http.response.body":
+                    received[index].append(message["body"])
+                    if index == 0 and len(received[0]) > 1:
+                        await slow_gate.wait()
+
+            return send
+
+        snapshot = b'id: 0\nevent: snapshot\ndata: {"version":0}\n\n'
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        tasks = [
+            asyncio.create_task(streams.response(event_id, lambda: snapshot)(scope, receive, sender(index)))
+            for index in range(SUBSCRIBERS)
+        ]
+        while streams.subscriber_count(event_id) < SUBSCRIBERS:
+            await asyncio.sleep(0.01)
+
+        # Changes published before the loop gets to flush go out as one frame.
+        streams.publish(event_id, SeatChange(version=1, taken=(1, 2), released=(), booked_count=2, available_count=8))
+        streams.publish(event_id, SeatChange(version=2, taken=(3,), released=(), booked_count=3, available_count=7))
+        streams.publish(event_id, SeatChange(version=3, taken=(), released=(2,), booked_count=2, available_count=8))
+        while any(len(chunks) < 2 for chunks in received[1:]):
+            await asyncio.sleep(0.01)
+        expected = ("seats", {"version": 3, "taken": [1, 3], "released": [2], "booked_count": 2, "available_count": 8})
+        assert all(frames(chunks) == [("snapshot", {"version": 0}), expected] for chunks in received[1:])
+
+        # Subscriber 0 is stuck sending; its backlog stays bounded and it resyncs later.
+        for version in range(4, 20):
+            change = SeatChange(version=version, taken=(version,), released=(), booked_count=1, available_count=9)
+            streams.publish(event_id, change)
+            await asyncio.sleep(0)
+        while any(len(chunks) < 18 for chunks in received[1:]):
+            await asyncio.sleep(0.01)
+        slow_gate.set()
+        while len(received[0]) < 3:
+            await asyncio.sleep(0.01)
+        assert [event for event, _ in frames(received[0])][-1] == "snapshot"
+
+        left.set()
+        await asyncio.gather(*tasks)
+        assert streams.subscriber_count(event_id) == 0
+
+    asyncio.run(scenario())
+
+
+def test_seat_stream_endpoint_pushes_bookings() -> None:
+    async def scenario() -> None:
+        main.event_repository = EventRepository()
+        main.booking_repository = BookingRepository(on_seats_changed=main.seat_streams.publish)
+        event = main.event_repository.create(
+            name="Streamed",
+            starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+            venue="Hall",
+            total_seats=10,
+        )
+        main.booking_repository.reserve(event.id, [5], total_seats=10)
+
+        left = asyncio.Event()
+        messages: list[dict] = []
+
+        async def receive() -> dict:
+            await left.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            messages.append(message)
+
+        path = f"/events/{event.id}/seats/stream"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        task = asyncio.create_task(main.app(scope, receive, send))
+        while len(messages) < 2:
+            await asyncio.sleep(0.01)
+        assert messages[0]["status"] == 200
+        assert (b"content-type", b"text/event-stream; charset=utf-8") in messages[0]["headers"]
+
+        # Bookings land on worker threads, as they do behind the threadpool.
+        await asyncio.to_thread(main.booking_repository.reserve, event.id, [1, 2], total_seats=10)
+        while len(messages) < 3:
+            await asyncio.sleep(0.01)
+        left.set()
+        await task
+
+        events = frames([message["body"] for message in messages[1:]])
+        snapshot = {"version": 1, "capacity": 10, "booked_count": 1, "available_count": 9}
+        assert events[0] == ("snapshot", {**snapshot, "available_ranges": [[1, 4], [6, 10]]})
+        assert events[1] == (
+            "seats",
+            {"version": 2, "taken": [1, 2], "released": [], "booked_count": 3, "available_count": 7},
+        )
+
+    asyncio.run(scenario())
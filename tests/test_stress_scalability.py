@@ -3,14 +3,18 @@ from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 
 from ticketing_service import main
+from ticketing_service.pipeline import BookingPipeline
 from ticketing_service.repositories import BookingRepository, EventRepository
 
 
 def reset_repositories() -> None:
     main.event_repository = EventRepository()
     main.booking_repository = BookingRepository()
+    if main.booking_pipeline is not None:
+        main.booking_pipeline.close()
+        main.booking_pipeline = BookingPipeline(main.booking_repository)
     main.rate_limiter._max_requests = 10_000
-    main.rate_limiter._buckets.clear()
+    main.rate_limiter.clear()
 
 
 def create_event(client: TestClient, total_seats: int) -> str:
@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from ticketing_service import repositories as repositories_module
+from ticketing_service import wal as wal_module
+from ticketing_service.models import BookingStatus, SeatLayout
+from ticketing_service.repositories import BookingRepository, EventRepository
+from ticketing_service.wal import FsyncPolicy, WriteAheadLog, open_wal
+
+
+def create_event(events: EventRepository, total_seats: int = 10):
+    return events.create(
+        name="Durable Show",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Main Hall",
+        total_seats=total_seats,
+    )
+
+
+def test_recovery_replays_events_bookings_and_status_changes(tmp_path: Path) -> None:
+    path = tmp_path / "ticketing.wal"
+    events, bookings = EventRepository(), BookingRepository()
+    log = open_wal(path, events, bookings)
+    event = create_event(events)
+    kept = bookings.reserve(event_id=event.id, seats=[1, 2], total_seats=event.total_seats)
+    cancelled = bookings.reserve(event_id=event.id, seats=[3], total_seats=event.total_seats)
+    bookings.cancel(cancelled.id)
+    held = bookings.hold(event_id=event.id, seats=[4], ttl_seconds=60, total_seats=event.total_seats)
+    log.close()
+
+    restored_events, restored_bookings = EventRepository(), BookingRepository()
+    log = open_wal(path, restored_events, restored_bookings)
+    assert restored_events.get(event.id) == event
+    assert restored_bookings.get(kept.id) == kept
+    assert restored_bookings.get(cancelled.id).status is BookingStatus.CANCELLED
+    assert restored_bookings.get(held.id).status is BookingStatus.PENDING
+    assert restored_bookings.occupancy(event.id, event.total_seats).booked_count == 3
+    with pytest.raises(ValueError):
+        restored_bookings.reserve(event_id=event.id, seats=[2], total_seats=event.total_seats)
+
+    assert log.next_lsn == 6
+    log.close()
+
+
+def test_recovery_restores_seat_layout(tmp_path: Path) -> None:
+    path = tmp_path / "ticketing.wal"
+    events, bookings = EventRepository(), BookingRepository()
+    log = open_wal(path, events, bookings)
+    layout = SeatLayout.build([("Floor", [("A", 3, "vip"), ("B", 3, "standard")]), ("Balcony", [("A", 4, "standard")])])
+    event = events.create(
+        name="Durable Show",
+        starts_at=datetime.now(timezone.utc) + timedelta(days=1),
+        venue="Main Hall",
+        total_seats=10,
+        layout=layout,
+    )
+    bookings.reserve(event_id=event.id, seats=[1, 7], total_seats=event.total_seats)
+    log.close()
+
+    restored_events, restored_bookings = EventRepository(), BookingRepository()
+    open_wal(path, restored_events, restored_bookings).close()
+    restored = restored_events.get(event.id)
+    assert restored == event
+    availability = restored_bookings.availability(event.id, 10, layout=restored.layout, group_by="tier")
+    assert [(group.name, group.available_count) for group in availability.groups] == [("vip", 2), ("standard", 6)]
+
+
+def test_recovery_truncates_torn_tail(tmp_path: Path) -> None:
+    path = tmp_path / "ticketing.wal"
+    events = EventRepository()
+    log = open_wal(path, events, BookingRepository())
+    event = create_event(events)
+    log.close()
+    with open(path, "ab") as handle:
+        handle.write(b'{"lsn":2,"op":"booking","book')
+
+    restored = EventRepository()
+    log = open_wal(path, restored, BookingRepository())
+    assert restored.get(event.id) == event
+    assert path.read_bytes().endswith(b"}\n")
+    log.close()
+
+
+def test_failed_fsync_refuses_later_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    events, bookings = EventRepository(), BookingRepository()
+    log = open_wal(tmp_path / "ticketing.wal", events, bookings)
+    event = create_event(events)
+
+    def broken_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(wal_module.os, "fsync", broken_fsync)
+    with pytest.raises(RuntimeError, match="unavailable"):
+        bookings.reserve(event_id=event.id, seats=[1], total_seats=event.total_seats)
+    with pytest.raises(RuntimeError, match="unavailable"):
+        bookings.reserve(event_id=event.id, seats=[2], total_seats=event.total_seats)
+    with pytest.raises(RuntimeError, match="unavailable"):
+        log.append("noop", {})
+
+    # The refused write never touched memory, so seat 2 is still free.
+    assert not bookings.occupancy(event.id, event.total_seats).is_booked(2)
+    log.close()
+
+
+def test_confirming_an_expired_hold_syncs_the_cancel(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    events, bookings = EventRepository(), BookingRepository()
+    log = open_wal(tmp_path / "ticketing.wal", events, bookings)
+    event = create_event(events)
+    held = bookings.hold(event_id=event.id, seats=[1], ttl_seconds=60, total_seats=event.total_seats)
+    synced: list[int] = []
+    wait = log.wait
+    monkeypatch.setattr(log, "wait", lambda lsn: (synced.append(lsn), wait(lsn)))
+    monkeypatch.setattr(repositories_module, "utc_now", lambda: held.expires_at + timedelta(seconds=1))
+
+    with pytest.raises(ValueError, match="expired"):
+        bookings.confirm(held.id)
+    assert synced == [log.next_lsn - 1]
+    assert bookings.get(held.id).status is BookingStatus.CANCELLED
+    log.close()
+
+
+@pytest.mark.parametrize("policy", list(FsyncPolicy))
+def test_group_commit_batches_fsyncs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, policy: FsyncPolicy) -> None:
+    fsyncs = []
+    real_fsync = wal_module.os.fsync
+    monkeypatch.setattr(wal_module.os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+    log = WriteAheadLog(tmp_path / "group.wal", fsync_policy=policy)
+
+    def writer() -> None:
+        for index in range(50):
+            log.wait(log.append("noop", {"index": index}))
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    assert len((tmp_path / "group.wal").read_bytes().splitlines()) == 400
+    if policy is FsyncPolicy.OS:
+        assert fsyncs == []
+    else:
+        assert 0 < len(fsyncs) < 400